@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Fetch coalescing benchmark
+Starts N `fetchpinterest.py` runs for the same feed at once (as several
+widgets or desktops refreshing together would) against a stand-in server
+with per-request latency, with an empty cache each round:
+
+    no-cache    --no-cache, so every run fetches (no lease)
+    coalesced   the default; one run holds the feed lease and fetches,
+                the others wait for it and serve what it cached
+
+Reports server requests, wall time and the cache states returned. A
+second table repeats the --no-cache burst with and without a rate limit
+for the stand-in host, and reports how far apart the shared token bucket
+spread the processes' requests.
+
+Usage: python3 benchmarks/bench_coalesce.py [--clients N] [--latency S] [--rate R/B]
+"""
+
+import argparse
+import collections
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_suite import FETCH_SCRIPT, REPLAY, replay_env
+from fixtures import load_kind_fixture
+from standin_server import Route, StandinServer
+
+def burst(argv, env, clients):
+    """Start clients copies of argv at once; return (wall ms, Counter of cache states)"""
+    start = time.perf_counter()
+    processes = [subprocess.Popen(argv, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+                 for _ in range(clients)]
+    states = collections.Counter()
+    for process in processes:
+        out, _ = process.communicate()
+        states[json.loads(out).get("cache", "-")] += 1
+    return (time.perf_counter() - start) * 1000, states
+
+def main():
+    parser = argparse.ArgumentParser(description="Server requests and wall time for concurrent fetches of one feed")
+    parser.add_argument("--clients", type=int, default=6)
+    parser.add_argument("--kind", default="board", help="Fixture kind (home, search, profile, board)")
+    parser.add_argument("--latency", type=float, default=0.3, help="Server delay per request, seconds")
+    parser.add_argument("--rate", default="2/2", help="Rate limit for the stand-in host, rate/burst")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="pinterest-coalesce-", ignore_cleanup_errors=True) as home:
+        os.makedirs(os.path.join(home, ".config"))
+        with open(os.path.join(home, ".config", "pinterest_widget_auth.json"), "w") as f:
+            json.dump({"cookies": {"_auth": "1"}}, f)
+
+        command, paths = REPLAY[args.kind]
+        html = load_kind_fixture(args.kind, "small")
+        arrivals = []
+
+        def page(path):
+            arrivals.append(time.perf_counter())
+            return html
+
+        routes = {path: Route(page, delay=args.latency) for path in paths}
+
+        with StandinServer(routes) as server:
+            env = replay_env(server.url, home)
+            env["PINTEREST_WIDGET_RATE_DIR"] = os.path.join(home, "rate")
+            env["PINTEREST_WIDGET_RATE_LIMITS"] = "off"
+            base = [sys.executable, FETCH_SCRIPT, command, "6"]
+
+            print(f"{'mode':<10} {'clients':>7} {'requests':>8} {'wall ms':>8}  cache states")
+            for name, extra in (("no-cache", ["--no-cache"]), ("coalesced", [])):
+                shutil.rmtree(os.path.join(home, "cache"), ignore_errors=True)
+                server.hits.clear()
+                elapsed, states = burst(base + extra, env, args.clients)
+                summary = ", ".join(f"{state} x{count}" for state, count in sorted(states.items()))
+                print(f"{name:<10} {args.clients:>7} {len(server.hits):>8} {elapsed:>8.0f}  {summary}")
+
+            print(f"\n{'limit':<10} {'clients':>7} {'requests':>8} {'wall ms':>8} {'spread ms':>9}")
+            for limit in ("off", f"127.0.0.1={args.rate}"):
+                env["PINTEREST_WIDGET_RATE_LIMITS"] = limit
+                shutil.rmtree(env["PINTEREST_WIDGET_RATE_DIR"], ignore_errors=True)
+                arrivals.clear()
+                elapsed, _ = burst(base + ["--no-cache"], env, args.clients)
+                spread = (max(arrivals) - min(arrivals)) * 1000 if arrivals else 0.0
+                label = "off" if limit == "off" else args.rate
+                print(f"{label:<10} {args.clients:>7} {len(arrivals):>8} {elapsed:>8.0f} {spread:>9.0f}")
+
+if __name__ == "__main__":
+    main()
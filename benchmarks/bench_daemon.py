@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Daemon latency benchmark
+Compares a cold `python3 fetchpinterest.py` spawn with the thin client
+talking to a warm daemon, and with a raw socket round-trip to the daemon.
+
+Usage: python3 benchmarks/bench_daemon.py [--runs N] [--command test]
+"""
+
+import argparse
+import io
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from fixtures import CONTENTS_DIR, add_contents_to_path
+
+add_contents_to_path()
+
+import pinterest_client  # noqa: E402
+
+FETCH_SCRIPT = os.path.join(CONTENTS_DIR, "fetchpinterest.py")
+CLIENT_SCRIPT = os.path.join(CONTENTS_DIR, "pinterest_client.py")
+
+def time_runs(func, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+def report(label, samples):
+    print(f"{label:<22} median {statistics.median(samples):>8.2f} ms   min {min(samples):>8.2f} ms")
+
+def wait_for_daemon(socket_path, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            pinterest_client.request_daemon("fetch", ["test", "1"], socket_path, timeout=1,
+                                            out=io.StringIO(), err=io.StringIO())
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("daemon did not come up")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold spawn vs daemon round-trip")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--command", default="test", help="Fetch command to run (default: test, no network)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="pinterest-daemon-", ignore_cleanup_errors=True) as socket_dir:
+        run_benchmark(args, os.path.join(socket_dir, "bench.sock"))
+
+def run_benchmark(args, socket_path):
+    env = dict(os.environ, PINTEREST_WIDGET_SOCKET=socket_path)
+    argv = [args.command, "12"]
+
+    daemon = subprocess.Popen(
+        [sys.executable, FETCH_SCRIPT, "--serve", f"--socket={socket_path}", "--idle-timeout=600"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_for_daemon(socket_path)
+
+        report("cold spawn", time_runs(
+            lambda: subprocess.run([sys.executable, FETCH_SCRIPT] + argv, capture_output=True, check=True),
+            args.runs))
+        report("client -> daemon", time_runs(
+            lambda: subprocess.run([sys.executable, CLIENT_SCRIPT] + argv, capture_output=True, check=True, env=env),
+            args.runs))
+        report("socket round-trip", time_runs(
+            lambda: pinterest_client.request_daemon("fetch", argv, socket_path, out=io.StringIO(), err=io.StringIO()),
+            args.runs))
+    finally:
+        daemon.terminate()
+        daemon.wait()
+
+if __name__ == "__main__":
+    main()
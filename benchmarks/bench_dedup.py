@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Dedup scaling micro-benchmark
+Runs the regex extraction path on synthetic pages with 1k-20k pin matches
+(a third of them duplicates) and compares the ordered pin-ID index with
+the old list-rebuilding membership test.
+
+Usage: python3 benchmarks/bench_dedup.py [--sizes 1000,5000,10000,20000]
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import re
+import time
+
+from fixtures import add_contents_to_path
+
+add_contents_to_path()
+
+import fetchpinterest  # noqa: E402
+
+def build_matches_page(matches, seed=0):
+    """One minimal pin card per match; every third card repeats an earlier pin"""
+    rng = random.Random(seed)
+    ids = []
+    parts = []
+    for i in range(matches):
+        if i % 3 == 2:
+            pin_id = rng.choice(ids)
+        else:
+            pin_id = str(10**17 + i)
+            ids.append(pin_id)
+        parts.append(f'<a href="/pin/{pin_id}/"><img src="https://i.pinimg.com/236x/aa/bb/cc/{pin_id}.jpg" alt="p"></a>\n')
+    return "".join(parts)
+
+def quadratic_dedup(matches):
+    """The previous membership test: rebuilds a list of IDs for every match"""
+    all_matches = []
+    for pin_id, img_url, title in matches:
+        if fetchpinterest.validate_image_url(img_url) and pin_id not in [m[0] for m in all_matches]:
+            all_matches.append((pin_id, img_url, title))
+    return all_matches
+
+def ordered_dedup(matches):
+    all_matches = {}
+    for pin_id, img_url, title in matches:
+        if pin_id not in all_matches and fetchpinterest.validate_image_url(img_url):
+            all_matches[pin_id] = (pin_id, img_url, title)
+    return list(all_matches.values())
+
+def timed(func, *args):
+    with contextlib.redirect_stderr(io.StringIO()):
+        start = time.perf_counter()
+        result = func(*args)
+        return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pin-ID dedup scaling")
+    parser.add_argument("--sizes", default="1000,5000,10000,20000")
+    args = parser.parse_args()
+
+    print(f"{'matches':>8} {'quadratic ms':>13} {'ordered ms':>11} {'extract all ms':>15} {'extract 20 ms':>14}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        html = build_matches_page(size)
+        pattern = r'href="/pin/(\d+)/"[^>]*>.*?<img[^>]*src="(https://i\.pinimg\.com/[^"]*)"[^>]*alt="([^"]*)"'
+        matches = re.findall(pattern, html, re.DOTALL)
+
+        quad, quad_result = timed(quadratic_dedup, matches)
+        ordered, ordered_result = timed(ordered_dedup, matches)
+        assert quad_result == ordered_result
+
+        full, _ = timed(fetchpinterest.extract_pinterest_data_regex, html, size, "bench")
+        capped, _ = timed(fetchpinterest.extract_pinterest_data_regex, html, fetchpinterest.MAX_PINS_ABSOLUTE, "bench")
+
+        print(f"{size:>8} {quad * 1000:>13.1f} {ordered * 1000:>11.1f} {full * 1000:>15.1f} {capped * 1000:>14.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Extraction benchmark
+Compares the structured JSON path, the single-pass PinScanner engine and
+the legacy six-pattern regex path on the saved fixture pages.
+
+Usage: python3 benchmarks/bench_extract.py [--repeat N] [--max-pins N]
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+from fixtures import FIXTURE_SIZES, add_contents_to_path, load_fixture
+
+add_contents_to_path()
+
+import fetchpinterest  # noqa: E402
+
+def scan_only(html, max_pins, data_type):
+    scanner = fetchpinterest.PinScanner(max_pins, data_type)
+    return scanner.feed(html, final=True)
+
+ENGINES = {
+    "regex": fetchpinterest.extract_pinterest_data_regex,
+    "single_pass": scan_only,
+    "json": fetchpinterest.extract_pinterest_data_json,
+    "enhanced": fetchpinterest.extract_pinterest_data_enhanced,
+}
+
+def time_engine(func, html, max_pins, repeat):
+    best = float("inf")
+    pins = []
+    for _ in range(repeat):
+        # The extractors log to stderr; keep the table readable
+        with contextlib.redirect_stderr(io.StringIO()):
+            start = time.perf_counter()
+            pins = func(html, max_pins, "bench")
+            best = min(best, time.perf_counter() - start)
+    return best, pins
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pin extraction engines")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per engine (best is reported)")
+    parser.add_argument("--max-pins", type=int, default=fetchpinterest.MAX_PINS_ABSOLUTE)
+    args = parser.parse_args()
+
+    print(f"{'fixture':<8} {'size':>9} {'engine':<12} {'best ms':>9} {'pins':>5}")
+    for name in FIXTURE_SIZES:
+        html = load_fixture(name)
+        results = {}
+        for engine, func in ENGINES.items():
+            elapsed, pins = time_engine(func, html, args.max_pins, args.repeat)
+            results[engine] = pins
+            print(f"{name:<8} {len(html) // 1024:>6} KiB {engine:<12} {elapsed * 1000:>9.2f} {len(pins):>5}")
+
+        json_boards = sum(1 for p in results["json"] if p["board"]["name"] != "Bench")
+        print(f"  json path kept real board names on {json_boards}/{len(results['json'])} pins")
+
+if __name__ == "__main__":
+    main()
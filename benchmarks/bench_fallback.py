@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Profile fallback benchmark
+Runs fetch_user_pins_ultra_safe against a local stand-in server that
+injects latency into the three candidate profile URLs, and compares the
+concurrent probe with trying the URLs one after another.
+
+Fails unless the concurrent probe returns the expected URL's pins with
+status success (or placeholder pins when every URL hangs) within one
+TIMEOUT_SECONDS, and every losing request ends closed unread or failed
+rather than left open.
+
+Usage: python3 benchmarks/bench_fallback.py
+"""
+
+import contextlib
+import io
+import threading
+import time
+
+from fixtures import add_contents_to_path, build_page
+from standin_server import Route, StandinServer
+
+add_contents_to_path()
+
+import fetchpinterest  # noqa: E402
+import pinterest_http  # noqa: E402
+
+EMPTY_PAGE = "<html><body>No pins here</body></html>"
+PINS_PAGE = build_page(30, 5)
+
+SCENARIOS = {
+    # name: (routes for /bench/, /bench/pins/, /bench), path expected to win (None: placeholders)
+    "slow profile, fast /pins/": ((Route(EMPTY_PAGE, delay=1.5), Route(PINS_PAGE, delay=0.2),
+                                   Route(EMPTY_PAGE, delay=1.5)), "/bench/pins/"),
+    "first URL 404s": ((Route(status=404, delay=0.3), Route(PINS_PAGE, delay=0.6),
+                        Route(EMPTY_PAGE, delay=1.0)), "/bench/pins/"),
+    "every URL hangs": ((Route(EMPTY_PAGE, delay=30), Route(EMPTY_PAGE, delay=30),
+                         Route(EMPTY_PAGE, delay=30)), None),
+}
+# Slack on top of TIMEOUT_SECONDS for thread start-up and extraction
+WALL_SLACK_SECONDS = 0.5
+
+class RequestLog:
+    """Wraps pinterest_http.request to record how each request ended"""
+
+    def __init__(self):
+        self.calls = []  # [url, response or exception, finished]
+        self._lock = threading.Lock()
+        self._request = pinterest_http.request
+
+    def __call__(self, method, url, **kwargs):
+        call = [url, None, False]
+        with self._lock:
+            self.calls.append(call)
+        try:
+            call[1] = self._request(method, url, **kwargs)
+            return call[1]
+        except Exception as e:
+            call[1] = e
+            raise
+        finally:
+            call[2] = True
+
+    def wait(self, timeout):
+        """Wait for abandoned requests to end (their own timeouts bound this)"""
+        end = time.monotonic() + timeout
+        while not all(call[2] for call in self.calls) and time.monotonic() < end:
+            time.sleep(0.05)
+
+    def still_open(self, winner_url):
+        """Requests other than the winner's that ended with a response nobody closed"""
+        return [call[0] for call in self.calls
+                if call[0] != winner_url and (not call[2] or (
+                    not isinstance(call[1], Exception) and not call[1].raw.closed))]
+
+def sequential_probe(urls, headers, max_pins):
+    """The previous behaviour: try each URL in turn with its own timeout"""
+    for url in urls:
+        try:
+            response = pinterest_http.get(url, headers=headers, timeout=fetchpinterest.TIMEOUT_SECONDS)
+        except Exception:
+            continue
+        if response.status_code == 200:
+            pins = fetchpinterest.extract_pinterest_data_enhanced(response.text, max_pins, "user_pins")
+            if pins:
+                return pins
+    return []
+
+def run(label, func):
+    with contextlib.redirect_stderr(io.StringIO()):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+    pins = result if isinstance(result, list) else result["data"]
+    placeholder = not isinstance(result, list) and fetchpinterest.is_placeholder(result)
+    print(f"  {label:<11} {elapsed:>6.2f} s  {len(pins)} {'placeholder ' if placeholder else ''}pins")
+    return result, elapsed
+
+def check_concurrent(name, server, result, elapsed, expected, log):
+    """Fail the benchmark if the concurrent probe did not behave"""
+    problems = []
+    winner_url = (result.get("validators") or {}).get("url")
+    expected_url = f"{server.url}{expected}" if expected else None
+
+    if elapsed > fetchpinterest.TIMEOUT_SECONDS + WALL_SLACK_SECONDS:
+        problems.append(f"took {elapsed:.2f}s, over one {fetchpinterest.TIMEOUT_SECONDS}s timeout")
+    if expected and (fetchpinterest.is_placeholder(result) or result.get("status") != "success"):
+        problems.append(f"status {result.get('status')!r} instead of success")
+    if not expected and not fetchpinterest.is_placeholder(result):
+        problems.append(f"expected placeholder pins, got status {result.get('status')!r}")
+    if winner_url != expected_url:
+        problems.append(f"won by {winner_url}, expected {expected_url}")
+
+    log.wait(fetchpinterest.TIMEOUT_SECONDS + WALL_SLACK_SECONDS)
+    left_open = log.still_open(winner_url)
+    if left_open:
+        problems.append(f"losing requests left open: {', '.join(left_open)}")
+
+    if problems:
+        raise SystemExit(f"{name}: " + "; ".join(problems))
+
+def main():
+    # Keep the hung scenario short; the point is that it is paid once, not per URL
+    fetchpinterest.TIMEOUT_SECONDS = 2
+    pinterest_http.configure(retries=0)
+
+    for name, ((profile, pins, bare), expected) in SCENARIOS.items():
+        routes = {"/bench/": profile, "/bench/pins/": pins, "/bench": bare}
+        with StandinServer(routes) as server:
+            fetchpinterest.PINTEREST_BASE_URL = server.url
+            urls = [f"{server.url}/bench/", f"{server.url}/bench/pins/", f"{server.url}/bench"]
+
+            print(f"{name} (timeout {fetchpinterest.TIMEOUT_SECONDS}s)")
+            run("sequential", lambda: sequential_probe(urls, {}, 12))
+
+            log = RequestLog()
+            pinterest_http.request = log
+            try:
+                result, elapsed = run("concurrent", lambda: fetchpinterest.fetch_user_pins_ultra_safe("bench", 12))
+                check_concurrent(name, server, result, elapsed, expected, log)
+            finally:
+                pinterest_http.request = log._request
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+NDJSON output benchmark
+Serves each fixture kind with chunked transfer encoding and a per-chunk
+pause from the stand-in server, and runs `fetchpinterest.py <command> N
+--no-cache` with and without --ndjson. Reports when the first pin reached
+the reader, when the last one did, and when the output was complete.
+
+Fails unless --ndjson writes the same pins, in the same order, as the
+JSON output of the same command.
+
+Usage: python3 benchmarks/bench_ndjson.py [--max-pins N] [--chunk-delay S] [--runs N]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_suite import FETCH_SCRIPT, REPLAY, replay_env
+from fixtures import FIXTURE_KINDS, load_kind_fixture
+from standin_server import Route, StandinServer
+
+CHUNK_SIZE = 8192
+
+def read_output(argv, env):
+    """Run the CLI; return (first pin ms, last pin ms, done ms, pins)"""
+    start = time.perf_counter()
+    process = subprocess.Popen(argv, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    first = last = None
+    pins = []
+    for line in process.stdout:
+        now = (time.perf_counter() - start) * 1000
+        record = json.loads(line)
+        if record.get("type") == "pin":
+            pins.append(record["pin"])
+        elif "data" in record:
+            pins.extend(record["data"])
+        else:
+            continue
+        first = first if first is not None else now
+        last = now
+    process.wait()
+    return first or 0.0, last or 0.0, (time.perf_counter() - start) * 1000, pins
+
+def main():
+    parser = argparse.ArgumentParser(description="Time to first pin with and without --ndjson")
+    parser.add_argument("--max-pins", type=int, default=12)
+    parser.add_argument("--size", default="medium", help="Fixture size (small, medium, large)")
+    parser.add_argument("--chunk-delay", type=float, default=0.05, help="Server pause per 8 KiB chunk, seconds")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="pinterest-ndjson-", ignore_cleanup_errors=True) as home:
+        # home and search need an auth file to take the network path at all
+        os.makedirs(os.path.join(home, ".config"))
+        with open(os.path.join(home, ".config", "pinterest_widget_auth.json"), "w") as f:
+            json.dump({"cookies": {"_auth": "1"}}, f)
+
+        print(f"{'kind':<8} {'output':<7} {'first pin':>10} {'last pin':>10} {'done':>8} {'pins':>5}")
+        for kind in FIXTURE_KINDS:
+            command, paths = REPLAY[kind]
+            html = load_kind_fixture(kind, args.size)
+            routes = {path: Route(html, chunk_size=CHUNK_SIZE, chunk_delay=args.chunk_delay) for path in paths}
+
+            with StandinServer(routes) as server:
+                env = replay_env(server.url, home)
+                pins = {}
+                for label, extra in (("json", []), ("ndjson", ["--ndjson"])):
+                    argv = [sys.executable, FETCH_SCRIPT, command, str(args.max_pins), "--no-cache"] + extra
+                    runs = [read_output(argv, env) for _ in range(args.runs)]
+                    first, last, done = (statistics.median(run[i] for run in runs) for i in range(3))
+                    pins[label] = runs[-1][3]
+                    print(f"{kind:<8} {label:<7} {first:>8.0f}ms {last:>8.0f}ms {done:>6.0f}ms {len(pins[label]):>5}")
+
+            if pins["ndjson"] != pins["json"]:
+                raise SystemExit(f"{kind}: --ndjson wrote different pins than the JSON output")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Paged fetch benchmark
+Serves a board of synthetic resource pages (BoardResource plus a
+BoardFeedResource that follows bookmarks) from the stand-in server with
+per-page latency and reads it with stream_pages_async:
+
+    pipelined   one paged command; page N+1 downloads while N is written
+    sequential  one page per command, resumed from each next_page_token
+
+The writer sleeps per page to stand in for a slow reader of the NDJSON
+stream. Also reports the tracemalloc peak for growing page counts (with
+MAX_PAGED_PINS lifted), which levels off once the seen-ID set is full.
+
+Usage: python3 benchmarks/bench_pages.py [--pages N] [--latency S] [--write-delay S]
+"""
+
+import argparse
+import collections
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from urllib.parse import parse_qs, urlsplit
+
+from fixtures import add_contents_to_path
+from standin_server import Route, StandinServer
+
+add_contents_to_path()
+
+import fetchpinterest  # noqa: E402
+import pinterest_async  # noqa: E402
+import pinterest_pages  # noqa: E402
+
+BOARD_ID = "987654321012345678"
+
+def resource_page(path, page_size, total_pages):
+    """One BoardFeedResource response; the bookmark is the next page number"""
+    data = json.loads(parse_qs(urlsplit(path).query)["data"][0])
+    bookmarks = data["options"].get("bookmarks") or ["0"]
+    page = int(bookmarks[0])
+    rng = random.Random(page)
+
+    pins = []
+    for i in range(page_size):
+        digest = "%032x" % rng.getrandbits(128)
+        url = f"https://i.pinimg.com/564x/{digest[:2]}/{digest[2:4]}/{digest[4:6]}/{digest}.jpg"
+        pins.append({
+            "id": str(10**17 + page * 1000 + i),
+            "type": "pin",
+            "grid_title": f"Page {page} pin {i}",
+            "description": "lorem ipsum " * 20,
+            "images": {"564x": {"url": url, "width": 564}, "orig": {"url": url}},
+            "board": {"name": "Bench Board"},
+        })
+
+    bookmark = str(page + 1) if page + 1 < total_pages else "-end-"
+    return json.dumps({"resource_response": {"data": pins, "bookmark": bookmark}})
+
+def board_routes(page_size, total_pages, latency):
+    board = json.dumps({"resource_response": {"data": {"id": BOARD_ID, "name": "Bench Board"}}})
+    return {
+        "/resource/BoardResource/get/": Route(board, headers={"Content-Type": "application/json"}),
+        "/resource/BoardFeedResource/get/": Route(
+            lambda path: resource_page(path, page_size, total_pages), delay=latency,
+            headers={"Content-Type": "application/json"}),
+    }
+
+class SlowReader(io.StringIO):
+    """NDJSON sink that takes write_delay seconds to take each page"""
+
+    def __init__(self, write_delay):
+        super().__init__()
+        self.write_delay = write_delay
+
+    def flush(self):
+        time.sleep(self.write_delay)
+
+def paged_args(pages, page_token=None, max_pins=25):
+    args = fetchpinterest.build_arg_parser().parse_args(["board:benchuser:Bench Board", str(max_pins)])
+    args.pages = pages
+    args.page_token = page_token
+    args.deadline = 600
+    return args
+
+def run_paged(args, out):
+    async def runner():
+        session = pinterest_async.AsyncSession(timeout=args.deadline)
+        return await fetchpinterest.stream_pages_async(session, args, out)
+    with contextlib.redirect_stderr(io.StringIO()):
+        return pinterest_async.run(runner())
+
+def pipelined(pages, write_delay):
+    out = SlowReader(write_delay)
+    start = time.perf_counter()
+    status = run_paged(paged_args(pages), out)
+    return time.perf_counter() - start, status["count"]
+
+def sequential(pages, write_delay):
+    out = SlowReader(write_delay)
+    start = time.perf_counter()
+    status = run_paged(paged_args(1), out)
+    count = status["count"]
+    for _ in range(pages - 1):
+        if not status["next_page_token"]:
+            break
+        status = run_paged(paged_args(1, status["next_page_token"]), out)
+        count += status["count"]
+    return time.perf_counter() - start, count
+
+def memory_peak(pages):
+    """tracemalloc peak (KiB) reading pages into a sink that keeps nothing"""
+    class NullWriter:
+        def write(self, text):
+            pass
+
+        def flush(self):
+            pass
+
+    tracemalloc.start()
+    status = run_paged(paged_args(pages), NullWriter())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024, status["count"]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark paged fetching against a stand-in server")
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--page-size", type=int, default=25)
+    parser.add_argument("--latency", type=float, default=0.05, help="Server delay per page, seconds")
+    parser.add_argument("--write-delay", type=float, default=0.05, help="Reader delay per page, seconds")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="pinterest-pages-", ignore_cleanup_errors=True) as home:
+        os.environ.update(HOME=home, XDG_CACHE_HOME=os.path.join(home, "cache"),
+                          XDG_DATA_HOME=os.path.join(home, "data"))
+
+        memory_pages = (1, 40, 400, 800)
+        total_pages = max(args.pages, *memory_pages)
+        with StandinServer(board_routes(args.page_size, total_pages, args.latency)) as server:
+            fetchpinterest.PINTEREST_BASE_URL = server.url
+
+            print(f"{'mode':<12} {'pages':>5} {'pins':>6} {'wall ms':>9}")
+            for name, run in (("sequential", sequential), ("pipelined", pipelined)):
+                elapsed, count = run(args.pages, args.write_delay)
+                print(f"{name:<12} {args.pages:>5} {count:>6} {elapsed * 1000:>9.1f}")
+
+            # The server shares this process: stop it logging requests, and
+            # warm up once so one-off allocations do not count
+            server.hits = collections.deque(maxlen=0)
+            server.sent = collections.deque(maxlen=0)
+            memory_peak(1)
+            fetchpinterest.MAX_PAGED_PINS = total_pages * args.page_size
+
+            print(f"\n{'pages':>5} {'pins':>6} {'peak KiB':>9}  (seen-ID limit {pinterest_pages.SEEN_ID_LIMIT})")
+            for pages in memory_pages:
+                peak, count = memory_peak(pages)
+                print(f"{pages:>5} {count:>6} {peak:>9.0f}")
+
+if __name__ == "__main__":
+    main()
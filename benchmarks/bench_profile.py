@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Extraction profile benchmark
+Runs the scanner and the legacy six-pattern path over the fixture pages
+under cProfile, once with the previous urlparse-based image URL validator
+and once with the shared ExtractionContext's prefix validator, and reports
+per-call validator cost from the profile along with total extraction time.
+
+Usage: python3 benchmarks/bench_profile.py [--repeat N] [--max-pins N] [--stats N]
+"""
+
+import argparse
+import contextlib
+import cProfile
+import io
+import pstats
+import re
+import time
+from urllib.parse import urlparse
+
+from fixtures import FIXTURE_SIZES, add_contents_to_path, load_fixture
+
+add_contents_to_path()
+
+import fetchpinterest  # noqa: E402
+
+def urlparse_validate_image_url(url):
+    """The previous validator: urlparse plus per-call domain and extension lists"""
+    if not url:
+        return False
+
+    try:
+        parsed = urlparse(url)
+        allowed_domains = ['i.pinimg.com', 'i.pinterest.com']
+        if parsed.netloc not in allowed_domains:
+            return False
+        valid_extensions = ['.jpg', '.jpeg', '.png', '.webp']
+        if not any(url.lower().endswith(ext) for ext in valid_extensions):
+            return False
+        return True
+    except Exception:
+        return False
+
+def scan(html, max_pins):
+    scanner = fetchpinterest.PinScanner(max_pins, "bench")
+    return scanner.feed(html, final=True)
+
+def legacy(html, max_pins):
+    return fetchpinterest.extract_pinterest_data_regex(html, max_pins, "bench")
+
+ENGINES = {"scanner": scan, "legacy": legacy}
+
+@contextlib.contextmanager
+def validator(func):
+    """Route every validation through func for the duration of the block"""
+    context = fetchpinterest.extraction_context()
+    context.valid_image_url = func
+    try:
+        yield
+    finally:
+        del context.valid_image_url  # back to the class method
+
+def profile_run(engine, html, max_pins, repeat):
+    """Best wall time (ms), validator (calls, seconds per call) and the profile"""
+    best = float("inf")
+    profiler = cProfile.Profile()
+    with contextlib.redirect_stderr(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            engine(html, max_pins)
+            best = min(best, time.perf_counter() - start)
+        profiler.enable()
+        for _ in range(repeat):
+            engine(html, max_pins)
+        profiler.disable()
+
+    stats = pstats.Stats(profiler)
+    calls, seconds = 0, 0.0
+    for (_, _, name), (_, ncalls, _, cumtime, _) in stats.stats.items():
+        if re.search(r"valid(ate)?_image_url", name):
+            calls += ncalls
+            seconds += cumtime
+    return best * 1000, calls // repeat, seconds / calls if calls else 0.0, stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile image URL validation in the extractors")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-pins", type=int, default=1000,
+                        help="High by default so every match on the page gets validated")
+    parser.add_argument("--stats", type=int, default=0, help="Also print the top N profile entries")
+    args = parser.parse_args()
+
+    print(f"{'fixture':<8} {'engine':<8} {'validator':<10} {'best ms':>9} {'checks':>7} {'us/check':>9}")
+    for name in FIXTURE_SIZES:
+        html = load_fixture(name)
+        for engine_name, engine in ENGINES.items():
+            for label, func in (("urlparse", urlparse_validate_image_url), ("context", None)):
+                with validator(func) if func else contextlib.nullcontext():
+                    best, calls, per_call, stats = profile_run(engine, html, args.max_pins, args.repeat)
+                print(f"{name:<8} {engine_name:<8} {label:<10} {best:>9.2f} {calls:>7} {per_call * 1e6:>9.2f}")
+                if args.stats:
+                    stats.sort_stats("tottime").print_stats(args.stats)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Pin record benchmark
+Compares feed cache pins kept as JSON dicts with the packed pin table and
+PinRecords (pinterest_records) for growing pin counts. Pins are synthetic
+but shaped like extractor output from several sources: random i.pinimg.com
+URLs, a handful of boards, and descriptions mostly shared per source.
+
+Reports the bytes on disk, the time to load them, and the memory the
+loaded pins hold (tracemalloc). Every table is checked to convert back to
+exactly the original dicts.
+
+Usage: python3 benchmarks/bench_records.py [--counts 100,1000,10000] [--runs N]
+"""
+
+import argparse
+import gc
+import json
+import random
+import statistics
+import time
+import tracemalloc
+
+from fixtures import add_contents_to_path
+
+add_contents_to_path()
+
+from pinterest_records import pack_pins, unpack_pins  # noqa: E402
+
+SOURCES = ("home", "search", "user", "board")
+BOARDS = ("Recipes", "Living Room", "Garden Ideas", "Travel", "Typography", "Home", "Search")
+SIZES = ("236x", "474x", "564x", "736x")
+
+def synthetic_pins(count, seed=0):
+    rng = random.Random(seed)
+    pins = []
+    for i in range(count):
+        source = SOURCES[i % len(SOURCES)]
+        pin_id = str(10**17 + rng.getrandbits(48))
+        digest = "%032x" % rng.getrandbits(128)
+        description = (f"From Pinterest {source}" if rng.random() < 0.7
+                       else " ".join(rng.choice(("cozy", "modern", "easy", "autumn", "ideas", "diy"))
+                                     for _ in range(rng.randint(3, 12))))
+        pins.append({
+            "id": pin_id,
+            "title": f"Pin {i} {digest[:6]}",
+            "description": description,
+            "images": {"orig": {"url": f"https://i.pinimg.com/{rng.choice(SIZES)}/{digest[:2]}/"
+                                       f"{digest[2:4]}/{digest[4:6]}/{digest}.jpg"}},
+            "board": {"name": rng.choice(BOARDS)},
+            "link": f"https://www.pinterest.com/pin/{pin_id}/",
+        })
+    return pins
+
+def median_ms(fn, data, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(data)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def held_kib(fn, data):
+    """Memory still allocated by fn(data)'s result while it is alive"""
+    gc.collect()
+    tracemalloc.start()
+    loaded = fn(data)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del loaded
+    return current / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON vs. packed pin table: size, load time and memory")
+    parser.add_argument("--counts", default="100,1000,10000", help="Comma-separated pin counts")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'pins':>6} {'format':<8} {'bytes':>9} {'load ms':>8} {'held KiB':>9}")
+    for count in (int(value) for value in args.counts.split(",")):
+        pins = synthetic_pins(count)
+        as_json = json.dumps(pins, ensure_ascii=False).encode("utf-8")
+        packed = pack_pins(pins)
+        if [record.to_dict() for record in unpack_pins(packed)] != pins:
+            raise SystemExit(f"pin table for {count} pins does not convert back losslessly")
+
+        for name, data, load in (("json", as_json, json.loads), ("packed", packed, unpack_pins)):
+            elapsed = median_ms(load, data, args.runs)
+            print(f"{count:>6} {name:<8} {len(data):>9} {elapsed:>8.2f} {held_kib(load, data):>9.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Start-up benchmark
+Runs `python3 -X importtime fetchpinterest.py ...` for the commands that
+must not touch the network (test data, and a fresh cache hit with the
+widget's --width/--prefetch/--delta arguments against a warm cache) and
+reports wall time and import time. Fails if requests, urllib3, asyncio
+or socket got imported on those paths, so the fast start stays fast.
+
+Usage: python3 benchmarks/bench_startup.py [--runs N] [--top N]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from fixtures import CONTENTS_DIR, add_contents_to_path, load_kind_fixture
+from standin_server import Route, StandinServer
+
+FETCH_SCRIPT = os.path.join(CONTENTS_DIR, "fetchpinterest.py")
+
+# Loading any of these means the offline path regressed
+FORBIDDEN_MODULES = ("requests", "urllib3", "asyncio", "socket")
+
+WIDGET_ARGS = ["--width=236", "--prefetch=12", "--delta", "--client=bench"]
+
+def parse_importtime(stderr):
+    """Return (all imported module names, {top-level import: cumulative us}).
+
+    Top-level imports are the ones the script itself triggered; site (and
+    whatever .pth files pull in) belongs to the interpreter and is left out.
+    """
+    modules = set()
+    top_level = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        module = name.strip()
+        modules.add(module)
+        if not name[1:].startswith(" ") and module != "site":
+            top_level[module] = int(cumulative)
+    return modules, top_level
+
+def seed_warm_cache(home):
+    """Fetch a board page once from a stand-in server, then mark every image
+    variant as checked and every image as cached, as a long-running widget would"""
+    add_contents_to_path()
+    env = dict(os.environ, HOME=home, XDG_CACHE_HOME=os.path.join(home, "cache"),
+               XDG_DATA_HOME=os.path.join(home, "data"))
+
+    with StandinServer({"/benchuser/bench-board/": Route(load_kind_fixture("board", "small"))}) as server:
+        env["PINTEREST_WIDGET_BASE_URL"] = server.url
+        output = subprocess.run([sys.executable, FETCH_SCRIPT, "board:benchuser:bench board", "12"],
+                                env=env, capture_output=True, text=True, timeout=60)
+    pins = json.loads(output.stdout)["data"]
+
+    # The cache paths are computed at import time from XDG_CACHE_HOME
+    script = f"""
+import json, os, sys
+sys.path.insert(0, {CONTENTS_DIR!r})
+import fetchpinterest
+from pinterest_images import ImageCache
+checks, cache = {{}}, ImageCache()
+for url in json.loads(sys.stdin.read()):
+    current, candidates = fetchpinterest.image_variant_candidates(url, 236)
+    for size, candidate in candidates:
+        checks[candidate] = True
+        os.makedirs(cache.directory, exist_ok=True)
+        open(cache.path_for(candidate), "wb").close()
+fetchpinterest.write_json_atomic(fetchpinterest.VARIANT_CHECKS_PATH, checks)
+"""
+    urls = [pin["images"]["orig"]["url"] for pin in pins]
+    subprocess.run([sys.executable, "-c", script], input=json.dumps(urls), env=env, text=True, check=True)
+    return env
+
+def measure(argv, env, runs):
+    """Median wall time (ms), plus the last run's imports and stdout"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-X", "importtime"] + argv,
+                                env=env, capture_output=True, text=True, timeout=60)
+        samples.append((time.perf_counter() - start) * 1000)
+    modules, top_level = parse_importtime(output.stderr)
+    return statistics.median(samples), modules, top_level, output.stdout
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure fetchpinterest.py start-up on offline paths")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="Slowest imports to list per scenario")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="pinterest-startup-", ignore_cleanup_errors=True) as home:
+        env = seed_warm_cache(home)
+
+        scenarios = {
+            "test data": ["test", "12"],
+            "cache hit": ["board:benchuser:bench board", "12"] + WIDGET_ARGS,
+        }
+
+        # The interpreter alone, for scale
+        bare, _, _, _ = measure(["-c", "pass"], env, args.runs)
+        print(f"{'scenario':<12} {'wall ms':>8} {'import ms':>10}  forbidden imports")
+        print(f"{'python -c':<12} {bare:>8.1f} {'-':>10}")
+
+        failed = False
+        for name, argv in scenarios.items():
+            wall, modules, top_level, stdout = measure([FETCH_SCRIPT] + argv, env, args.runs)
+            result = json.loads(stdout)
+            status = result.get("cache") or result.get("status")
+            forbidden = [module for module in FORBIDDEN_MODULES if module in modules]
+            failed = failed or bool(forbidden)
+            import_ms = sum(top_level.values()) / 1000
+            print(f"{name:<12} {wall:>8.1f} {import_ms:>10.1f}  {', '.join(forbidden) or 'none'} ({status})")
+            for module, cumulative in sorted(top_level.items(), key=lambda item: -item[1])[:args.top]:
+                print(f"    {module:<28} {cumulative / 1000:>7.2f} ms")
+
+        if failed:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Streaming extraction benchmark
+Serves the fixture pages with chunked transfer encoding from a local
+stand-in server and compares reading the whole body (response.text) with
+the streaming extractor, which extracts chunk by chunk and closes the
+connection once the JSON state has supplied max_pins pins. Reports wall
+time, body bytes the server managed to send, peak Python memory and the
+pins returned. The fixtures put their state after the cards, so both modes
+read the whole body; the difference is in peak memory.
+
+Fails unless both modes return identical pins for every fixture size and
+page kind, and unless board pages (HTML cards first, __PWS_DATA__ state
+after them) yield the state's descriptions and board names rather than
+the HTML cards' generic ones.
+
+Usage: python3 benchmarks/bench_streaming.py [max_pins]
+"""
+
+import contextlib
+import io
+import sys
+import time
+import tracemalloc
+
+from fixtures import FIXTURE_KINDS, FIXTURE_SIZES, add_contents_to_path, load_fixture, load_kind_fixture
+from standin_server import Route, StandinServer
+
+add_contents_to_path()
+
+import fetchpinterest  # noqa: E402
+import pinterest_http  # noqa: E402
+
+CHUNK_SIZE = 8192
+# Per-chunk pause standing in for network throughput
+CHUNK_DELAY = 0.002
+
+def buffered(url, max_pins):
+    """The previous behaviour: download everything, then extract"""
+    response = pinterest_http.get(url, timeout=fetchpinterest.TIMEOUT_SECONDS)
+    return fetchpinterest.extract_pinterest_data_enhanced(response.text, max_pins, "board")
+
+def streaming(url, max_pins):
+    response = pinterest_http.get(url, timeout=fetchpinterest.TIMEOUT_SECONDS, stream=True)
+    return fetchpinterest.extract_pins_streaming(response, max_pins, "board")
+
+def measure(server, func, url, max_pins):
+    sent_before = len(server.sent)
+    tracemalloc.start()
+    with contextlib.redirect_stderr(io.StringIO()):
+        start = time.perf_counter()
+        pins = func(url, max_pins)
+        elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # The handler records its byte count once it stops writing
+    deadline = time.monotonic() + 5
+    while len(server.sent) == sent_before and time.monotonic() < deadline:
+        time.sleep(0.01)
+    sent = server.sent[-1] if len(server.sent) > sent_before else 0
+    return pins, elapsed, sent, peak
+
+def check_json_fields_win(pins, label):
+    """Board fixture pins must come from the __PWS_DATA__ state after the cards"""
+    generic = [pin["id"] for pin in pins if not pin["description"].startswith("Fixture description")
+               or not pin["board"]["name"].startswith("Board ")]
+    if not pins or generic:
+        raise SystemExit(f"{label}: HTML card pins won over the JSON state ({len(generic)} of {len(pins)})")
+
+def main():
+    max_pins = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    pinterest_http.configure(retries=0)
+
+    pages = [(name, load_fixture(name)) for name in FIXTURE_SIZES]
+    pages += [(kind, load_kind_fixture(kind, "medium")) for kind in FIXTURE_KINDS]
+
+    print(f"{'fixture':<8} {'mode':<10} {'time':>8} {'sent':>10} {'peak mem':>10} {'pins':>5}")
+    for name, page in pages:
+        routes = {"/page": Route(page, chunk_size=CHUNK_SIZE, chunk_delay=CHUNK_DELAY)}
+
+        with StandinServer(routes) as server:
+            url = f"{server.url}/page"
+            results = {}
+            for mode, func in (("buffered", buffered), ("streaming", streaming)):
+                pins, elapsed, sent, peak = measure(server, func, url, max_pins)
+                results[mode] = pins
+                print(f"{name:<8} {mode:<10} {elapsed * 1000:>6.0f}ms {sent // 1024:>7} KiB "
+                      f"{peak // 1024:>6} KiB {len(pins):>5}")
+
+        if results["buffered"] != results["streaming"]:
+            raise SystemExit(f"{name}: streaming returned different pins than the buffered read")
+        if name in FIXTURE_SIZES or name == "board":
+            check_json_fields_win(results["streaming"], name)
+
+if __name__ == "__main__":
+    main()
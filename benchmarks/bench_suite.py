@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite
+Runs the extraction and fetch pipeline over every fixture page (synthetic
+home/search/profile/board pages in three sizes plus any recordings in
+benchmarks/recorded/) and reports, per fixture:
+
+    parse_ms     best extract_pinterest_data_enhanced time
+    peak_kib     tracemalloc peak during one extraction
+    pins         pins extracted
+    cli_ms       median wall time of `fetchpinterest.py <command> N --no-cache`
+                 against a local replay server serving the page
+    cli_pins     pins in that command's JSON output
+
+Results can be saved as JSON and compared with a previous run, so a
+change can be checked for regressions between commits.
+
+Usage:
+    python3 benchmarks/bench_suite.py --json before.json
+    python3 benchmarks/bench_suite.py --compare before.json [--threshold 0.1]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from fixtures import (CONTENTS_DIR, FIXTURE_KINDS, FIXTURE_SIZES, add_contents_to_path,
+                      load_kind_fixture, recorded_fixtures)
+from standin_server import Route, StandinServer
+
+add_contents_to_path()
+
+import fetchpinterest  # noqa: E402
+
+FETCH_SCRIPT = os.path.join(CONTENTS_DIR, "fetchpinterest.py")
+
+# kind -> (fetch command, replay paths serving the page)
+REPLAY = {
+    "home": ("home_feed", ["/"]),
+    "search": ("search:bench", ["/search/pins/"]),
+    "profile": ("benchuser", ["/benchuser/", "/benchuser/pins/", "/benchuser"]),
+    "board": ("board:benchuser:Bench Board", ["/benchuser/bench-board/"]),
+}
+
+# Metrics where higher is worse, and those that must not change at all
+TIMED_METRICS = ("parse_ms", "peak_kib", "cli_ms")
+EXACT_METRICS = ("pins", "cli_pins")
+
+def fixture_set():
+    """Return (name, kind, html) for every fixture"""
+    fixtures = []
+    for kind in FIXTURE_KINDS:
+        for size in FIXTURE_SIZES:
+            fixtures.append((f"{kind}-{size}", kind, load_kind_fixture(kind, size)))
+    for name, kind, path in recorded_fixtures():
+        with open(path, "r", encoding="utf-8") as f:
+            fixtures.append((name, kind, f.read()))
+    return fixtures
+
+def measure_parse(html, kind, max_pins, repeat):
+    """Best parse time (ms), tracemalloc peak (KiB) and pin count"""
+    best = float("inf")
+    with contextlib.redirect_stderr(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            pins = fetchpinterest.extract_pinterest_data_enhanced(html, max_pins, kind)
+            best = min(best, time.perf_counter() - start)
+
+        tracemalloc.start()
+        fetchpinterest.extract_pinterest_data_enhanced(html, max_pins, kind)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return best * 1000, peak / 1024, len(pins)
+
+def replay_env(server_url, home):
+    """Environment isolating the CLI from the user's auth, cache and saved pins"""
+    env = dict(os.environ)
+    env.update(
+        PINTEREST_WIDGET_BASE_URL=server_url,
+        HOME=home,
+        XDG_CACHE_HOME=os.path.join(home, "cache"),
+        XDG_DATA_HOME=os.path.join(home, "data"),
+    )
+    return env
+
+def measure_cli(html, kind, max_pins, runs, home):
+    """Median CLI latency (ms) and the pin count of its output"""
+    command, paths = REPLAY[kind]
+    routes = {path: Route(html) for path in paths}
+    samples = []
+    pins = 0
+
+    with StandinServer(routes) as server:
+        env = replay_env(server.url, home)
+        for _ in range(runs):
+            start = time.perf_counter()
+            output = subprocess.run(
+                [sys.executable, FETCH_SCRIPT, command, str(max_pins), "--no-cache"],
+                env=env, capture_output=True, text=True, timeout=60
+            )
+            samples.append((time.perf_counter() - start) * 1000)
+            result = json.loads(output.stdout)
+            # Fallback test data means the replay did not yield pins
+            pins = len(result["data"]) if result.get("status") == "success" else 0
+
+    return statistics.median(samples), pins
+
+def run_suite(args):
+    with tempfile.TemporaryDirectory(prefix="pinterest-bench-", ignore_cleanup_errors=True) as home:
+        # home and search need an auth file to take the network path at all
+        os.makedirs(os.path.join(home, ".config"))
+        with open(os.path.join(home, ".config", "pinterest_widget_auth.json"), "w") as f:
+            json.dump({"cookies": {"_auth": "1"}}, f)
+
+        results = {}
+        for name, kind, html in fixture_set():
+            if args.filter and args.filter not in name:
+                continue
+            parse_ms, peak_kib, pins = measure_parse(html, kind, args.max_pins, args.repeat)
+            entry = {"kind": kind, "bytes": len(html.encode("utf-8")), "parse_ms": round(parse_ms, 3),
+                     "peak_kib": round(peak_kib, 1), "pins": pins}
+            if args.cli_runs > 0:
+                cli_ms, cli_pins = measure_cli(html, kind, args.max_pins, args.cli_runs, home)
+                entry.update(cli_ms=round(cli_ms, 1), cli_pins=cli_pins)
+            results[name] = entry
+            print_row(name, entry)
+
+        return results
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=CONTENTS_DIR,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def print_row(name, entry):
+    cli = f"{entry['cli_ms']:>8.1f} {entry['cli_pins']:>5}" if "cli_ms" in entry else f"{'-':>8} {'-':>5}"
+    print(f"{name:<24} {entry['bytes'] // 1024:>6} KiB {entry['parse_ms']:>9.2f} "
+          f"{entry['peak_kib']:>9.0f} {entry['pins']:>5} {cli}")
+
+def compare(baseline, results, threshold):
+    """Print per-metric changes against a baseline; returns the regressions"""
+    regressions = []
+    print(f"\ncompared with {baseline.get('revision') or 'baseline'} (threshold {threshold:.0%})")
+    for name, entry in results.items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        changes = []
+        for metric in TIMED_METRICS:
+            if metric in entry and before.get(metric):
+                ratio = entry[metric] / before[metric] - 1
+                changes.append(f"{metric} {ratio:+.0%}")
+                if ratio > threshold:
+                    regressions.append(f"{name}: {metric} {before[metric]} -> {entry[metric]}")
+        for metric in EXACT_METRICS:
+            if metric in entry and metric in before and entry[metric] != before[metric]:
+                changes.append(f"{metric} {before[metric]}->{entry[metric]}")
+                regressions.append(f"{name}: {metric} {before[metric]} -> {entry[metric]}")
+        print(f"  {name:<24} {', '.join(changes)}")
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extraction and CLI latency over fixture pages")
+    parser.add_argument("--repeat", type=int, default=5, help="Parse runs per fixture (best is reported)")
+    parser.add_argument("--cli-runs", type=int, default=3, help="CLI runs per fixture (0 skips the CLI)")
+    parser.add_argument("--max-pins", type=int, default=fetchpinterest.MAX_PINS_ABSOLUTE)
+    parser.add_argument("--filter", help="Only run fixtures whose name contains this")
+    parser.add_argument("--json", metavar="PATH", help="Write the results to PATH")
+    parser.add_argument("--compare", metavar="PATH", help="Compare with results saved by --json")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative slowdown reported as a regression (default 0.10)")
+    args = parser.parse_args()
+
+    print(f"{'fixture':<24} {'size':>10} {'parse ms':>9} {'peak KiB':>9} {'pins':>5} {'cli ms':>8} {'pins':>5}")
+    results = run_suite(args)
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "timestamp": int(time.time()),
+        "max_pins": args.max_pins,
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(baseline, results, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
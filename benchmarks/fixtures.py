@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark fixture pages
+Builds deterministic Pinterest-like pages (HTML pin cards, inline JSON and
+page filler) and saves them under benchmarks/fixtures/ so every run parses
+exactly the same bytes. Anonymised recordings of real pages made with
+record_fixture.py live in benchmarks/recorded/ and are used alongside them.
+"""
+
+import json
+import os
+import random
+import sys
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+RECORDED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recorded")
+CONTENTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "contents")
+
+# name -> (pin cards, filler blocks between cards)
+FIXTURE_SIZES = {
+    "small": (25, 20),
+    "medium": (100, 60),
+    "large": (250, 150),
+}
+
+# Page layout per feed kind: logged-in pages carry the pins in the JSON
+# state, the cookie-less profile page is server-rendered HTML cards only
+FIXTURE_KINDS = {
+    "home": {"html_cards": False, "state": True},
+    "search": {"html_cards": True, "state": True},
+    "profile": {"html_cards": True, "state": False},
+    "board": {"html_cards": True, "state": True},
+}
+
+SIZES = ["236x", "474x", "564x", "736x"]
+
+def add_contents_to_path():
+    """Make the widget scripts importable from the benchmark scripts"""
+    if CONTENTS_DIR not in sys.path:
+        sys.path.insert(0, CONTENTS_DIR)
+
+def _pin_id(rng):
+    return str(rng.randrange(10**17, 10**18))
+
+def _image_url(rng):
+    digest = "%032x" % rng.getrandbits(128)
+    size = rng.choice(SIZES)
+    return f"https://i.pinimg.com/{size}/{digest[:2]}/{digest[2:4]}/{digest[4:6]}/{digest}.jpg"
+
+def _resize(url, size):
+    parts = url.split("/")
+    parts[3] = size
+    return "/".join(parts)
+
+def _filler(rng):
+    words = " ".join(rng.choice(["lorem", "ipsum", "dolor", "sit", "amet", "pin", "board"]) for _ in range(40))
+    return (
+        f'<div class="x{rng.randrange(10**6)} gridCentered" style="width:{rng.randrange(100, 900)}px">'
+        f'<span data-test-id="filler">{words}</span>'
+        f'<a href="/ideas/{rng.randrange(10**6)}/" rel="nofollow">More ideas</a></div>\n'
+        f'<script nonce="{rng.getrandbits(64):x}">window.__x{rng.randrange(10**6)}={{"k":"{words}"}};</script>\n'
+    )
+
+def build_page(cards, filler_blocks, seed=0, html_cards=True, state=True):
+    """Return a synthetic page with ``cards`` HTML pins plus as many JSON pins
+
+    html_cards=False leaves out the pin card markup and state=False the
+    __PWS_DATA__ script, to mimic the layouts in FIXTURE_KINDS.
+    """
+    rng = random.Random(seed)
+    parts = ["<!DOCTYPE html><html><head><title>Pinterest</title></head><body>\n"]
+
+    state_pins = {}
+    for i in range(cards):
+        pin_id = _pin_id(rng)
+        image_url = _image_url(rng)
+        state_pins[pin_id] = {
+            "id": pin_id,
+            "type": "pin",
+            "grid_title": f"Fixture pin {i}",
+            "description": f"Fixture description {i}",
+            "board": {"id": str(rng.randrange(10**17, 10**18)), "name": f"Board {i % 7}"},
+            "images": {size: {"url": _resize(image_url, size)} for size in ("236x", "474x", "736x")},
+        }
+        if html_cards:
+            parts.append(
+                f'<div data-test-id="pin" data-test-pin-id="{pin_id}" class="Yl- MIw">'
+                f'<a href="/pin/{pin_id}/" aria-label="Pin card" tabindex="0">'
+                f'<div class="XiG"><img src="{image_url}" alt="Fixture pin {i} &amp; friends" loading="auto"></div>'
+                f'</a></div>\n'
+            )
+        for _ in range(filler_blocks // 10 or 1):
+            parts.append(_filler(rng))
+
+    json_pins = []
+    for i in range(cards):
+        pin_id = _pin_id(rng)
+        if i % 2:
+            json_pins.append(f'{{"image":"{_image_url(rng)}","grid":"{i}","url":"/pin/{pin_id}/"}}')
+        else:
+            json_pins.append(f'{{"seo_url":"/pin/{pin_id}/","h":{i},"contentUrl":"{_image_url(rng)}"}}')
+    parts.append('<script type="application/ld+json">[' + ",".join(json_pins) + ']</script>\n')
+
+    for _ in range(filler_blocks):
+        parts.append(_filler(rng))
+
+    if state:
+        payload = {"props": {"initialReduxState": {"pins": state_pins, "users": {}, "resources": {}}}}
+        parts.append('<script id="__PWS_DATA__" type="application/json">' + json.dumps(payload) + '</script>\n')
+
+    parts.append("</body></html>\n")
+    return "".join(parts)
+
+def fixture_path(name):
+    return os.path.join(FIXTURE_DIR, f"{name}.html")
+
+def load_fixture(name):
+    """Load a fixture page, generating it on first use"""
+    path = fixture_path(name)
+    if not os.path.exists(path):
+        cards, filler = FIXTURE_SIZES[name]
+        os.makedirs(FIXTURE_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(build_page(cards, filler, seed=len(name)))
+
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+def load_kind_fixture(kind, size):
+    """Load the synthetic page for a feed kind at a FIXTURE_SIZES size"""
+    path = fixture_path(f"{kind}-{size}")
+    if not os.path.exists(path):
+        cards, filler = FIXTURE_SIZES[size]
+        os.makedirs(FIXTURE_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(build_page(cards, filler, seed=len(kind) * 31 + len(size), **FIXTURE_KINDS[kind]))
+
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+def recorded_fixtures():
+    """Return (name, kind, path) for each recording in benchmarks/recorded/.
+
+    Recordings are named <kind>-<label>.html, e.g. board-recipes.html.
+    """
+    found = []
+    if os.path.isdir(RECORDED_DIR):
+        for filename in sorted(os.listdir(RECORDED_DIR)):
+            name, ext = os.path.splitext(filename)
+            kind = name.split("-", 1)[0]
+            if ext == ".html" and kind in FIXTURE_KINDS:
+                found.append((f"recorded:{name}", kind, os.path.join(RECORDED_DIR, filename)))
+    return found
+
+def main():
+    for name in FIXTURE_SIZES:
+        html = load_fixture(name)
+        print(f"{name}: {len(html) / 1024:.0f} KiB -> {fixture_path(name)}")
+    for kind in FIXTURE_KINDS:
+        for size in FIXTURE_SIZES:
+            html = load_kind_fixture(kind, size)
+            print(f"{kind}-{size}: {len(html) / 1024:.0f} KiB -> {fixture_path(f'{kind}-{size}')}")
+    for name, kind, path in recorded_fixtures():
+        print(f"{name}: {os.path.getsize(path) / 1024:.0f} KiB ({kind}) -> {path}")
+
+if __name__ == "__main__":
+    main()
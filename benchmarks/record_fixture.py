@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Fixture recorder
+Fetches a real Pinterest page (or reads a saved one), anonymises it and
+stores it as benchmarks/recorded/<kind>-<label>.html for bench_suite.py.
+
+Anonymising keeps the page shape the extractors see: pin IDs and image
+hashes are replaced by stable fakes of the same length (so duplicates stay
+duplicates), names, descriptions and account fields are masked letter by
+letter, and tokens, e-mail addresses and script nonces are dropped.
+
+Usage:
+    python3 benchmarks/record_fixture.py board https://www.pinterest.com/user/board/ --label recipes
+    python3 benchmarks/record_fixture.py home --input saved_home.html --label big
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import secrets
+import sys
+
+from fixtures import FIXTURE_KINDS, RECORDED_DIR, add_contents_to_path
+
+# Long digit runs are pin, board and user IDs
+ID_RE = re.compile(r"(?<![\d.])\d{12,20}(?![\d.])")
+PINIMG_RE = re.compile(r"(i\.pinimg\.com/[\w]+/)[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{32})")
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+NONCE_RE = re.compile(r'\bnonce="[^"]*"')
+# Account and free-text fields in the embedded JSON state
+PRIVATE_FIELD_RE = re.compile(
+    r'"(username|full_name|first_name|last_name|display_name|email|about|location|website_url'
+    r'|description|grid_title|title|name|seo_alt_text|closeup_description|auto_alt_text)"'
+    r'(\s*:\s*)"((?:[^"\\]|\\.)*)"'
+)
+TOKEN_FIELD_RE = re.compile(
+    r'"(csrftoken|_auth|_pinterest_sess|session|access_token|token|ip|country|user_agent)"'
+    r'(\s*:\s*)"((?:[^"\\]|\\.)*)"',
+    re.IGNORECASE
+)
+ALT_RE = re.compile(r'(\balt=")([^"]*)(")')
+USERNAME_RE = re.compile(r'"username"\s*:\s*"([\w.-]+)"')
+
+def mask_text(text):
+    """Replace letters with x/X, keeping length, digits, punctuation and escapes"""
+    text = re.sub(r"\\u[0-9a-fA-F]{4}", "x", text)
+    return re.sub(r"[^\W\d_]", lambda m: "X" if m.group().isupper() else "x", text)
+
+class Anonymiser:
+    def __init__(self, salt=None):
+        """
+        Args:
+            salt (bytes, optional): Key for the fake IDs; random by default so
+                recordings cannot be mapped back by hashing known IDs
+        """
+        self.salt = salt or secrets.token_bytes(16)
+        self._ids = {}
+
+    def _digest(self, value):
+        return hashlib.sha256(self.salt + value.encode("utf-8")).hexdigest()
+
+    def fake_id(self, value):
+        """Same-length digit string, stable for the same input"""
+        if value not in self._ids:
+            digits = str(int(self._digest(value), 16))
+            fake = ("1" + digits)[:len(value)]
+            self._ids[value] = fake
+        return self._ids[value]
+
+    def fake_image(self, match):
+        digest = self._digest(match.group(2))[:32]
+        return f"{match.group(1)}{digest[:2]}/{digest[2:4]}/{digest[4:6]}/{digest}"
+
+    def anonymise(self, html, usernames=()):
+        # Usernames appear in profile and board URLs as well as in the JSON
+        names = set(usernames) | set(USERNAME_RE.findall(html))
+        for index, name in enumerate(sorted(names, key=len, reverse=True)):
+            if len(name) >= 3:
+                html = re.sub(rf"(?<![\w.-]){re.escape(name)}(?![\w-])", f"user{index}", html)
+
+        html = PINIMG_RE.sub(self.fake_image, html)
+        html = ID_RE.sub(lambda m: self.fake_id(m.group()), html)
+        html = TOKEN_FIELD_RE.sub(lambda m: f'"{m.group(1)}"{m.group(2)}""', html)
+        html = PRIVATE_FIELD_RE.sub(lambda m: f'"{m.group(1)}"{m.group(2)}"{mask_text(m.group(3))}"', html)
+        html = ALT_RE.sub(lambda m: m.group(1) + mask_text(m.group(2)) + m.group(3), html)
+        html = EMAIL_RE.sub("user@example.com", html)
+        html = NONCE_RE.sub('nonce=""', html)
+        return html
+
+def fetch_page(url, authenticated):
+    """Download a page with the widget's own session and headers"""
+    add_contents_to_path()
+    import fetchpinterest
+    import pinterest_http
+
+    cookies, headers = fetchpinterest.load_pinterest_session() if authenticated else (None, None)
+    headers = headers or {"User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36"}
+    response = pinterest_http.get(url, headers=headers, cookies=cookies, timeout=fetchpinterest.TIMEOUT_SECONDS)
+    response.raise_for_status()
+    return response.text
+
+def main():
+    parser = argparse.ArgumentParser(description="Record an anonymised fixture page")
+    parser.add_argument("kind", choices=sorted(FIXTURE_KINDS), help="Feed kind the page belongs to")
+    parser.add_argument("url", nargs="?", help="Page to fetch (home and search use the widget's auth)")
+    parser.add_argument("--input", help="Anonymise a saved page instead of fetching")
+    parser.add_argument("--label", required=True, help="Fixture label, e.g. a size or topic")
+    parser.add_argument("--username", action="append", default=[],
+                        help="Extra name to scrub (your own account); repeatable")
+    args = parser.parse_args()
+
+    if bool(args.url) == bool(args.input):
+        parser.error("give either a URL or --input")
+
+    if args.input:
+        with open(args.input, "r", encoding="utf-8", errors="replace") as f:
+            html = f.read()
+    else:
+        html = fetch_page(args.url, authenticated=args.kind in ("home", "search"))
+
+    anonymised = Anonymiser().anonymise(html, args.username)
+
+    os.makedirs(RECORDED_DIR, exist_ok=True)
+    path = os.path.join(RECORDED_DIR, f"{args.kind}-{args.label}.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(anonymised)
+    print(f"{path}: {len(anonymised) / 1024:.0f} KiB", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Local Pinterest stand-in server
+Serves canned pages on 127.0.0.1 with per-route latency and status codes,
+so fetch paths can be measured without touching pinterest.com. Point the
+fetcher at it with PINTEREST_WIDGET_BASE_URL=<server.url>.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class Route:
+    def __init__(self, body="", status=200, delay=0.0, headers=None, chunk_size=0, chunk_delay=0.0):
+        """
+        Args:
+            body (str or callable): Response body, or a function of the
+                request path (query string included) returning it
+            status (int): HTTP status code
+            delay (float): Seconds to wait before sending the response
+            headers (dict): Extra response headers
+            chunk_size (int): Send the body with chunked transfer encoding
+                in pieces of this many bytes (0 sends it in one go)
+            chunk_delay (float): Seconds to wait between chunks
+        """
+        self.body = body.encode("utf-8") if isinstance(body, str) else body
+        self.status = status
+        self.delay = delay
+        self.headers = headers or {}
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+
+    def body_for(self, path):
+        body = self.body(path) if callable(self.body) else self.body
+        return body.encode("utf-8") if isinstance(body, str) else body
+
+class StandinServer:
+    """Threaded HTTP server answering from a {path: Route} table"""
+
+    def __init__(self, routes=None):
+        self.routes = dict(routes or {})
+        self.hits = []
+        # Body bytes actually written per request, in request order
+        self.sent = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; with Nagle on,
+            # keep-alive requests stall on the client's delayed ACK
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                server.hits.append(self.path)
+                route = server.routes.get(self.path.split("?", 1)[0], Route(status=404))
+                body = route.body_for(self.path)
+                if route.delay:
+                    time.sleep(route.delay)
+                try:
+                    self.send_response(route.status)
+                    headers = {"Content-Type": "text/html; charset=utf-8"}
+                    headers.update(route.headers)
+                    if route.chunk_size:
+                        headers["Transfer-Encoding"] = "chunked"
+                    else:
+                        headers["Content-Length"] = str(len(body))
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.end_headers()
+                    if self.command == "HEAD":
+                        return
+                    if route.chunk_size:
+                        self._write_chunked(route, body)
+                    else:
+                        self.wfile.write(body)
+                        server.sent.append(len(body))
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up on this request
+
+            def _write_chunked(self, route, body):
+                written = 0
+                try:
+                    for start in range(0, len(body), route.chunk_size):
+                        chunk = body[start:start + route.chunk_size]
+                        self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                        self.wfile.flush()
+                        written += len(chunk)
+                        if route.chunk_delay:
+                            time.sleep(route.chunk_delay)
+                    self.wfile.write(b"0\r\n\r\n")
+                finally:
+                    server.sent.append(written)
+
+            do_HEAD = do_GET
+
+            def log_message(self, *args):
+                pass
+
+        class QuietServer(ThreadingHTTPServer):
+            def handle_error(self, request, client_address):
+                pass  # clients dropping keep-alive connections is expected
+
+        self.httpd = QuietServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -6,40 +6,72 @@ Supports: home feed, user pins, user boards, and search queries
 
 import sys
 import json
-import requests
 import re
+import codecs
 import os
 import time
-from urllib.parse import urlparse, quote_plus
+import argparse
+import contextvars
+import threading
+from urllib.parse import quote_plus
+
+# Only cheap modules are imported up front. requests (via pinterest_http's
+# session), asyncio (pinterest_async) and the daemon's socket code load on
+# first use, so test data and cache hits never pay for them.
+from pinterest_cache import (FeedCache, CACHE_ROOT, DEFAULT_TTL_SECONDS, DEFAULT_MAX_STALE_SECONDS, cached_result,
+                             conditional_headers, response_validators, write_json_atomic)
+from pinterest_delta import SnapshotStore, compute_delta
+from pinterest_saved import SavedPinsIndex
+from pinterest_metrics import Metrics, append_jsonl, write_textfile
+import pinterest_http
+import pinterest_lease
+import pinterest_pages
+
+def env_int(name, default):
+    """Integer setting from the environment, default when unset or not a number"""
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
 
 # STRICT LIMITS to prevent system overload
-MAX_PINS_ABSOLUTE = 20
+# Pins in one JSON result (the widget holds them all at once)
+MAX_PINS_ABSOLUTE = env_int("PINTEREST_WIDGET_MAX_PINS", 20)
+# Pins one paged (--pages/--page-token) command may stream; memory stays
+# flat there, so this only bounds how long a command keeps requesting
+MAX_PAGED_PINS = env_int("PINTEREST_WIDGET_MAX_PAGED_PINS", 1000)
 MAX_IMAGE_SIZE_CHECK = 1024 * 1024  # 1MB max for HEAD requests
 TIMEOUT_SECONDS = 8
 MAX_RETRIES = 2
+RETRY_BACKOFF_SECONDS = 0.5
+# Where feed pages are fetched from (override to point at a local stand-in server)
+PINTEREST_BASE_URL = os.environ.get("PINTEREST_WIDGET_BASE_URL", "https://www.pinterest.com").rstrip("/")
+# Parallel fetches for multi:<src>|<src> commands
+MAX_SOURCE_WORKERS = 4
+# Daemon mode exits after this many idle seconds
+DAEMON_IDLE_TIMEOUT = 1800
+# Overall budget for one command line (fetch, variant checks, prefetch)
+FETCH_DEADLINE_SECONDS = 25
+# Bytes read per chunk when streaming a page into the extractor
+STREAM_CHUNK_BYTES = 16384
+# Longest a fetch waits for another process already fetching the same feed
+LEASE_WAIT_SECONDS = 15
+# fetched_at comes from time.time() in another process; allow for rounding
+LEASE_CLOCK_SLACK_SECONDS = 1
+
+_auth_cache = {}
+# Re-read only when the log changes, so the daemon keeps it in memory
+_saved_index = SavedPinsIndex()
+
+pinterest_http.configure(retries=MAX_RETRIES, backoff=RETRY_BACKOFF_SECONDS)
+
+# Only Pinterest image hosts and image file types count as pin images
+IMAGE_HOSTS = frozenset({"i.pinimg.com", "i.pinterest.com"})
+IMAGE_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".webp"})
 
 def validate_image_url(url):
     """Validate that URL is a proper Pinterest image URL"""
-    if not url:
-        return False
-
-    try:
-        parsed = urlparse(url)
-        # Only allow Pinterest image domains
-        allowed_domains = ['i.pinimg.com', 'i.pinterest.com']
-
-        if parsed.netloc not in allowed_domains:
-            return False
-
-        # Must be a valid image extension
-        valid_extensions = ['.jpg', '.jpeg', '.png', '.webp']
-        if not any(url.lower().endswith(ext) for ext in valid_extensions):
-            return False
-
-        return True
-
-    except Exception:
-        return False
+    return extraction_context().valid_image_url(url)
 
 def load_pinterest_session():
     """Load Pinterest session data from file"""
@@ -49,6 +81,11 @@ def load_pinterest_session():
         return None, None
 
     try:
+        # Re-read only when the file changed (matters in daemon mode)
+        mtime = os.path.getmtime(config_file)
+        if _auth_cache.get("mtime") == mtime:
+            return _auth_cache["cookies"], _auth_cache["headers"]
+
         with open(config_file, 'r') as f:
             auth_data = json.load(f)
 
@@ -64,6 +101,7 @@ def load_pinterest_session():
             'Upgrade-Insecure-Requests': '1',
         }
 
+        _auth_cache.update(mtime=mtime, cookies=cookies, headers=headers)
         return cookies, headers
 
     except Exception as e:
@@ -120,37 +158,469 @@ def create_safe_test_data(max_pins=10, data_type="test"):
 
     return {"data": pins, "status": f"safe_{data_type}_data"}
 
+# Single-pass token scanner. One compiled alternation recognises every token
+# the old patterns keyed on, so the document is walked exactly once. Each
+# branch starts with a literal so the regex engine can skip ahead on its
+# first character instead of trying every branch at every offset.
+PIN_TOKEN_PATTERN = (
+    r'href="/pin/(?P<hpin>\d+)'
+    r'|data-test-pin-id="(?P<dpin>\d+)'
+    r'|<img\b(?P<img>[^>]*)>'
+    r'|"(?:image|contentUrl|url)":"(?P<jimg>https://i\.pinimg\.com/[^"]*)"'
+    r'|"(?:url|seo_url)":"(?:https://www\.pinterest\.com)?/pin/(?P<jpin>\d+)/"'
+)
+IMG_SRC_PATTERN = r'\bsrc="(https://i\.pinimg\.com/[^"]*)"'
+IMG_ALT_PATTERN = r'\balt="([^"]*)"'
+TITLE_CLEAN_PATTERN = r'[^\w\s-]'
+
+# Max distance (in chars) between a JSON pin key and its image key
+JSON_PAIR_WINDOW = 500
+# Chars kept between feed() calls so tokens split across chunks still match
+SCANNER_TAIL = 8192
+
+class ExtractionContext:
+    """Compiled patterns and lookup tables shared by the extractors.
+
+    Built once, on first use, by extraction_context(), then reused by every
+    call in the process (daemon requests, multi-source fetches). The test
+    command and cache hits never extract, so they never pay for compiling.
+    """
+
+    def __init__(self):
+        self.pin_token_re = re.compile(PIN_TOKEN_PATTERN)
+        self.img_src_re = re.compile(IMG_SRC_PATTERN, re.IGNORECASE)
+        self.img_alt_re = re.compile(IMG_ALT_PATTERN, re.IGNORECASE)
+        self.title_clean_re = re.compile(TITLE_CLEAN_PATTERN)
+        self.json_script_re = re.compile(JSON_SCRIPT_PATTERN)
+        self.pin_id_re = re.compile(PIN_ID_PATTERN)
+        self.pinimg_variant_re = re.compile(PINIMG_VARIANT_PATTERN)
+        self.legacy_pin_res = tuple(re.compile(pattern, re.DOTALL | re.IGNORECASE)
+                                    for pattern in LEGACY_PIN_PATTERNS)
+        self.image_url_prefixes = tuple(f"{scheme}://{host}/" for scheme in ("https", "http")
+                                        for host in sorted(IMAGE_HOSTS))
+
+    def valid_image_url(self, url):
+        """validate_image_url without urlparse: a host prefix check and a set
+        lookup on the text after the last dot"""
+        if not url or not isinstance(url, str) or not url.startswith(self.image_url_prefixes):
+            return False
+        return url[url.rfind("."):].lower() in IMAGE_EXTENSIONS
+
+_extraction_context = None
+
+def extraction_context():
+    """Return the shared ExtractionContext, building it on first use"""
+    global _extraction_context
+    if _extraction_context is None:
+        # Two threads racing here just compile twice; either result is fine
+        _extraction_context = ExtractionContext()
+    return _extraction_context
+
+def build_pin(index, pin_id, img_url, title, data_type):
+    """Build the pin dict emitted in the JSON result"""
+    clean_title = extraction_context().title_clean_re.sub('', title).strip()
+    if not clean_title:
+        clean_title = f"Pinterest Pin {index+1}"
+
+    return {
+        "id": pin_id,
+        "title": clean_title,
+        "description": f"From Pinterest {data_type}",
+        "images": {"orig": {"url": img_url}},
+        "board": {"name": data_type.title()},
+        "link": f"https://www.pinterest.com/pin/{pin_id}/"
+    }
+
+class PinScanner:
+    """Incremental single-pass pin extractor.
+
+    Feed the document in one piece or in chunks; pins are paired as tokens
+    stream past: an HTML pin anchor takes the next ``<img>`` tag, and JSON
+    ``/pin/<id>/`` / ``i.pinimg.com`` keys pair in either order within
+    JSON_PAIR_WINDOW chars of each other.
+    """
+
+    def __init__(self, max_pins, data_type="general"):
+        self.max_pins = max_pins
+        self.data_type = data_type
+        self.pins = []
+        self.seen = set()
+        self._context = extraction_context()
+        self._valid_image_url = self._context.valid_image_url
+        self._buffer = ""
+        self._offset = 0
+        self._html_pin = None
+        self._json_pin = None
+        self._json_img = None
+
+    @property
+    def done(self):
+        return len(self.pins) >= self.max_pins
+
+    def feed(self, text, final=False):
+        """Scan another chunk of the document"""
+        if self.done:
+            return self.pins
+
+        buf = self._buffer + text
+        cut = len(buf) - SCANNER_TAIL
+        keep_from = None
+        last_end = 0
+
+        for match in self._context.pin_token_re.finditer(buf):
+            if not final and match.end() > cut:
+                keep_from = match.start()
+                break
+            self._handle(match, self._offset)
+            last_end = match.end()
+            if self.done:
+                break
+
+        if final or self.done:
+            self._buffer = ""
+            return self.pins
+
+        if keep_from is None:
+            keep_from = max(last_end, cut, 0)
+        self._buffer = buf[keep_from:]
+        self._offset += keep_from
+        return self.pins
+
+    def close(self):
+        """Flush the remaining buffered text and return the pins"""
+        return self.feed("", final=True)
+
+    def _emit(self, pin_id, img_url, title):
+        self.seen.add(pin_id)
+        self.pins.append(build_pin(len(self.pins), pin_id, img_url, title or "Pinterest Pin", self.data_type))
+
+    def _handle(self, match, offset):
+        kind = match.lastgroup
+        value = match.group(kind)
+
+        if kind in ("hpin", "dpin"):
+            if self._html_pin is None and value not in self.seen:
+                self._html_pin = value
+
+        elif kind == "img":
+            if self._html_pin is None:
+                return
+            src = self._context.img_src_re.search(value)
+            if src and self._valid_image_url(src.group(1)):
+                alt = self._context.img_alt_re.search(value)
+                self._emit(self._html_pin, src.group(1), alt.group(1) if alt else "")
+                self._html_pin = None
+
+        elif kind == "jimg":
+            if not self._valid_image_url(value):
+                return
+            start, end = offset + match.start(), offset + match.end()
+            pending = self._json_pin
+            if pending and start - pending[1] <= JSON_PAIR_WINDOW and pending[0] not in self.seen:
+                self._emit(pending[0], value, "")
+                self._json_pin = None
+            else:
+                self._json_img = (value, end)
+
+        elif kind == "jpin":
+            if value in self.seen:
+                return
+            start, end = offset + match.start(), offset + match.end()
+            pending = self._json_img
+            if pending and start - pending[1] <= JSON_PAIR_WINDOW:
+                self._emit(value, pending[0], "")
+                self._json_img = None
+            else:
+                self._json_pin = (value, end)
+
+# Embedded JSON state blobs (__PWS_DATA__, __PWS_INITIAL_PROPS__, ...)
+JSON_SCRIPT_PATTERN = r'<script\b(?P<attrs>[^>]*\btype="application/json"[^>]*)>'
+PIN_ID_PATTERN = r'\d+'
+
+# Preferred image variants for a JSON pin's "images" map, best first
+JSON_IMAGE_PREFERENCE = ("564x", "474x", "736x", "orig", "236x")
+
+def find_json_blobs(html_content):
+    """Return (start, end) spans of embedded JSON payloads, __PWS_DATA__ first"""
+    spans = []
+    for match in extraction_context().json_script_re.finditer(html_content):
+        start = match.end()
+        end = html_content.find("</script>", start)
+        if end == -1:
+            break
+        primary = "__PWS_DATA__" in match.group("attrs")
+        spans.append((not primary, start, end))
+
+    spans.sort(key=lambda span: span[0])
+    return [(start, end) for _, start, end in spans]
+
+def iter_pin_objects(payload):
+    """Depth-first walk yielding dicts that look like pins, in document order"""
+    pin_id_re = extraction_context().pin_id_re
+    stack = [payload]
+
+    while stack:
+        node = stack.pop()
+
+        if isinstance(node, dict):
+            pin_id = node.get("id")
+            if (isinstance(pin_id, str) and pin_id_re.fullmatch(pin_id)
+                    and isinstance(node.get("images"), dict)
+                    and node.get("type", "pin") == "pin"):
+                yield node
+                continue
+            stack.extend(reversed(list(node.values())))
+
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+
+def pick_json_image(images):
+    """Choose an image URL from a JSON pin's "images" map"""
+    for size in JSON_IMAGE_PREFERENCE:
+        variant = images.get(size)
+        if isinstance(variant, dict) and validate_image_url(variant.get("url")):
+            return variant["url"]
+    return None
+
+def build_json_pin(index, node, img_url, data_type):
+    """Build a pin dict from a structured JSON pin object"""
+    title = node.get("title") or node.get("grid_title") or node.get("seo_title") or ""
+    pin = build_pin(index, node["id"], img_url, title, data_type)
+
+    description = node.get("description")
+    if isinstance(description, str) and description.strip():
+        pin["description"] = description.strip()
+
+    board = node.get("board")
+    if isinstance(board, dict) and board.get("name"):
+        pin["board"] = {"name": board["name"]}
+
+    return pin
+
+def collect_json_pins(blob, pins, seen, max_pins, data_type):
+    """Decode one JSON blob and append its pins (up to max_pins in total)"""
+    try:
+        payload, _ = json.JSONDecoder().raw_decode(blob.strip())
+    except ValueError:
+        return pins
+
+    for node in iter_pin_objects(payload):
+        if node["id"] in seen:
+            continue
+        img_url = pick_json_image(node["images"])
+        if not img_url:
+            continue
+        seen.add(node["id"])
+        pins.append(build_json_pin(len(pins), node, img_url, data_type))
+        if len(pins) >= max_pins:
+            break
+
+    return pins
+
+def extract_pinterest_data_json(html_content, max_pins, data_type="general"):
+    """Structured extraction from the page's embedded JSON state"""
+    pins = []
+    seen = set()
+
+    for start, end in find_json_blobs(html_content):
+        collect_json_pins(html_content[start:end], pins, seen, max_pins, data_type)
+        if len(pins) >= max_pins:
+            break
+
+    return pins
+
 def extract_pinterest_data_enhanced(html_content, max_pins, data_type="general"):
     """Enhanced data extraction with better patterns for different Pinterest pages"""
     pins = []
 
     try:
-        # Multiple patterns to catch different Pinterest page structures
-        patterns = [
-            # Pattern 1: Standard pin cards with data attributes
-            r'data-test-id="pin"[^>]*>.*?href="/pin/(\d+)/".*?src="(https://i\.pinimg\.com/[^"]*)".*?alt="([^"]*)"',
+        # Structured JSON state is exact; the token scanner is the fallback
+        pins = extract_pinterest_data_json(html_content, max_pins, data_type)
 
-            # Pattern 2: Pin grid items
-            r'<div[^>]*data-test-pin-id="(\d+)"[^>]*>.*?<img[^>]*src="(https://i\.pinimg\.com/[^"]*)"[^>]*alt="([^"]*)"',
+        if not pins:
+            scanner = PinScanner(max_pins, data_type)
+            scanner.feed(html_content, final=True)
+            pins = scanner.pins
 
-            # Pattern 3: Search results and user pins
-            r'href="/pin/(\d+)/"[^>]*>.*?<img[^>]*src="(https://i\.pinimg\.com/[^"]*)"[^>]*(?:alt="([^"]*)")?',
+        print(f"Successfully extracted {len(pins)} pins from {data_type}", file=sys.stderr)
 
-            # Pattern 4: Board pins
-            r'<a[^>]*href="/pin/(\d+)/"[^>]*>.*?<img[^>]*src="(https://i\.pinimg\.com/(?:236x|474x|564x|736x|originals)/[^"]*)"',
+    except Exception as e:
+        print(f"Extraction error for {data_type}: {e}", file=sys.stderr)
 
-            # Pattern 5: JSON data (image then pin ID)
-            r'"(?:image|contentUrl|url)":"(https://i\.pinimg\.com/[^"]*)".{0,500}?"(?:url|seo_url)":"(?:https://www\.pinterest\.com)?/pin/(\d+)/"',
+    return pins
 
-            # Pattern 6: JSON data (pin ID then image)
-            r'"(?:url|seo_url)":"(?:https://www\.pinterest\.com)?/pin/(\d+)/".{0,500}?"(?:image|contentUrl|url)":"(https://i\.pinimg\.com/[^"]*)"',
-        ]
+class StreamingExtractor:
+    """Incremental version of extract_pinterest_data_enhanced.
+
+    Text is fed as it arrives: the PinScanner sees every chunk, and embedded
+    JSON script blobs are buffered until their closing tag and decoded on
+    the spot. JSON pins win whenever any were found, so ``done`` only turns
+    true once they fill max_pins, or once the scanner has max_pins and the
+    __PWS_DATA__ blob has been decoded without yielding any. Scanner pins
+    alone never stop the read: the page's JSON state follows its cards.
+
+    on_pin, if given, is called with each JSON pin as soon as it is
+    decoded. Scanner pins are held back until close(), and only handed over
+    if the page turned out to have no JSON pins, so on_pin sees exactly the
+    pins close() returns.
+    """
+
+    def __init__(self, max_pins, data_type="general", metrics=None, on_pin=None):
+        self.max_pins = max_pins
+        self.data_type = data_type
+        self.metrics = metrics or Metrics()
+        self.on_pin = on_pin
+        self._sent = 0  # JSON pins already handed to on_pin
+        self.scanner = PinScanner(max_pins, data_type)
+        self._json_script_re = extraction_context().json_script_re
+        self.json_pins = []
+        self._json_seen = set()
+        self._pending = ""  # text not yet searched for a JSON script tag
+        self._blob = None   # chunks of the JSON blob being read, if any
+        self._blob_is_state = False
+        self._state_decoded = False  # __PWS_DATA__ read to its end
+
+    @property
+    def done(self):
+        if len(self.json_pins) >= self.max_pins:
+            return True
+        # Scanner pins only stand once the page's JSON turned out to hold none
+        return (self.scanner.done and self._state_decoded
+                and not self.json_pins and self._blob is None)
+
+    def feed(self, text):
+        if not self.scanner.done:
+            with self.metrics.timer("extract_scan"):
+                self.scanner.feed(text)
+
+        with self.metrics.timer("extract_json"):
+            self._feed_json(text)
+
+        if self.on_pin:
+            self._hand_over()
+
+    def _hand_over(self):
+        """Pass JSON pins decoded since the last call to on_pin"""
+        for pin in self.json_pins[self._sent:self.max_pins]:
+            self.on_pin(pin)
+        self._sent = len(self.json_pins)
+
+    def _feed_json(self, text):
+        self._pending += text
+        while not self.done:
+            if self._blob is None:
+                match = self._json_script_re.search(self._pending)
+                if not match:
+                    # Keep a trailing partial tag for the next chunk
+                    lt = self._pending.rfind("<")
+                    self._pending = self._pending[lt:] if lt != -1 and len(self._pending) - lt < 1024 else ""
+                    return
+                self._blob = []
+                self._blob_is_state = "__PWS_DATA__" in match.group("attrs")
+                self._pending = self._pending[match.end():]
+
+            end = self._pending.find("</script>")
+            if end == -1:
+                # Hold back enough text to catch a "</script>" split across chunks
+                keep = len("</script>") - 1
+                if len(self._pending) > keep:
+                    self._blob.append(self._pending[:-keep])
+                    self._pending = self._pending[-keep:]
+                return
+
+            self._blob.append(self._pending[:end])
+            self._pending = self._pending[end + len("</script>"):]
+            collect_json_pins("".join(self._blob), self.json_pins, self._json_seen,
+                              self.max_pins, self.data_type)
+            self._blob = None
+            self._state_decoded = self._state_decoded or self._blob_is_state
+
+    def close(self):
+        """Finish scanning and return the pins"""
+        scanner_pins = self.scanner.close()
+        pins = (self.json_pins or scanner_pins)[:self.max_pins]
+        if self.on_pin:
+            if self.json_pins:
+                self._hand_over()
+            else:
+                for pin in pins:
+                    self.on_pin(pin)
+        print(f"Successfully extracted {len(pins)} pins from {self.data_type}", file=sys.stderr)
+        return pins
+
+def extract_pins_streaming(response, max_pins, data_type="general", metrics=None, on_pin=None):
+    """Extract pins from a stream=True response, closing it once enough are found.
+
+    With metrics, time spent waiting for body chunks is recorded as
+    "download" and the decoded byte count as "bytes_read". on_pin is passed
+    on to the StreamingExtractor.
+    """
+    metrics = metrics or Metrics()
+    try:
+        decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
 
-        all_matches = []
+    extractor = StreamingExtractor(max_pins, data_type, metrics, on_pin)
+    received = 0
 
-        for pattern in patterns:
-            matches = re.findall(pattern, html_content, re.DOTALL | re.IGNORECASE)
-            for match in matches:
+    try:
+        with response:
+            chunks = response.iter_content(STREAM_CHUNK_BYTES)
+            while True:
+                with metrics.timer("download"):
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    extractor.feed(decoder.decode(b"", final=True))
+                    break
+                received += len(chunk)
+                extractor.feed(decoder.decode(chunk))
+                if extractor.done:
+                    # Dropping the connection is cheaper than draining the rest
+                    print(f"Stopped reading {data_type} page after {received // 1024} KiB", file=sys.stderr)
+                    metrics.count("pages_stopped_early")
+                    break
+    except Exception as e:
+        print(f"Extraction error for {data_type}: {e}", file=sys.stderr)
+
+    metrics.count("bytes_read", received)
+    return extractor.close()
+
+# Multiple patterns to catch different Pinterest page structures (legacy path);
+# compiled with re.DOTALL | re.IGNORECASE into ExtractionContext.legacy_pin_res
+LEGACY_PIN_PATTERNS = (
+    # Pattern 1: Standard pin cards with data attributes
+    r'data-test-id="pin"[^>]*>.*?href="/pin/(\d+)/".*?src="(https://i\.pinimg\.com/[^"]*)".*?alt="([^"]*)"',
+
+    # Pattern 2: Pin grid items
+    r'<div[^>]*data-test-pin-id="(\d+)"[^>]*>.*?<img[^>]*src="(https://i\.pinimg\.com/[^"]*)"[^>]*alt="([^"]*)"',
+
+    # Pattern 3: Search results and user pins
+    r'href="/pin/(\d+)/"[^>]*>.*?<img[^>]*src="(https://i\.pinimg\.com/[^"]*)"[^>]*(?:alt="([^"]*)")?',
+
+    # Pattern 4: Board pins
+    r'<a[^>]*href="/pin/(\d+)/"[^>]*>.*?<img[^>]*src="(https://i\.pinimg\.com/(?:236x|474x|564x|736x|originals)/[^"]*)"',
+
+    # Pattern 5: JSON data (image then pin ID)
+    r'"(?:image|contentUrl|url)":"(https://i\.pinimg\.com/[^"]*)".{0,500}?"(?:url|seo_url)":"(?:https://www\.pinterest\.com)?/pin/(\d+)/"',
+
+    # Pattern 6: JSON data (pin ID then image)
+    r'"(?:url|seo_url)":"(?:https://www\.pinterest\.com)?/pin/(\d+)/".{0,500}?"(?:image|contentUrl|url)":"(https://i\.pinimg\.com/[^"]*)"',
+)
+
+def extract_pinterest_data_regex(html_content, max_pins, data_type="general"):
+    """Legacy multi-pattern regex extraction (kept as a reference and fallback path)"""
+    pins = []
+
+    try:
+        context = extraction_context()
+
+        # Insertion-ordered index keyed by pin ID: O(1) dedup, first-seen order kept
+        all_matches = {}
+
+        for pattern in context.legacy_pin_res:
+            for found in pattern.finditer(html_content):
+                match = found.groups()
                 if len(match) >= 2:  # At least pin_id and image_url
                     # Determine which is which based on content
                     val1, val2 = match[0], match[1]
@@ -164,15 +634,21 @@ def extract_pinterest_data_enhanced(html_content, max_pins, data_type="general")
                         
                     title = match[2] if len(match) > 2 and match[2] else f"Pinterest Pin"
 
-                    if validate_image_url(img_url) and pin_id not in [m[0] for m in all_matches]:
-                        all_matches.append((pin_id, img_url, title))
+                    if pin_id not in all_matches and context.valid_image_url(img_url):
+                        all_matches[pin_id] = (pin_id, img_url, title)
+
+                # Stop scanning once enough unique valid pins are known
+                if len(all_matches) >= max_pins:
+                    break
+            if len(all_matches) >= max_pins:
+                break
 
         print(f"Found {len(all_matches)} total matches for {data_type}", file=sys.stderr)
 
         # Convert matches to pin objects
-        for i, (pin_id, img_url, title) in enumerate(all_matches[:max_pins]):
+        for i, (pin_id, img_url, title) in enumerate(list(all_matches.values())[:max_pins]):
             # Clean up title
-            clean_title = re.sub(r'[^\w\s-]', '', title).strip()
+            clean_title = context.title_clean_re.sub('', title).strip()
             if not clean_title:
                 clean_title = f"Pinterest Pin {i+1}"
 
@@ -192,11 +668,57 @@ def extract_pinterest_data_enhanced(html_content, max_pins, data_type="general")
 
     return pins
 
-def fetch_pinterest_search(query, max_pins=12):
+async def fetch_page_async(session, url, label, data_type, max_pins, headers, cookies=None, cache_entry=None):
+    """GET a feed page and stream-extract its pins.
+
+    Returns (kind, pins, validators) where kind is "pins", "revalidated"
+    (304 for cache_entry) or "failed". The extraction shares the request's
+    deadline; if it is abandoned the response is closed to stop the reader.
+    """
+    response = await session.get(
+        url,
+        cookies=cookies,
+        headers=conditional_headers(headers, cache_entry, url),
+        timeout=TIMEOUT_SECONDS,
+        allow_redirects=True,
+        stream=True
+    )
+
+    # requests reports send-to-headers time (connect included on a new
+    # connection); it does not expose DNS and connect on their own
+    session.metrics.add_time("ttfb", response.elapsed.total_seconds())
+    session.metrics.count(f"http_{response.status_code}")
+
+    if response.status_code != 200:
+        response.close()
+        if response.status_code == 304 and cache_entry:
+            return "revalidated", [], None
+        print(f"{label} request failed with status {response.status_code}", file=sys.stderr)
+        return "failed", [], None
+
+    try:
+        pins = await session.run_blocking(extract_pins_streaming, response, max_pins, data_type,
+                                          session.metrics, session.pin_sink, timeout=TIMEOUT_SECONDS)
+    except BaseException:
+        response.close()
+        raise
+
+    return "pins", pins, response_validators(response, url)
+
+def run_in_session(fetcher, *args):
+    """Run an async fetcher (session as first argument) from synchronous code"""
+    import pinterest_async
+
+    async def runner():
+        return await fetcher(pinterest_async.AsyncSession(), *args)
+    return pinterest_async.run(runner())
+
+async def fetch_pinterest_search_async(session, query, max_pins=12, cache_entry=None):
     """Fetch Pinterest search results for a given query"""
     max_pins = min(max_pins, MAX_PINS_ABSOLUTE)
 
-    cookies, headers = load_pinterest_session()
+    with session.metrics.timer("auth_load"):
+        cookies, headers = load_pinterest_session()
 
     if not cookies or not headers:
         print("No auth data, using test data for search", file=sys.stderr)
@@ -205,26 +727,20 @@ def fetch_pinterest_search(query, max_pins=12):
     try:
         # URL encode the search query
         encoded_query = quote_plus(query)
-        search_url = f"https://www.pinterest.com/search/pins/?q={encoded_query}"
+        search_url = f"{PINTEREST_BASE_URL}/search/pins/?q={encoded_query}"
 
         print(f"Searching Pinterest for: {query}", file=sys.stderr)
         print(f"Search URL: {search_url}", file=sys.stderr)
 
-        response = requests.get(
-            search_url,
-            cookies=cookies,
-            headers=headers,
-            timeout=TIMEOUT_SECONDS
-        )
+        kind, pins, validators = await fetch_page_async(
+            session, search_url, "Search", "search", max_pins, headers, cookies, cache_entry)
 
-        if response.status_code != 200:
-            print(f"Search request failed with status {response.status_code}", file=sys.stderr)
-            return create_safe_test_data(max_pins, "search")
+        if kind == "revalidated":
+            return cached_result(cache_entry, max_pins, "revalidated")
 
-        pins = extract_pinterest_data_enhanced(response.text, max_pins, "search")
-
-        if pins and len(pins) > 0:
-            return {"data": pins[:max_pins], "status": "success", "query": query}
+        if pins:
+            return {"data": pins[:max_pins], "status": "success", "query": query,
+                    "validators": validators}
         else:
             print("No pins found in search results, using test data", file=sys.stderr)
             return create_safe_test_data(max_pins, "search")
@@ -233,30 +749,30 @@ def fetch_pinterest_search(query, max_pins=12):
         print(f"Search error: {e}", file=sys.stderr)
         return create_safe_test_data(max_pins, "search")
 
-def fetch_pinterest_home_feed_ultra_safe(max_pins=12):
+def fetch_pinterest_search(query, max_pins=12, cache_entry=None):
+    """Fetch Pinterest search results for a given query"""
+    return run_in_session(fetch_pinterest_search_async, query, max_pins, cache_entry)
+
+async def fetch_pinterest_home_feed_async(session, max_pins=12, cache_entry=None):
     """Ultra-safe home feed fetching"""
     max_pins = min(max_pins, MAX_PINS_ABSOLUTE)
 
-    cookies, headers = load_pinterest_session()
+    with session.metrics.timer("auth_load"):
+        cookies, headers = load_pinterest_session()
 
     if not cookies or not headers:
         return create_safe_test_data(max_pins, "home")
 
     try:
-        response = requests.get(
-            "https://www.pinterest.com/",
-            cookies=cookies,
-            headers=headers,
-            timeout=TIMEOUT_SECONDS
-        )
-
-        if response.status_code != 200:
-            return create_safe_test_data(max_pins, "home")
+        home_url = f"{PINTEREST_BASE_URL}/"
+        kind, pins, validators = await fetch_page_async(
+            session, home_url, "Home feed", "home_feed", max_pins, headers, cookies, cache_entry)
 
-        pins = extract_pinterest_data_enhanced(response.text, max_pins, "home_feed")
+        if kind == "revalidated":
+            return cached_result(cache_entry, max_pins, "revalidated")
 
-        if pins and len(pins) > 0:
-            return {"data": pins[:max_pins], "status": "success"}
+        if pins:
+            return {"data": pins[:max_pins], "status": "success", "validators": validators}
         else:
             return create_safe_test_data(max_pins, "home")
 
@@ -264,14 +780,17 @@ def fetch_pinterest_home_feed_ultra_safe(max_pins=12):
         print(f"Home feed fetch error: {e}", file=sys.stderr)
         return create_safe_test_data(max_pins, "home")
 
-def fetch_user_pins_ultra_safe(username, max_pins=12):
+def fetch_pinterest_home_feed_ultra_safe(max_pins=12, cache_entry=None):
+    """Ultra-safe home feed fetching"""
+    return run_in_session(fetch_pinterest_home_feed_async, max_pins, cache_entry)
+
+async def fetch_user_pins_async(session, username, max_pins=12, cache_entry=None):
     """Ultra-safe user pin fetching with better URL handling"""
     max_pins = min(max_pins, MAX_PINS_ABSOLUTE)
 
     # Do NOT use cookies for user profiles to ensure we get the SEO-friendly HTML
     # cookies, headers = load_pinterest_session()
-    cookies = None
-    
+
     headers = {
         'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
@@ -281,37 +800,20 @@ def fetch_user_pins_ultra_safe(username, max_pins=12):
     try:
         # Try both with and without trailing slash
         urls_to_try = [
-            f"https://www.pinterest.com/{username}/",
-            f"https://www.pinterest.com/{username}/pins/",
-            f"https://www.pinterest.com/{username}"
+            f"{PINTEREST_BASE_URL}/{username}/",
+            f"{PINTEREST_BASE_URL}/{username}/pins/",
+            f"{PINTEREST_BASE_URL}/{username}"
         ]
 
-        pins = []
-        for url in urls_to_try:
-            try:
-                print(f"Trying URL: {url}", file=sys.stderr)
-                response = requests.get(
-                    url,
-                    cookies=None, # Explicitly no cookies
-                    headers=headers,
-                    timeout=TIMEOUT_SECONDS,
-                    allow_redirects=True
-                )
-
-                if response.status_code == 200:
-                    pins = extract_pinterest_data_enhanced(response.text, max_pins, "user_pins")
-                    if pins and len(pins) > 0:
-                        print(f"Successfully fetched {len(pins)} pins from {url}", file=sys.stderr)
-                        break
-                else:
-                    print(f"URL {url} returned status {response.status_code}", file=sys.stderr)
+        pins, validators, revalidated = await probe_user_urls_async(
+            session, urls_to_try, headers, max_pins, cache_entry)
 
-            except Exception as e:
-                print(f"Error with URL {url}: {e}", file=sys.stderr)
-                continue
+        if revalidated:
+            return cached_result(cache_entry, max_pins, "revalidated")
 
-        if pins and len(pins) > 0:
-            return {"data": pins[:max_pins], "status": "success", "username": username}
+        if pins:
+            return {"data": pins[:max_pins], "status": "success", "username": username,
+                    "validators": validators}
         else:
             print(f"No pins found for user {username}, using test data", file=sys.stderr)
             return create_safe_test_data(max_pins, "user")
@@ -320,13 +822,48 @@ def fetch_user_pins_ultra_safe(username, max_pins=12):
         print(f"User fetch error: {e}", file=sys.stderr)
         return create_safe_test_data(max_pins, "user")
 
-def fetch_user_board_pins(username, board_name, max_pins=12):
+def fetch_user_pins_ultra_safe(username, max_pins=12, cache_entry=None):
+    """Ultra-safe user pin fetching with better URL handling"""
+    return run_in_session(fetch_user_pins_async, username, max_pins, cache_entry)
+
+async def probe_user_urls_async(session, urls, headers, max_pins, cache_entry=None):
+    """Fetch candidate profile URLs concurrently; the first one that yields pins wins.
+
+    Returns (pins, validators, revalidated). The whole probe shares a single
+    TIMEOUT_SECONDS deadline. Losing requests are cancelled and their
+    responses closed unread.
+    """
+    import pinterest_async
+
+    async def probe(url):
+        print(f"Trying URL: {url}", file=sys.stderr)
+        kind, pins, validators = await fetch_page_async(
+            session, url, f"URL {url}", "user_pins", max_pins, headers, None, cache_entry)
+        return url, kind, pins, validators
+
+    winner = await pinterest_async.first_completed(
+        [probe(url) for url in urls],
+        accept=lambda outcome: outcome[1] == "revalidated" or bool(outcome[2]),
+        timeout=session.remaining(TIMEOUT_SECONDS)
+    )
+
+    if winner is None:
+        print(f"No profile URL yielded pins within {TIMEOUT_SECONDS}s", file=sys.stderr)
+        return [], None, False
+
+    url, kind, pins, validators = winner
+    if kind == "revalidated":
+        return [], None, True
+
+    print(f"Successfully fetched {len(pins)} pins from {url}", file=sys.stderr)
+    return pins, validators, False
+
+async def fetch_user_board_pins_async(session, username, board_name, max_pins=12, cache_entry=None):
     """Fetch pins from a specific user board"""
     max_pins = min(max_pins, MAX_PINS_ABSOLUTE)
 
     # Do NOT use cookies for public boards
     # cookies, headers = load_pinterest_session()
-    cookies = None
 
     headers = {
         'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36',
@@ -336,26 +873,19 @@ def fetch_user_board_pins(username, board_name, max_pins=12):
     try:
         # Clean board name for URL
         clean_board = board_name.replace(' ', '-').lower()
-        board_url = f"https://www.pinterest.com/{username}/{clean_board}/"
+        board_url = f"{PINTEREST_BASE_URL}/{username}/{clean_board}/"
 
         print(f"Fetching board: {board_url}", file=sys.stderr)
 
-        response = requests.get(
-            board_url,
-            cookies=None, # Explicitly no cookies
-            headers=headers,
-            timeout=TIMEOUT_SECONDS,
-            allow_redirects=True
-        )
-
-        if response.status_code != 200:
-            print(f"Board request failed with status {response.status_code}", file=sys.stderr)
-            return create_safe_test_data(max_pins, "board")
+        kind, pins, validators = await fetch_page_async(
+            session, board_url, "Board", "board", max_pins, headers, None, cache_entry)
 
-        pins = extract_pinterest_data_enhanced(response.text, max_pins, "board")
+        if kind == "revalidated":
+            return cached_result(cache_entry, max_pins, "revalidated")
 
-        if pins and len(pins) > 0:
-            return {"data": pins[:max_pins], "status": "success", "username": username, "board": board_name}
+        if pins:
+            return {"data": pins[:max_pins], "status": "success", "username": username, "board": board_name,
+                    "validators": validators}
         else:
             return create_safe_test_data(max_pins, "board")
 
@@ -363,44 +893,862 @@ def fetch_user_board_pins(username, board_name, max_pins=12):
         print(f"Board fetch error: {e}", file=sys.stderr)
         return create_safe_test_data(max_pins, "board")
 
-def main():
-    """Enhanced main function with search and board support"""
+def fetch_user_board_pins(username, board_name, max_pins=12, cache_entry=None):
+    """Fetch pins from a specific user board"""
+    return run_in_session(fetch_user_board_pins_async, username, board_name, max_pins, cache_entry)
+
+async def fetch_command_async(session, command, max_pins, cache_entry=None):
+    """Dispatch a feed command to its fetcher"""
+    if command == "home_feed":
+        return await fetch_pinterest_home_feed_async(session, max_pins, cache_entry)
+
+    elif command.startswith("search:"):
+        # Format: search:query
+        query = command[7:]  # Remove "search:" prefix
+        if query:
+            return await fetch_pinterest_search_async(session, query, max_pins, cache_entry)
+        return create_safe_test_data(max_pins, "search")
+
+    elif command.startswith("board:"):
+        # Format: board:username:boardname
+        parts = command[6:].split(':', 1)  # Remove "board:" and split once
+        if len(parts) == 2:
+            username, board_name = parts
+            return await fetch_user_board_pins_async(session, username, board_name, max_pins, cache_entry)
+        return create_safe_test_data(max_pins, "board")
+
+    # Assume it's a username
+    return await fetch_user_pins_async(session, command, max_pins, cache_entry)
+
+def fetch_command(command, max_pins, cache_entry=None):
+    """Dispatch a feed command to its fetcher"""
+    return run_in_session(fetch_command_async, command, max_pins, cache_entry)
+
+async def fetch_with_cache_async(session, command, max_pins, cache, fetch_args=()):
+    """Serve fresh cache entries, revalidate stale ones, store successful fetches.
+
+    Stale entries within the cache's max_stale are served as they are while
+    a background process refreshes them (fetch_args are passed on to it).
+    When the fetch falls back to placeholder pins, any cached entry for the
+    command is served instead, however old. Only the holder of the feed's
+    lease fetches: other processes wait for it to finish and serve what it
+    stored ("coalesced"), or fetch themselves if it stored nothing.
+    """
+    cached = cache.get(command)
+    entry = cached if cached and cache.covers(cached, max_pins) else None
+
+    if entry and cache.is_fresh(entry):
+        print(f"Serving {command} from cache", file=sys.stderr)
+        session.metrics.count("cache_hit")
+        return cached_result(entry, max_pins, "hit")
+
+    if entry and cache.is_servable_stale(entry):
+        print(f"Serving stale {command} from cache, refreshing in the background", file=sys.stderr)
+        session.metrics.count("cache_stale")
+        cache.refresh_in_background(command, max_pins, fetch_args)
+        return cached_result(entry, max_pins, "stale")
+
+    # One process per feed fetches; the others wait and take its result
+    lease = cache.lease(command)
+    if not lease.try_acquire():
+        waited_since = time.time()
+        print(f"Waiting for another process fetching {command}", file=sys.stderr)
+        with session.metrics.timer("lease_wait"):
+            await wait_for_lease(session, lease)
+        cached = cache.get(command) or cached
+        if (cached and cache.covers(cached, max_pins)
+                and cached.get("fetched_at", 0) >= waited_since - LEASE_CLOCK_SLACK_SECONDS):
+            lease.release()
+            session.metrics.count("cache_coalesced")
+            return cached_result(cached, max_pins, "coalesced")
+        entry = cached if cached and cache.covers(cached, max_pins) else None
+
+    try:
+        result = await fetch_command_async(session, command, max_pins, entry)
+        validators = result.pop("validators", None)
+
+        if result.get("cache") == "revalidated":
+            session.metrics.count("cache_revalidated")
+            cache.touch(command, entry)
+        elif result.get("status") == "success":
+            session.metrics.count("cache_miss")
+            with session.metrics.timer("cache_write"):
+                cache.put(command, max_pins, result, validators)
+            result["cache"] = "miss"
+        elif cached and is_placeholder(result):
+            print(f"Fetching {command} failed, serving the cached pins", file=sys.stderr)
+            session.metrics.count("cache_stale_error")
+            return cached_result(cached, max_pins, "stale-error")
+    finally:
+        lease.release()
+
+    return result
+
+async def wait_for_lease(session, lease):
+    """Poll until lease is ours, giving up after LEASE_WAIT_SECONDS (or at the deadline)"""
+    import asyncio
+
+    try:
+        end = time.monotonic() + session.remaining(LEASE_WAIT_SECONDS)
+    except asyncio.TimeoutError:
+        return False
+    while time.monotonic() < end:
+        await asyncio.sleep(pinterest_lease.LEASE_POLL_SECONDS)
+        if lease.try_acquire():
+            return True
+    print(f"Gave up waiting for the fetch lease after {LEASE_WAIT_SECONDS}s", file=sys.stderr)
+    return False
+
+def fetch_with_cache(command, max_pins, cache):
+    """Serve fresh cache entries, revalidate stale ones, store successful fetches"""
+    return run_in_session(fetch_with_cache_async, command, max_pins, cache)
+
+def refresh_fetch_args(args):
+    """Options a background feed refresh inherits from this command line"""
+    return [f"--retries={args.retries}", f"--backoff={args.backoff}", f"--deadline={args.deadline}"]
+
+def interleave_pins(pin_lists, max_pins):
+    """Round-robin merge of several pin lists, dropping repeated pin IDs"""
+    merged = []
+    seen = set()
+    iterators = [iter(pins) for pins in pin_lists]
+
+    while iterators and len(merged) < max_pins:
+        remaining = []
+        for pins in iterators:
+            for pin in pins:
+                if pin["id"] not in seen:
+                    seen.add(pin["id"])
+                    merged.append(pin)
+                    remaining.append(pins)
+                    break
+            if len(merged) >= max_pins:
+                break
+        iterators = remaining
+
+    return merged
+
+async def fetch_multi_source_async(sources, max_pins, fetch):
+    """Fetch several feed commands concurrently and merge them fairly.
+
+    fetch(command, max_pins) is the async single-source fetch (cached or
+    not); all sources share one event loop and connection pool.
+    Sources that fell back to placeholder data are reported but not merged.
+    """
+    import asyncio
+
+    limit = asyncio.Semaphore(MAX_SOURCE_WORKERS)
+
+    async def timed_fetch(source):
+        async with limit:
+            start = time.monotonic()
+            try:
+                result = await fetch(source, max_pins)
+            except Exception as e:
+                result = {"data": [], "status": "error", "error": str(e)}
+            return result, time.monotonic() - start
+
+    outcomes = await asyncio.gather(*(timed_fetch(source) for source in sources))
+
+    statuses = []
+    pin_lists = []
+    for source, (result, elapsed) in zip(sources, outcomes):
+        status = result.get("status", "error")
+        status_entry = {
+            "source": source,
+            "status": status,
+            "count": len(result.get("data", [])),
+            "elapsed_ms": round(elapsed * 1000, 1)
+        }
+        if result.get("cache"):
+            status_entry["cache"] = result["cache"]
+        if result.get("error"):
+            status_entry["error"] = result["error"]
+        statuses.append(status_entry)
+
+        if status == "success":
+            pin_lists.append(result.get("data", []))
+
+    if not pin_lists:
+        result = create_safe_test_data(max_pins, "test")
+        result["sources"] = statuses
+        return result
+
+    failed = sum(1 for entry in statuses if entry["status"] != "success")
+    return {
+        "data": interleave_pins(pin_lists, max_pins),
+        "status": "success" if not failed else "partial",
+        "sources": statuses
+    }
+
+# Headers for the JSON resource endpoints that paged fetching reads
+RESOURCE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'application/json, text/javascript, */*, q=0.01',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'X-Requested-With': 'XMLHttpRequest',
+}
+
+async def fetch_resource_async(session, resource, source_url, options, headers, cookies=None):
+    """GET one page of a Pinterest resource endpoint and return the decoded payload"""
+    params = {
+        "source_url": source_url,
+        "data": json.dumps({"options": options, "context": {}}, separators=(",", ":"))
+    }
+    response = await session.get(f"{PINTEREST_BASE_URL}/resource/{resource}/get/", params=params,
+                                 headers=headers, cookies=cookies, timeout=TIMEOUT_SECONDS)
+    session.metrics.add_time("ttfb", response.elapsed.total_seconds())
+    session.metrics.count(f"http_{response.status_code}")
+    if response.status_code != 200:
+        raise RuntimeError(f"{resource} request failed with status {response.status_code}")
+
+    session.metrics.count("bytes_read", len(response.content))
+    with session.metrics.timer("extract_json"):
+        return await session.run_blocking(response.json, timeout=TIMEOUT_SECONDS)
+
+def resource_page_pins(payload):
+    """(pin object, image URL) pairs of a resource page, and the next bookmark"""
+    found = []
+    for node in iter_pin_objects(pinterest_pages.page_items(payload)):
+        img_url = pick_json_image(node["images"])
+        if img_url:
+            found.append((node, img_url))
+    return found, pinterest_pages.next_bookmark(payload)
+
+async def resolve_board_id_async(session, request, headers):
+    """Fill in board_id for a BoardFeedResource request from BoardResource"""
+    options = request["options"]
+    payload = await fetch_resource_async(
+        session, "BoardResource", request["source_url"],
+        {"username": options["username"], "slug": options["slug"], "field_set_key": "detailed"}, headers)
+    board = (payload.get("resource_response") or {}).get("data")
+    if not isinstance(board, dict) or not board.get("id"):
+        raise RuntimeError(f"Board {options['board_url']} not found")
+    request["options"] = dict(options, board_id=str(board["id"]))
+
+def paged_request(args):
+    """(command, request, bookmark, page_size) to start a paged fetch from; raises ValueError"""
+    if args.page_token:
+        state = pinterest_pages.decode_page_token(args.page_token)
+        if args.command and args.command != state.get("command"):
+            raise ValueError(f"page token belongs to {state.get('command')!r}, not {args.command!r}")
+        page_size = int(state.get("page_size") or pinterest_pages.DEFAULT_PAGE_SIZE)
+        return state.get("command"), state["request"], state["bookmark"], page_size
+
+    request = pinterest_pages.resource_for_command(args.command or "")
+    if request is None:
+        raise ValueError(f"{args.command or 'no command'} cannot be paged")
+    page_size = max(1, min(int(args.max_pins), pinterest_pages.MAX_PAGE_SIZE))
+    return args.command, request, None, page_size
+
+async def stream_pages_async(session, args, out):
+    """Write a feed page by page as NDJSON and return the closing status record.
+
+    Each pin is one {"type": "pin", "page": n, "pin": {...}} line, flushed
+    page by page. Page N+1 is requested as soon as page N is parsed, so it
+    downloads while N is written out. At most two pages are held at once and
+    duplicates are tracked in a bounded set, so memory stays flat however
+    many pages are read. The status record carries next_page_token, which
+    resumes after the last page written (or at the page that failed); a
+    page cut short by MAX_PAGED_PINS is not revisited.
+    """
+    import asyncio
+
+    status = {"type": "status", "status": "success", "pages": 0, "count": 0, "next_page_token": None}
+    prefetch = None
+    try:
+        command, request, bookmark, page_size = paged_request(args)
+        status["command"] = command
+
+        cookies, headers = None, dict(RESOURCE_HEADERS)
+        if request["auth"]:
+            with session.metrics.timer("auth_load"):
+                cookies, auth_headers = load_pinterest_session()
+            if not cookies or not auth_headers:
+                raise RuntimeError(f"No auth data, {command} cannot be paged")
+            if cookies.get("csrftoken"):
+                headers["X-CSRFToken"] = cookies["csrftoken"]
+
+        if request["resource"] == "BoardFeedResource" and "board_id" not in request["options"]:
+            await resolve_board_id_async(session, request, headers)
+
+        async def fetch_page(page_bookmark):
+            payload = await fetch_resource_async(
+                session, request["resource"], request["source_url"],
+                pinterest_pages.page_options(request, page_bookmark, page_size), headers, cookies)
+            return resource_page_pins(payload)
+
+        saved = _saved_index.saved_ids()
+        seen = pinterest_pages.BoundedSeenSet()
+        prefetch = asyncio.ensure_future(fetch_page(bookmark))
+
+        while prefetch is not None:
+            try:
+                found, next_bookmark = await prefetch
+            except Exception:
+                # Resume where it failed: the page that was being fetched
+                prefetch = None
+                if bookmark:
+                    status["next_page_token"] = pinterest_pages.encode_page_token(
+                        command, request, bookmark, page_size)
+                raise
+            bookmark = next_bookmark
+            status["pages"] += 1
+            session.metrics.count("pages")
+
+            more = (bookmark and status["pages"] < args.pages
+                    and status["count"] + len(found) < MAX_PAGED_PINS)
+            if more:
+                prefetch = asyncio.ensure_future(fetch_page(bookmark))
+                # Let it send the request before the blocking writes below
+                await asyncio.sleep(0)
+            else:
+                prefetch = None
+
+            with session.metrics.timer("serialize"):
+                for node, img_url in found:
+                    if not seen.add(node["id"]):
+                        continue
+                    pin = build_json_pin(status["count"], node, img_url, request["data_type"])
+                    if str(pin["id"]) in saved:
+                        pin["saved"] = True
+                    out.write(json.dumps({"type": "pin", "page": status["pages"], "pin": pin},
+                                         ensure_ascii=False) + "\n")
+                    status["count"] += 1
+                    if status["count"] >= MAX_PAGED_PINS:
+                        break
+                out.flush()
+
+        if bookmark:
+            status["next_page_token"] = pinterest_pages.encode_page_token(command, request, bookmark, page_size)
+
+    except Exception as e:
+        print(f"Paged fetch error: {e}", file=sys.stderr)
+        status["status"] = "partial" if status["count"] else "error"
+        status["error"] = str(e) or type(e).__name__
+    finally:
+        if prefetch is not None:
+            prefetch.cancel()
+
+    session.metrics.count("pins", status["count"])
+    return status
+
+# Pinterest image variants by width, smallest first
+IMAGE_VARIANTS = ("236x", "474x", "564x", "736x")
+PINIMG_VARIANT_PATTERN = r'^(https://i\.pinimg\.com/)(\d+x|originals)(/.+)$'
+VARIANT_CHECK_WORKERS = 4
+# HEAD verdicts per variant URL, kept on disk: pinimg URLs name immutable
+# content, and remembered verdicts let cache hits choose sizes offline
+VARIANT_CHECKS_PATH = os.path.join(CACHE_ROOT, "variant_checks.json")
+MAX_VARIANT_CHECKS = 4096
+# Statuses that settle whether a variant exists (throttling or errors do not)
+VARIANT_VERDICT_STATUSES = (200, 403, 404, 410)
+_variant_checks = None
+_variant_checks_dirty = False
+# The daemon's request threads share the verdicts; hold this to touch them
+_variant_checks_lock = threading.Lock()
+
+def _loaded_variant_checks():
+    """The remembered HEAD verdicts ({url: usable}), loaded on first use; call with the lock held"""
+    global _variant_checks
+    if _variant_checks is None:
+        try:
+            with open(VARIANT_CHECKS_PATH, "r", encoding="utf-8") as f:
+                loaded = json.load(f)
+            _variant_checks = loaded if isinstance(loaded, dict) else {}
+        except (OSError, ValueError):
+            _variant_checks = {}
+    return _variant_checks
+
+def variant_verdict(url):
+    """Remembered HEAD verdict for a variant URL: True, False or None if unchecked"""
+    with _variant_checks_lock:
+        return _loaded_variant_checks().get(url)
+
+def remember_variant_verdict(url, usable):
+    """Record a settled HEAD verdict; save_variant_checks() writes it out"""
+    global _variant_checks_dirty
+    with _variant_checks_lock:
+        _loaded_variant_checks()[url] = usable
+        _variant_checks_dirty = True
+
+def save_variant_checks():
+    """Store new HEAD verdicts, keeping the newest MAX_VARIANT_CHECKS"""
+    global _variant_checks, _variant_checks_dirty
+    with _variant_checks_lock:
+        if not _variant_checks_dirty:
+            return
+        checks = _loaded_variant_checks()
+        if len(checks) > MAX_VARIANT_CHECKS:
+            _variant_checks = checks = dict(list(checks.items())[-MAX_VARIANT_CHECKS:])
+        try:
+            write_json_atomic(VARIANT_CHECKS_PATH, checks)
+            _variant_checks_dirty = False
+        except OSError as e:
+            print(f"Variant check cache write error: {e}", file=sys.stderr)
+
+def content_length(response):
+    """The response's Content-Length, or 0 when it is missing or malformed"""
+    try:
+        return max(0, int(response.headers.get("Content-Length") or 0))
+    except ValueError:
+        return 0
+
+async def image_variant_exists(session, url):
+    """HEAD-check a variant URL: it must exist and fit MAX_IMAGE_SIZE_CHECK"""
+    usable = variant_verdict(url)
+    if usable is None:
+        try:
+            response = await session.head(url, timeout=TIMEOUT_SECONDS, allow_redirects=True)
+        except Exception as e:
+            print(f"Variant check failed for {url}: {e}", file=sys.stderr)
+            return False
+        # An unknown size counts as fitting, as a missing header always did
+        usable = response.status_code == 200 and content_length(response) <= MAX_IMAGE_SIZE_CHECK
+        if response.status_code not in VARIANT_VERDICT_STATUSES:
+            return usable  # throttled or failing: ask again next time
+        remember_variant_verdict(url, usable)
+    return usable
+
+def image_variant_candidates(url, width):
+    """Split a sized pinimg URL into (current size, [(size, candidate URL), ...])
+    for the variants at least width px wide, smallest first; None for other URLs"""
+    match = extraction_context().pinimg_variant_re.match(url)
+    if not match:
+        return None
+
+    prefix, current, path = match.groups()
+    sizes = [size for size in IMAGE_VARIANTS if int(size[:-1]) >= width] or ["originals"]
+    return current, [(size, prefix + size + path) for size in sizes]
+
+async def choose_image_variant(session, url, width):
+    """Smallest existing pinimg variant at least width px wide.
+
+    Returns (url, size); the URL is unchanged when it is not a sized
+    pinimg URL or no smaller/larger variant checks out.
+    """
+    parsed = image_variant_candidates(url, width)
+    if parsed is None:
+        return url, None
+
+    current, candidates = parsed
+    for size, candidate in candidates:
+        # The extracted URL itself is known to exist
+        if size == current or await image_variant_exists(session, candidate):
+            return candidate, size
+
+    return url, current
+
+def known_image_variant(url, width):
+    """choose_image_variant from remembered verdicts only; None if a HEAD check is needed"""
+    parsed = image_variant_candidates(url, width)
+    if parsed is None:
+        return url, None
+
+    current, candidates = parsed
+    for size, candidate in candidates:
+        if size == current:
+            return candidate, size
+        usable = variant_verdict(candidate)
+        if usable is None:
+            return None
+        if usable:
+            return candidate, size
+
+    return url, current
+
+def apply_image_variants(pins, choices):
+    """Set each pin's chosen (url, size) as images.orig"""
+    for pin, (url, size) in zip(pins, choices):
+        orig = dict(pin["images"]["orig"], url=url)
+        if size:
+            orig["size"] = size
+        # Copy rather than mutate: pin dicts may be shared with cache entries
+        pin["images"] = dict(pin["images"], orig=orig)
+
+def pins_with_images(result):
+    return [pin for pin in result.get("data", []) if pin.get("images", {}).get("orig", {}).get("url")]
+
+async def select_image_variants(session, result, width):
+    """Rewrite each pin's image URL to the variant that best fits width px"""
+    import asyncio
+
+    pins = pins_with_images(result)
+    if not pins:
+        return result
+
+    limit = asyncio.Semaphore(VARIANT_CHECK_WORKERS)
+
+    async def choose(pin):
+        async with limit:
+            return await choose_image_variant(session, pin["images"]["orig"]["url"], width)
+
+    try:
+        choices = await asyncio.gather(*(choose(pin) for pin in pins))
+    finally:
+        save_variant_checks()
+
+    apply_image_variants(pins, choices)
+    return result
+
+def mark_saved_pins(result, saved_index=None):
+    """Add "saved": true to pins recorded in the local saved pins index"""
+    saved = (saved_index or _saved_index).saved_ids()
+    if saved:
+        result["data"] = [dict(pin, saved=True) if str(pin.get("id")) in saved else pin
+                          for pin in result["data"]]
+    return result
+
+def prefetch_urls(result, count):
+    """The first count pins and their image URLs worth caching locally"""
+    pins = result.get("data", [])[:count]
+    urls = [pin.get("images", {}).get("orig", {}).get("url") for pin in pins]
+    return pins, [url for url in urls if validate_image_url(url)]
+
+def apply_local_images(pins, paths):
+    """Add images.orig.local_url (file://) to pins whose image is in paths"""
+    for pin in pins:
+        orig = pin.get("images", {}).get("orig", {})
+        path = paths.get(orig.get("url"))
+        if path:
+            # Copy rather than mutate: pin dicts may be shared with cache entries
+            pin["images"] = dict(pin["images"], orig=dict(orig, local_url="file://" + path))
+
+async def attach_local_images(session, result, count, image_cache=None):
+    """Prefetch the first count pin images and add file:// URLs next to the remote ones"""
+    from pinterest_images import ImageCache
+
+    image_cache = image_cache or ImageCache()
+    pins, urls = prefetch_urls(result, count)
+    if not urls:
+        return result
+
+    paths = await image_cache.prefetch_async(session, urls, timeout=TIMEOUT_SECONDS)
+    print(f"Prefetched {len(paths)}/{len(urls)} images", file=sys.stderr)
+    session.metrics.count("images_prefetched", len(paths))
+
+    apply_local_images(pins, paths)
+    return result
+
+def is_placeholder(result):
+    """True for the built-in test pins (test command, or a fetch that fell back)"""
+    return str(result.get("status", "")).startswith("safe_")
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Fetch a Pinterest feed as JSON")
+    parser.add_argument("command", nargs="?",
+                        help="home_feed, test, search:<query>, board:<user>:<board>, a username, "
+                             "or multi:<source>|<source>|... to merge several of these")
+    parser.add_argument("max_pins", nargs="?", default="12", help="Number of pins to return")
+    # --refresh=<timestamp> only makes each widget command line unique
+    parser.add_argument("--refresh", help=argparse.SUPPRESS)
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk feed cache")
+    parser.add_argument("--cache-ttl", type=int, default=DEFAULT_TTL_SECONDS,
+                        help="Seconds a cached feed is served without revalidation")
+    parser.add_argument("--max-stale", type=int, default=DEFAULT_MAX_STALE_SECONDS, metavar="SECONDS",
+                        help="Seconds past --cache-ttl a cached feed is still served at once while a "
+                             "background process refreshes it for the next call (0 fetches right away)")
+    # Used by that background refresh
+    parser.add_argument("--refresh-feed", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--feed-marker", help=argparse.SUPPRESS)
+    parser.add_argument("--retries", type=int, default=MAX_RETRIES,
+                        help="Retries for connection errors, throttling and 5xx responses")
+    parser.add_argument("--backoff", type=float, default=RETRY_BACKOFF_SECONDS,
+                        help="Exponential backoff factor between retries, in seconds")
+    parser.add_argument("--width", type=int, default=0, metavar="PX",
+                        help="Rewrite image URLs to the smallest Pinterest variant (236x-736x) "
+                             "at least PX pixels wide and report it as images.orig.size")
+    parser.add_argument("--prefetch", type=int, default=0, metavar="N",
+                        help="Download the first N pin images into the local image cache "
+                             "and add images.orig.local_url (file://) to those pins")
+    parser.add_argument("--delta", action="store_true",
+                        help="Add a delta (added/removed/unchanged pin IDs with positions) "
+                             "against the pins previously returned to --client for this feed")
+    parser.add_argument("--client", default="default",
+                        help="Identifies the widget instance whose snapshot --delta compares against")
+    parser.add_argument("--deadline", type=float, default=FETCH_DEADLINE_SECONDS,
+                        help="Overall seconds for the whole command; requests still running are cancelled")
+    parser.add_argument("--metrics", action="store_true",
+                        help="Add a metrics object (stage timings in ms, byte and cache counters) to the result")
+    parser.add_argument("--metrics-log", metavar="PATH",
+                        help="Append each command's metrics to a JSON-lines log")
+    parser.add_argument("--metrics-textfile", metavar="PATH",
+                        help="Keep the last metrics per client and command in a Prometheus textfile")
+    parser.add_argument("--ndjson", action="store_true",
+                        help="Write each pin as a JSON line as soon as it is extracted, "
+                             "then a status line (status, count, delta, metrics)")
+    parser.add_argument("--pages", type=int, default=1, metavar="N",
+                        help="Read up to N pages of max_pins (at most 50) pins each from Pinterest's "
+                             "resource endpoints and stream them as NDJSON, ending with a status line")
+    parser.add_argument("--page-token", metavar="TOKEN",
+                        help="Continue a paged fetch from the next_page_token of its status line")
+    parser.add_argument("--serve", action="store_true", help="Run as a resident daemon (see pinterest_client.py)")
+    parser.add_argument("--socket", help="Daemon socket path")
+    parser.add_argument("--idle-timeout", type=int, default=DAEMON_IDLE_TIMEOUT,
+                        help="Seconds without requests before the daemon exits")
+    return parser
+
+def parse_fetch_args(argv):
+    """Parse a fetch command line; None if argparse rejected it (details went to stderr)"""
+    try:
+        args, _ = build_arg_parser().parse_known_args(argv)
+        return args
+    except SystemExit:
+        return None
+
+INVALID_ARGUMENTS_RESULT = {
+    "data": [],
+    "error": "Script error: invalid arguments",
+    "status": "error"
+}
+
+def execute_fetch(args, metrics=None):
+    """Answer parsed arguments offline when possible, otherwise on the async core"""
+    metrics = metrics or Metrics()
+    try:
+        result = fetch_offline(args, metrics)
+    except Exception as e:
+        print(f"Offline answer failed, fetching instead: {e}", file=sys.stderr)
+        result = None
+    if result is not None:
+        return result
+
+    import pinterest_async
+    return pinterest_async.run(run_fetch_async(args, metrics))
+
+def fetch_offline(args, metrics):
+    """Answer without the network or an event loop, or return None.
+
+    Covers test data and cache hits (fresh, or stale within --max-stale,
+    which starts a background refresh) whose image work is already
+    settled: every --width choice known from remembered HEAD verdicts and
+    every --prefetch image in the local image cache.
+    """
+    if not args.command:
+        return create_safe_test_data(8)
+
+    max_pins = min(int(args.max_pins), MAX_PINS_ABSOLUTE)
+    if args.command == "test":
+        result = create_safe_test_data(max_pins)
+    elif args.no_cache or args.command.startswith("multi:"):
+        return None
+    else:
+        cache = FeedCache(ttl=args.cache_ttl, max_stale=args.max_stale)
+        entry = cache.get(args.command)
+        if not (entry and cache.covers(entry, max_pins)):
+            return None
+        fresh = cache.is_fresh(entry)
+        if not (fresh or cache.is_servable_stale(entry)):
+            return None
+        result = cached_result(entry, max_pins, "hit" if fresh else "stale")
+
+        if args.width > 0:
+            pins = pins_with_images(result)
+            choices = [known_image_variant(pin["images"]["orig"]["url"], args.width) for pin in pins]
+            if None in choices:
+                return None
+            apply_image_variants(pins, choices)
+
+        if args.prefetch > 0:
+            from pinterest_images import ImageCache
+
+            image_cache = ImageCache()
+            pins, urls = prefetch_urls(result, args.prefetch)
+            paths = {url: image_cache.get(url) for url in urls}
+            if None in paths.values():
+                return None
+            apply_local_images(pins, paths)
+
+        if fresh:
+            print(f"Serving {args.command} from cache", file=sys.stderr)
+            metrics.count("cache_hit")
+        else:
+            print(f"Serving stale {args.command} from cache, refreshing in the background", file=sys.stderr)
+            metrics.count("cache_stale")
+            cache.refresh_in_background(args.command, max_pins, refresh_fetch_args(args))
+
+    return finish_result(args, result, metrics)
+
+def finish_result(args, result, metrics):
+    """Steps every answer gets: saved-pin marks, the --delta snapshot, the pin count"""
+    if args.command and result["data"]:
+        mark_saved_pins(result)
+
+    if args.command and args.delta:
+        result["delta"] = record_delta(args, result["data"])
+
+    metrics.count("pins", len(result["data"]))
+    return result
+
+def record_delta(args, pins):
+    """The --delta object for pins against this client's snapshot, which pins then replace"""
+    snapshots = SnapshotStore()
+    previous = snapshots.get(args.client, args.command) or []
+    snapshots.put(args.client, args.command, [str(pin.get("id", "")) for pin in pins])
+    return compute_delta(previous, pins)
+
+def report_metrics(args, metrics):
+    """Write the --metrics-log/--metrics-textfile outputs; return the record if --metrics wants it inline"""
+    if not (args.metrics or args.metrics_log or args.metrics_textfile):
+        return None
+
+    record = metrics.to_dict()
+    labels = {"client": args.client, "command": args.command or ""}
+    if args.metrics_log:
+        append_jsonl(args.metrics_log, record, labels)
+    if args.metrics_textfile:
+        write_textfile(args.metrics_textfile, record, labels)
+    return record if args.metrics else None
+
+def render_fetch(args):
+    """Run parsed fetch arguments and return the JSON output line.
+
+    Serialisation is timed too, so --metrics is spliced into the already
+    serialised result rather than dumping it twice.
+    """
+    metrics = Metrics()
+    result = execute_fetch(args, metrics)
+    with metrics.timer("serialize"):
+        text = json.dumps(result, ensure_ascii=False)
+
+    record = report_metrics(args, metrics)
+    if record:
+        text = text[:-1] + ', "metrics": ' + json.dumps(record, ensure_ascii=False) + "}"
+    return text
+
+def stream_pages(args, out):
+    """Run a paged command line: pin lines as pages arrive, then the status line"""
+    import pinterest_async
+
+    metrics = Metrics()
+
+    async def runner():
+        session = pinterest_async.AsyncSession(timeout=args.deadline, metrics=metrics,
+                                               retries=args.retries, backoff=args.backoff)
+        return await stream_pages_async(session, args, out)
+
+    status = pinterest_async.run(runner())
+    record = report_metrics(args, metrics)
+    if record:
+        status["metrics"] = record
+    out.write(json.dumps(status, ensure_ascii=False) + "\n")
+
+def stream_fetch(args, out):
+    """Run a command line with --ndjson: pin lines as pins are extracted, then the status line"""
+    metrics = Metrics()
+    try:
+        result = fetch_offline(args, metrics)
+    except Exception as e:
+        print(f"Offline answer failed, fetching instead: {e}", file=sys.stderr)
+        result = None
+
+    try:
+        if result is not None:
+            # Already final (and --width/--prefetch/--delta applied)
+            stream = PinStream(out, len(result["data"]))
+            for pin in result["data"]:
+                if stream.accepts(pin):
+                    stream.emit(pin)
+        else:
+            import pinterest_async
+
+            result, stream = pinterest_async.run(stream_fetch_async(args, out, metrics))
+            if args.command and args.delta:
+                result["delta"] = record_delta(args, stream.pins)
+        count = len(stream.pins)
+    except Exception as e:
+        result = {"data": [], "error": f"Script error: {str(e)}", "status": "error"}
+        count = 0
+
+    status = {key: value for key, value in result.items() if key not in ("data", "validators")}
+    status = dict({"type": "status"}, **status, count=count)
+    record = report_metrics(args, metrics)
+    if record:
+        status["metrics"] = record
+    out.write(json.dumps(status, ensure_ascii=False) + "\n")
+
+def refresh_feed(args):
+    """Background refresh started by FeedCache.refresh_in_background: revalidate
+    and store one feed, print nothing, and remove the marker when done"""
+    import pinterest_async
+
+    async def runner():
+        session = pinterest_async.AsyncSession(timeout=args.deadline, retries=args.retries, backoff=args.backoff)
+        cache = FeedCache(ttl=args.cache_ttl, max_stale=0)
+        return await fetch_with_cache_async(session, args.command, min(int(args.max_pins), MAX_PINS_ABSOLUTE), cache)
+
     try:
-        if len(sys.argv) < 2:
+        result = pinterest_async.run(runner())
+        print(f"Refreshed {args.command}: {result.get('cache') or result.get('status')}", file=sys.stderr)
+    except Exception as e:
+        print(f"Feed refresh failed: {e}", file=sys.stderr)
+    finally:
+        if args.feed_marker and os.path.exists(args.feed_marker):
+            os.unlink(args.feed_marker)
+
+def write_fetch(argv, out):
+    """Run one fetch command line and write its output to out: one JSON line,
+    or for --ndjson and --pages/--page-token the pin lines and a status line"""
+    args = parse_fetch_args(argv)
+    if args is None:
+        out.write(json.dumps(INVALID_ARGUMENTS_RESULT, ensure_ascii=False) + "\n")
+    elif args.refresh_feed:
+        refresh_feed(args)
+    elif args.page_token or args.pages > 1:
+        stream_pages(args, out)
+    elif args.ndjson:
+        stream_fetch(args, out)
+    else:
+        out.write(render_fetch(args) + "\n")
+
+async def run_fetch_async(args, metrics=None, pin_sink=None):
+    """Async body of execute_fetch: every request of the command line shares one
+    event loop, one concurrency limit and the --deadline budget.
+
+    pin_sink, if given, receives each pin of a single-feed command as it is
+    extracted (see StreamingExtractor); multi: results are only final once
+    merged, so they do not use it.
+    """
+    import asyncio
+    import pinterest_async
+
+    try:
+        session = pinterest_async.AsyncSession(timeout=args.deadline, metrics=metrics,
+                                               retries=args.retries, backoff=args.backoff)
+        if args.command and not args.command.startswith("multi:"):
+            session.pin_sink = pin_sink
+
+        if not args.command:
             result = create_safe_test_data(8)
         else:
-            command = sys.argv[1]
-            max_pins = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+            command = args.command
+            max_pins = int(args.max_pins)
 
             # Absolute safety limits
             max_pins = min(max_pins, MAX_PINS_ABSOLUTE)
 
-            if command == "home_feed":
-                result = fetch_pinterest_home_feed_ultra_safe(max_pins)
+            if args.no_cache:
+                async def fetch(source, count):
+                    result = await fetch_command_async(session, source, count)
+                    result.pop("validators", None)
+                    return result
+            else:
+                cache = FeedCache(ttl=args.cache_ttl, max_stale=args.max_stale)
 
-            elif command == "test":
-                result = create_safe_test_data(max_pins)
+                async def fetch(source, count):
+                    return await fetch_with_cache_async(session, source, count, cache, refresh_fetch_args(args))
 
-            elif command.startswith("search:"):
-                # Format: search:query
-                query = command[7:]  # Remove "search:" prefix
-                if query:
-                    result = fetch_pinterest_search(query, max_pins)
-                else:
-                    result = create_safe_test_data(max_pins, "search")
-
-            elif command.startswith("board:"):
-                # Format: board:username:boardname
-                parts = command[6:].split(':', 1)  # Remove "board:" and split once
-                if len(parts) == 2:
-                    username, board_name = parts
-                    result = fetch_user_board_pins(username, board_name, max_pins)
+            if command == "test":
+                result = create_safe_test_data(max_pins)
+            elif command.startswith("multi:"):
+                # Format: multi:source|source|... (each source in any single-feed format)
+                sources = list(dict.fromkeys(src.strip() for src in command[6:].split("|") if src.strip()))
+                if sources:
+                    result = await fetch_multi_source_async(sources, max_pins, fetch)
                 else:
-                    result = create_safe_test_data(max_pins, "board")
-
+                    result = create_safe_test_data(max_pins)
             else:
-                # Assume it's a username
-                result = fetch_user_pins_ultra_safe(command, max_pins)
+                result = await fetch(command, max_pins)
 
         # Ensure we always return valid JSON
         if not isinstance(result, dict):
@@ -409,16 +1757,308 @@ def main():
         if "data" not in result:
             result["data"] = []
 
-        print(json.dumps(result, ensure_ascii=False))
+        # Optional extras: running out of time skips them, not the pins.
+        # Placeholder pins are not worth any network.
+        try:
+            if args.command and result["data"] and not is_placeholder(result):
+                if args.width > 0:
+                    with session.metrics.timer("image_variants"):
+                        await select_image_variants(session, result, args.width)
+
+                if args.prefetch > 0:
+                    with session.metrics.timer("image_prefetch"):
+                        await attach_local_images(session, result, args.prefetch)
+        except asyncio.TimeoutError:
+            print(f"Deadline of {args.deadline}s reached, skipping image work", file=sys.stderr)
+
+        return finish_result(args, result, session.metrics)
 
     except Exception as e:
         # Absolute fallback
-        error_result = {
+        return {
             "data": [],
             "error": f"Script error: {str(e)}",
             "status": "error"
         }
-        print(json.dumps(error_result))
+
+class PinStream:
+    """--ndjson writer: one {"type": "pin", "pin": {...}} line per pin, flushed at once.
+
+    Each pin ID is written once and at most max_pins pins are written, in
+    the order they arrive. Pins passed in are never mutated, since they may
+    also sit in the cache.
+    """
+
+    def __init__(self, out, max_pins, width=0, session=None):
+        """
+        Args:
+            out: Text stream the lines go to
+            max_pins (int): Pins to write at most
+            width (int): --width; each pin's image variant is chosen before
+                it is written (needs session for the HEAD checks)
+            session (AsyncSession, optional): Session of the running command
+        """
+        self.out = out
+        self.max_pins = max_pins
+        self.width = width
+        self.session = session
+        self.saved = _saved_index.saved_ids()
+        self.pins = []  # what was written, for --delta and the count
+        self._ids = set()
+        self._queue = None
+
+    def accepts(self, pin):
+        """Claim pin's ID if it still gets written"""
+        pin_id = str(pin.get("id", ""))
+        if pin_id in self._ids or len(self._ids) >= self.max_pins:
+            return False
+        self._ids.add(pin_id)
+        return True
+
+    def emit(self, pin):
+        """Write an accepted pin (with its saved mark)"""
+        if str(pin.get("id", "")) in self.saved:
+            pin = dict(pin, saved=True)
+        self.out.write(json.dumps({"type": "pin", "pin": pin}, ensure_ascii=False) + "\n")
+        self.out.flush()
+        self.pins.append(pin)
+
+    async def add(self, pin):
+        """Write pin if it is new, after choosing its --width variant"""
+        if not self.accepts(pin):
+            return
+        url = pin.get("images", {}).get("orig", {}).get("url")
+        if self.width > 0 and url:
+            try:
+                choice = await choose_image_variant(self.session, url, self.width)
+                pin = dict(pin)
+                apply_image_variants([pin], [choice])
+            except Exception as e:
+                print(f"Image size check failed for {url}: {e}", file=sys.stderr)
+        self.emit(pin)
+
+    def sink(self, pin):
+        """Thread-safe entry for the extraction thread (AsyncSession.pin_sink)"""
+        try:
+            self.session.loop.call_soon_threadsafe(self._queue.put_nowait, pin)
+        except RuntimeError:
+            pass  # the loop is closed: an abandoned extraction finished late
+
+    async def drain(self):
+        """Write pins handed to sink() until close()"""
+        import asyncio
+
+        self._queue = asyncio.Queue()
+        while True:
+            pin = await self._queue.get()
+            if pin is None:
+                return
+            await self.add(pin)
+
+    def close(self):
+        self.session.loop.call_soon_threadsafe(self._queue.put_nowait, None)
+
+async def stream_fetch_async(args, out, metrics):
+    """--ndjson body of run_fetch_async; returns (result, PinStream).
+
+    JSON state pins are written while the page is still being read; HTML
+    card pins only once the page has ended without any (see
+    StreamingExtractor), so the pins written are those of the JSON result.
+    What the final result adds afterwards (cache hits, multi: merges)
+    follows. --prefetch is not applied; readers load the images themselves.
+    """
+    import asyncio
+    import pinterest_async
+
+    max_pins = min(int(args.max_pins), MAX_PINS_ABSOLUTE)
+    session = pinterest_async.AsyncSession(timeout=args.deadline, metrics=metrics,
+                                           retries=args.retries, backoff=args.backoff)
+    stream = PinStream(out, max_pins, args.width, session)
+    writer = asyncio.ensure_future(stream.drain())
+    await asyncio.sleep(0)  # let drain() create its queue
+
+    # Image work happens per written pin, and --delta covers what was written
+    fetch_args = argparse.Namespace(**dict(vars(args), width=0, prefetch=0, delta=False))
+    try:
+        result = await run_fetch_async(fetch_args, metrics, pin_sink=stream.sink)
+    finally:
+        stream.close()
+        await writer
+
+    # Placeholders only stand in when nothing real was written
+    if not (stream.pins and is_placeholder(result)):
+        for pin in result["data"]:
+            await stream.add(pin)
+    elif stream.pins:
+        result["status"] = "partial"
+
+    if stream.width > 0:
+        save_variant_checks()
+    return result, stream
+
+# The stderr stream of the daemon request being handled, if any; worker
+# threads and event loops started for the request inherit it
+_request_stderr = contextvars.ContextVar("request_stderr", default=None)
+
+class RequestStderr:
+    """sys.stderr in the daemon: writes go to the current request's reply
+    (see _request_stderr), or to the daemon's own stderr outside a request"""
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+
+    def write(self, text):
+        return (_request_stderr.get() or self.fallback).write(text)
+
+    def flush(self):
+        (_request_stderr.get() or self.fallback).flush()
+
+    def __getattr__(self, name):
+        return getattr(self.fallback, name)
+
+class DaemonReply:
+    """Sends one request's output to the client as JSON lines while it is
+    written: {"stdout": ...} and {"stderr": ...} pieces, then {"exit_code": ...}"""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.lock = threading.Lock()  # the request's threads write concurrently
+        self.closed = False
+
+    def send(self, message):
+        data = (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+        with self.lock:
+            if self.closed:
+                return
+            try:
+                self.wfile.write(data)
+                self.wfile.flush()
+            except OSError:
+                # The client went away; the request still runs to its end
+                self.closed = True
+
+    def stream(self, name):
+        return ReplyStream(self, name)
+
+class ReplyStream:
+    """File-like writer for one of a DaemonReply's output streams"""
+
+    def __init__(self, reply, name):
+        self.reply = reply
+        self.name = name
+
+    def write(self, text):
+        if text:
+            self.reply.send({self.name: text})
+        return len(text)
+
+    def flush(self):
+        pass
+
+def handle_daemon_request(request, reply):
+    """Run one client request, sending its output through reply as the script
+    would print it; returns the exit code"""
+    script = request.get("script", "fetch")
+    argv = [str(arg) for arg in request.get("argv", [])]
+    out = reply.stream("stdout")
+    token = _request_stderr.set(reply.stream("stderr"))
+
+    try:
+        if script == "save":
+            import save_pinterest_pin
+
+            try:
+                return save_pinterest_pin.main(argv, out=out) or 0
+            except SystemExit as e:
+                return e.code if isinstance(e.code, int) else 1
+
+        # --ndjson and paged pin lines reach the client as they are written
+        write_fetch(argv, out)
+        return 0
+    finally:
+        _request_stderr.reset(token)
+
+def serve(socket_path, idle_timeout=DAEMON_IDLE_TIMEOUT):
+    """Serve JSON-lines requests on a Unix socket until idle for idle_timeout seconds"""
+    import socket
+    import socketserver
+    from pinterest_client import check_daemon_peer
+
+    # Another daemon of ours already answering? Then there is nothing to do.
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except OSError:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+    else:
+        try:
+            check_daemon_peer(probe)
+            print(f"Daemon already running on {socket_path}", file=sys.stderr)
+        except OSError as e:
+            print(f"Not serving on {socket_path}: {e}", file=sys.stderr)
+        return
+    finally:
+        probe.close()
+
+    last_activity = [time.time()]
+
+    class RequestHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            last_activity[0] = time.time()
+            reply = DaemonReply(self.wfile)
+            try:
+                request = json.loads(self.rfile.readline().decode("utf-8"))
+                exit_code = handle_daemon_request(request, reply)
+            except Exception as e:
+                reply.send({"stderr": f"Daemon error: {e}\n"})
+                exit_code = 1
+            reply.send({"exit_code": exit_code})
+            last_activity[0] = time.time()
+
+    class DaemonServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+    server = DaemonServer(socket_path, RequestHandler)
+    os.chmod(socket_path, 0o600)
+    sys.stderr = RequestStderr(sys.stderr)
+
+    def idle_watchdog():
+        while time.time() - last_activity[0] < idle_timeout:
+            time.sleep(min(30, idle_timeout))
+        server.shutdown()
+
+    threading.Thread(target=idle_watchdog, daemon=True).start()
+    print(f"Pinterest fetch daemon listening on {socket_path}", file=sys.stderr)
+
+    try:
+        # Warm the expensive bits before the first request arrives: the
+        # lazily imported requests and asyncio, and the compiled patterns
+        import pinterest_async  # noqa: F401
+        pinterest_http.get_session()
+        extraction_context()
+        load_pinterest_session()
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+def main():
+    """Enhanced main function with search and board support"""
+    if "--serve" in sys.argv[1:]:
+        from pinterest_client import default_socket_path
+
+        args, _ = build_arg_parser().parse_known_args()
+        try:
+            socket_path = args.socket or default_socket_path()
+        except OSError as e:
+            print(f"No usable socket directory: {e}", file=sys.stderr)
+            sys.exit(1)
+        serve(socket_path, args.idle_timeout)
+        return
+
+    write_fetch(sys.argv[1:], sys.stdout)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Pinterest Widget Async Core
+asyncio front end to the shared pinterest_http session: requests run on
+daemon threads while coroutines await them under a concurrency limit,
+per-request timeouts and an overall deadline, and can be cancelled
+"""
+
+import asyncio
+import contextvars
+import functools
+import sys
+import threading
+from concurrent.futures import Executor, Future
+
+import pinterest_http
+from pinterest_metrics import Metrics
+
+# Requests in flight at once for one fetch (the pool still caps each host)
+MAX_CONCURRENT_REQUESTS = 2 * pinterest_http.PER_HOST_CONNECTIONS
+
+class DaemonThreadExecutor(Executor):
+    """Run each call on its own daemon thread.
+
+    A blocking request cannot be interrupted, so once a coroutine gives up
+    on it the thread is simply abandoned; being a daemon it never delays
+    the process exit (ThreadPoolExecutor workers are joined at exit). The
+    call runs in a copy of the caller's context, as asyncio.to_thread does.
+    """
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = Future()
+        context = contextvars.copy_context()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(context.run(fn, *args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, daemon=True).start()
+        return future
+
+_executor = DaemonThreadExecutor()
+
+def _close_result(future):
+    """Done callback for abandoned calls: close whatever response they produced"""
+    if future.cancelled() or future.exception() is not None:
+        return
+    close = getattr(future.result(), "close", None)
+    if close:
+        try:
+            close()
+        except Exception:
+            pass
+
+class AsyncSession:
+    def __init__(self, limit=MAX_CONCURRENT_REQUESTS, timeout=None, metrics=None, retries=None, backoff=None):
+        """
+        Initialize an async session for one fetch
+
+        Must be created inside the event loop it is used from.
+
+        Args:
+            limit (int): Requests allowed in flight at once
+            timeout (float, optional): Overall deadline in seconds from now;
+                no request or blocking call outlives it
+            metrics (Metrics, optional): Where the fetch steps record their
+                timings and counters; a private one by default
+            retries (int, optional): Retries per request (pinterest_http's
+                default if None)
+            backoff (float, optional): Retry backoff factor, likewise
+        """
+        self.loop = asyncio.get_running_loop()
+        self.metrics = metrics or Metrics()
+        # Called from the extraction thread with each pin as it is found (--ndjson)
+        self.pin_sink = None
+        self.semaphore = asyncio.Semaphore(limit)
+        self.deadline = self.loop.time() + timeout if timeout else None
+        self.retries = retries
+        self.backoff = backoff
+
+    def remaining(self, timeout=None):
+        """Seconds left for a step: timeout capped by the overall deadline"""
+        if self.deadline is None:
+            return timeout
+        left = self.deadline - self.loop.time()
+        if left <= 0:
+            raise asyncio.TimeoutError("overall deadline exceeded")
+        return left if timeout is None else min(timeout, left)
+
+    async def run_blocking(self, fn, *args, timeout=None, **kwargs):
+        """Await fn(*args, **kwargs) on a daemon thread.
+
+        Raises asyncio.TimeoutError past timeout or the overall deadline. On
+        timeout or cancellation the call keeps running, and any response it
+        returns is closed unread.
+        """
+        timeout = self.remaining(timeout)
+        call = _executor.submit(functools.partial(fn, *args, **kwargs))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(call), timeout)
+        except asyncio.TimeoutError:
+            call.add_done_callback(_close_result)
+            raise asyncio.TimeoutError(f"timed out after {timeout:.1f}s") from None
+        except BaseException:
+            call.add_done_callback(_close_result)
+            raise
+
+    async def request(self, method, url, **kwargs):
+        """Send a request through the shared pooled session"""
+        timeout = self.remaining(kwargs.pop("timeout", pinterest_http.DEFAULT_TIMEOUT_SECONDS))
+        # requests' timeout is per socket operation; wait_for bounds the total
+        call = functools.partial(pinterest_http.request, method, url, timeout=timeout,
+                                 retries=self.retries, backoff=self.backoff, **kwargs)
+
+        async with self.semaphore:
+            return await self.run_blocking(call, timeout=timeout)
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def head(self, url, **kwargs):
+        return await self.request("HEAD", url, **kwargs)
+
+async def first_completed(coros, accept, timeout=None):
+    """Run coros concurrently and return the first result accept() takes.
+
+    The rest are cancelled as soon as one is accepted. Returns None if none
+    is accepted before they all finish or timeout runs out.
+    """
+    loop = asyncio.get_running_loop()
+    end = loop.time() + timeout if timeout is not None else None
+    pending = {asyncio.ensure_future(coro) for coro in coros}
+
+    try:
+        while pending:
+            wait = None if end is None else max(0, end - loop.time())
+            done, pending = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                return None  # timed out
+
+            for task in done:
+                if task.exception() is not None:
+                    print(f"Concurrent attempt failed: {task.exception()}", file=sys.stderr)
+                elif accept(task.result()):
+                    return task.result()
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
+
+def run(coro):
+    """Run a coroutine to completion from synchronous code"""
+    return asyncio.run(coro)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Pinterest Widget Board Directory
+Caches the account's board list under ~/.cache so board names can be
+resolved to IDs without a request, refreshing stale lists in the background
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+from pinterest_cache import CACHE_ROOT, write_json_atomic
+
+BOARDS_CACHE_PATH = os.path.join(CACHE_ROOT, "boards.json")
+SAVE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "save_pinterest_pin.py")
+
+# A board list younger than this is used as is; older ones are served and refreshed
+BOARD_CACHE_TTL_SECONDS = 6 * 3600
+# Safety bound on bookmark pagination
+BOARD_MAX_PAGES = 20
+# A background refresh marker older than this is considered dead
+REFRESH_MARKER_SECONDS = 120
+
+def board_summary(board):
+    """Keep the fields the directory needs from a BoardsResource board"""
+    return {
+        "id": str(board["id"]),
+        "name": board.get("name") or "",
+        "url": board.get("url") or "",
+        "privacy": board.get("privacy"),
+        "pin_count": board.get("pin_count"),
+    }
+
+def board_slug(name):
+    """URL form of a board name ("My Recipes" -> "my-recipes")"""
+    return name.strip().lower().replace(" ", "-")
+
+class BoardDirectory:
+    def __init__(self, saver=None, path=BOARDS_CACHE_PATH, ttl=BOARD_CACHE_TTL_SECONDS):
+        """
+        Initialize the board directory
+
+        Args:
+            saver (PinterestPinSaver, optional): Used to fetch board pages;
+                without it the directory only reads the cache
+            path (str): Board list cache file
+            ttl (int): Seconds a cached list is used without refreshing
+        """
+        self.saver = saver
+        self.path = path
+        self.ttl = ttl
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(cached, dict) or not isinstance(cached.get("boards"), list):
+            return None
+        return cached
+
+    def fetch_all(self):
+        """Fetch every board page, following bookmarks; raises on request errors"""
+        boards = {}
+        bookmark = None
+
+        for _ in range(BOARD_MAX_PAGES):
+            page = self.saver.get_boards(bookmark=bookmark)
+            if "error" in page:
+                raise RuntimeError(page["error"])
+
+            resource_response = page.get("resource_response") or {}
+            data = resource_response.get("data") or []
+            for board in data:
+                if isinstance(board, dict) and board.get("id"):
+                    boards.setdefault(str(board["id"]), board_summary(board))
+
+            bookmark = resource_response.get("bookmark")
+            if not bookmark:
+                bookmarks = ((page.get("resource") or {}).get("options") or {}).get("bookmarks") or [None]
+                bookmark = bookmarks[0]
+            if not data or not bookmark or bookmark == "-end-":
+                break
+
+        return list(boards.values())
+
+    def refresh(self):
+        """Fetch the full board list and store it; returns the boards"""
+        boards = self.fetch_all()
+        try:
+            write_json_atomic(self.path, {"fetched_at": time.time(), "boards": boards})
+        except OSError as e:
+            print(f"Board cache write error: {e}", file=sys.stderr)
+        return boards
+
+    def refresh_in_background(self):
+        """Refresh in a detached process unless one is already running"""
+        marker = self.path + ".refresh"
+        try:
+            if time.time() - os.stat(marker).st_mtime < REFRESH_MARKER_SECONDS:
+                return
+            os.unlink(marker)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(marker), exist_ok=True)
+            os.close(os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600))
+        except OSError:
+            return  # another process just started one
+
+        try:
+            subprocess.Popen(
+                [sys.executable, SAVE_SCRIPT, "--refresh-boards", f"--boards-marker={marker}"],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+                close_fds=True
+            )
+        except OSError as e:
+            print(f"Could not start board refresh: {e}", file=sys.stderr)
+            os.unlink(marker)
+
+    def boards(self, offline=False):
+        """Return the board list: cached if fresh, cached plus a background
+        refresh if stale, fetched now if there is no cache (unless offline)"""
+        cached = self._read()
+
+        if cached is not None:
+            if time.time() - cached.get("fetched_at", 0) >= self.ttl and self.saver and not offline:
+                self.refresh_in_background()
+            return cached["boards"]
+
+        if self.saver is None or offline:
+            return []
+        return self.refresh()
+
+    def resolve(self, name, offline=False):
+        """Return the board ID for a board name, slug or ID, or None.
+
+        A name missing from a cached list triggers one synchronous refresh
+        (the board may be new) unless offline is set.
+        """
+        was_cached = self._read() is not None
+        try:
+            board = self._find(self.boards(offline), name)
+        except RuntimeError as e:
+            print(f"Board list fetch failed: {e}", file=sys.stderr)
+            return None
+        if board is None and was_cached and not offline and self.saver is not None:
+            try:
+                board = self._find(self.refresh(), name)
+            except RuntimeError as e:
+                print(f"Board refresh failed: {e}", file=sys.stderr)
+        return board["id"] if board else None
+
+    def _find(self, boards, name):
+        wanted = name.strip()
+        for match in (
+            lambda board: board["id"] == wanted,
+            lambda board: board["name"] == wanted,
+            lambda board: board["name"].lower() == wanted.lower(),
+            lambda board: board["url"].rstrip("/").rsplit("/", 1)[-1] == board_slug(wanted),
+        ):
+            for board in boards:
+                if match(board):
+                    return board
+        return None
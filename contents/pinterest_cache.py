@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Pinterest Widget Feed Cache
+Stores extracted pins per feed command under ~/.cache so refreshes can be
+served without network, or revalidated with a conditional GET; stale
+entries are served while a background process refreshes them. Pins are
+stored as a packed table (pinterest_records) after the entry's JSON fields
+"""
+
+import hashlib
+import json
+import os
+import struct
+import sys
+import tempfile
+import time
+
+from pinterest_lease import FeedLease
+from pinterest_records import PinRecord, pack_pins, unpack_pins
+
+CACHE_ROOT = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "pinterest_widget"
+)
+FEED_CACHE_DIR = os.path.join(CACHE_ROOT, "feeds")
+
+# Entries younger than this are served without touching the network
+DEFAULT_TTL_SECONDS = 240
+# For this long past the TTL an entry is still served at once, while a
+# detached process refreshes it for the next call
+DEFAULT_MAX_STALE_SECONDS = 7 * 24 * 3600
+# A background refresh marker older than this is considered dead
+REFRESH_MARKER_SECONDS = 120
+FETCH_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fetchpinterest.py")
+# Size bound for the whole feed cache; oldest entries are evicted first
+MAX_CACHE_BYTES = 4 * 1024 * 1024
+MAX_CACHE_ENTRIES = 64
+# Entry files: u32 length, the entry's JSON without result.data, then the pin table
+ENTRY_SUFFIX = ".pins"
+ENTRY_HEADER_FORMAT = "<I"
+# Entries written as plain JSON by earlier versions; only evicted now
+LEGACY_ENTRY_SUFFIX = ".json"
+
+def cache_key(command):
+    """Stable file name for a feed command (home_feed, search:q, user, board:u:b)"""
+    return hashlib.sha1(command.encode("utf-8")).hexdigest()
+
+def write_json_atomic(path, data):
+    """Write JSON via a temp file + rename so concurrent readers never see partial files"""
+    write_bytes_atomic(path, json.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+def write_bytes_atomic(path, data):
+    """Write bytes via a temp file + rename so concurrent readers never see partial files"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+def encode_entry(entry):
+    """Entry file bytes: the JSON fields, then result.data as a pin table"""
+    result = dict(entry["result"])
+    pins = result.pop("data", [])
+    fields = json.dumps(dict(entry, result=result), ensure_ascii=False).encode("utf-8")
+    return struct.pack(ENTRY_HEADER_FORMAT, len(fields)) + fields + pack_pins(pins)
+
+def decode_entry(data):
+    """Inverse of encode_entry; result.data holds PinRecords. Raises ValueError if damaged"""
+    header = struct.calcsize(ENTRY_HEADER_FORMAT)
+    if len(data) < header:
+        raise ValueError("truncated cache entry")
+    (length,) = struct.unpack_from(ENTRY_HEADER_FORMAT, data, 0)
+    entry = json.loads(data[header:header + length].decode("utf-8"))
+    if not isinstance(entry, dict) or not isinstance(entry.get("result"), dict):
+        raise ValueError("cache entry without a result")
+    entry["result"]["data"] = unpack_pins(memoryview(data)[header + length:])
+    return entry
+
+class FeedCache:
+    def __init__(self, directory=FEED_CACHE_DIR, ttl=DEFAULT_TTL_SECONDS,
+                 max_bytes=MAX_CACHE_BYTES, max_entries=MAX_CACHE_ENTRIES,
+                 max_stale=DEFAULT_MAX_STALE_SECONDS):
+        """
+        Initialize the feed cache
+
+        Args:
+            directory (str): Where entries are stored, one file per command
+            ttl (int): Seconds an entry is served without revalidation
+            max_bytes (int): Total size bound enforced after every write
+            max_entries (int): Entry count bound enforced after every write
+            max_stale (int): Seconds past the TTL an entry is still served
+                while it is refreshed in the background (0 turns this off)
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+    def _path(self, command):
+        return os.path.join(self.directory, cache_key(command) + ENTRY_SUFFIX)
+
+    def get(self, command):
+        """Return the cached entry for a command, or None.
+
+        The entry's result.data holds PinRecords; cached_result() turns the
+        pins it serves back into dicts.
+        """
+        path = self._path(command)
+        try:
+            with open(path, "rb") as f:
+                entry = decode_entry(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Dropping unreadable cache entry {path}: {e}", file=sys.stderr)
+            self._remove(path)
+            return None
+
+        if entry.get("command") != command:
+            return None
+        return entry
+
+    def lease(self, command):
+        """The cross-process lease on fetching command (see FeedLease)"""
+        return FeedLease(self._path(command) + ".lease")
+
+    def is_fresh(self, entry):
+        return time.time() - entry.get("fetched_at", 0) < self.ttl
+
+    def is_servable_stale(self, entry):
+        """True if a stale entry may be served while it is refreshed"""
+        return time.time() - entry.get("fetched_at", 0) < self.ttl + self.max_stale
+
+    def covers(self, entry, max_pins):
+        """True if the entry was fetched with at least max_pins requested"""
+        return entry.get("max_pins", 0) >= max_pins
+
+    def put(self, command, max_pins, result, validators=None):
+        """Store a successful fetch result with its HTTP validators"""
+        validators = validators or {}
+        entry = {
+            "command": command,
+            "max_pins": max_pins,
+            "fetched_at": time.time(),
+            "url": validators.get("url"),
+            "etag": validators.get("etag"),
+            "last_modified": validators.get("last_modified"),
+            "result": result,
+        }
+
+        try:
+            write_bytes_atomic(self._path(command), encode_entry(entry))
+            self.evict()
+        except OSError as e:
+            print(f"Cache write error: {e}", file=sys.stderr)
+
+        return entry
+
+    def touch(self, command, entry):
+        """Mark an entry fresh again after a 304 Not Modified"""
+        entry["fetched_at"] = time.time()
+        try:
+            write_bytes_atomic(self._path(command), encode_entry(entry))
+        except OSError as e:
+            print(f"Cache write error: {e}", file=sys.stderr)
+
+    def refresh_in_background(self, command, max_pins, fetch_args=()):
+        """Refetch command in a detached process unless one is already running.
+
+        The process runs fetchpinterest.py --refresh-feed, which revalidates
+        and stores the entry (and removes the marker) without printing a
+        result; fetch_args are passed on to it.
+        """
+        import subprocess
+
+        marker = self._path(command) + ".refresh"
+        try:
+            if time.time() - os.stat(marker).st_mtime < REFRESH_MARKER_SECONDS:
+                return
+            os.unlink(marker)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            os.close(os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600))
+        except OSError:
+            return  # another process just started one
+
+        try:
+            subprocess.Popen(
+                [sys.executable, FETCH_SCRIPT, command, str(max_pins), "--refresh-feed",
+                 f"--feed-marker={marker}", f"--cache-ttl={self.ttl}"] + list(fetch_args),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+                close_fds=True
+            )
+        except OSError as e:
+            print(f"Could not start feed refresh: {e}", file=sys.stderr)
+            os.unlink(marker)
+
+    def evict(self):
+        """Drop the least recently written entries until within size bounds"""
+        try:
+            files = []
+            for name in os.listdir(self.directory):
+                if not name.endswith((ENTRY_SUFFIX, LEGACY_ENTRY_SUFFIX)):
+                    continue
+                path = os.path.join(self.directory, name)
+                stat = os.stat(path)
+                files.append((stat.st_mtime, stat.st_size, path))
+        except OSError:
+            return
+
+        files.sort()
+        total = sum(size for _, size, _ in files)
+
+        while files and (total > self.max_bytes or len(files) > self.max_entries):
+            _, size, path = files.pop(0)
+            self._remove(path)
+            self._remove(path + ".lease")
+            total -= size
+
+    def _remove(self, path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+def cached_result(entry, max_pins, cache_state):
+    """Rebuild a fetch result from a cache entry"""
+    result = dict(entry["result"])
+    result["data"] = [pin.to_dict() if isinstance(pin, PinRecord) else pin
+                      for pin in result.get("data", [])[:max_pins]]
+    result["cache"] = cache_state
+    return result
+
+def conditional_headers(headers, entry, url):
+    """Add If-None-Match / If-Modified-Since when the entry was fetched from url"""
+    if not entry or entry.get("url") != url:
+        return headers
+
+    headers = dict(headers)
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+def response_validators(response, url):
+    """Collect the validators a later conditional GET can send"""
+    return {
+        "url": url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Pinterest Widget Client
+Thin front end for the resident fetch daemon. Takes the same command line
+as fetchpinterest.py (or save_pinterest_pin.py after --save) and forwards
+it over a Unix socket, so the widget does not pay for a fresh interpreter,
+the requests import and a new TLS handshake on every refresh.
+"""
+
+import json
+import os
+import socket
+import stat
+import struct
+import subprocess
+import sys
+import tempfile
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+FETCH_SCRIPT = os.path.join(SCRIPT_DIR, "fetchpinterest.py")
+SAVE_SCRIPT = os.path.join(SCRIPT_DIR, "save_pinterest_pin.py")
+
+# Longer than the slowest fetch path, shorter than the widget giving up
+CLIENT_TIMEOUT_SECONDS = 60
+
+def private_runtime_dir():
+    """$XDG_RUNTIME_DIR, or else a 0700 directory of this user's in the temp directory.
+
+    Raises PermissionError if the latter path is a symlink, another user's
+    directory or open to others: anyone can create it there first.
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return runtime_dir
+
+    path = os.path.join(tempfile.gettempdir(), f"pinterest_widget-{os.getuid()}")
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"{path} is not a private directory of this user")
+    return path
+
+def default_socket_path():
+    """Per-user socket path, overridable with PINTEREST_WIDGET_SOCKET"""
+    override = os.environ.get("PINTEREST_WIDGET_SOCKET")
+    if override:
+        return override
+    return os.path.join(private_runtime_dir(), "pinterest_widget.sock")
+
+def check_daemon_peer(sock):
+    """Raise PermissionError unless the process listening on sock runs as this user"""
+    if hasattr(socket, "SO_PEERCRED"):
+        credentials = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        _, uid, _ = struct.unpack("3i", credentials)
+    else:
+        uid = os.stat(sock.getpeername()).st_uid
+    if uid != os.getuid():
+        raise PermissionError(f"socket is served by uid {uid}, not this user")
+
+def request_daemon(script, argv, socket_path=None, timeout=CLIENT_TIMEOUT_SECONDS, out=None, err=None):
+    """Send one request to the daemon and return its exit code.
+
+    The script's output is copied to out and err (sys.stdout and sys.stderr
+    by default) as the daemon sends it, so --ndjson and paged pin lines
+    arrive while the fetch is still running.
+
+    Raises FileNotFoundError or ConnectionRefusedError if no daemon is
+    listening, and PermissionError if the socket belongs to another user;
+    nothing was sent then. Any other OSError or ValueError means the daemon
+    may already have run the request.
+    """
+    out = out or sys.stdout
+    err = err or sys.stderr
+    request = json.dumps({"script": script, "argv": argv}) + "\n"
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path or default_socket_path())
+        check_daemon_peer(sock)
+        sock.sendall(request.encode("utf-8"))
+
+        # One JSON object per line: "stdout" and "stderr" pieces, then "exit_code"
+        with sock.makefile("rb") as replies:
+            for line in replies:
+                message = json.loads(line.decode("utf-8"))
+                if "stderr" in message:
+                    err.write(message["stderr"])
+                    err.flush()
+                if "stdout" in message:
+                    out.write(message["stdout"])
+                    out.flush()
+                if "exit_code" in message:
+                    return message["exit_code"]
+
+    raise ValueError("daemon closed the connection before the request finished")
+
+def start_daemon(socket_path=None):
+    """Start a detached daemon; it exits by itself after an idle period"""
+    subprocess.Popen(
+        [sys.executable, FETCH_SCRIPT, "--serve", f"--socket={socket_path or default_socket_path()}"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        close_fds=True
+    )
+
+def main():
+    argv = sys.argv[1:]
+
+    if argv[:1] == ["--save"]:
+        script, target, argv = "save", SAVE_SCRIPT, argv[1:]
+        if "--stdin" in argv:
+            # The daemon cannot read our stdin: pass the IDs as arguments
+            argv = [arg for arg in argv if arg != "--stdin"] + ["--json"] + sys.stdin.read().split()
+    else:
+        script, target = "fetch", FETCH_SCRIPT
+
+    try:
+        exit_code = request_daemon(script, argv)
+    except PermissionError as e:
+        # Not a daemon of ours: never send it anything, just run the script
+        print(f"Not using fetch daemon socket: {e}", file=sys.stderr)
+        os.execv(sys.executable, [sys.executable, target] + argv)
+    except (FileNotFoundError, ConnectionRefusedError):
+        # No daemon yet: start one for the next call and answer this one
+        # by running the real script, which keeps the CLI contract intact
+        try:
+            start_daemon()
+        except OSError as e:
+            print(f"Could not start fetch daemon: {e}", file=sys.stderr)
+        os.execv(sys.executable, [sys.executable, target] + argv)
+    except (OSError, ValueError) as e:
+        # The daemon took the request, so running the script again could
+        # repeat it (a second RepinResource POST for saves)
+        print(f"Fetch daemon request failed: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    sys.exit(exit_code)
+
+if __name__ == "__main__":
+    main()
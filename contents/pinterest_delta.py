@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Pinterest Widget Feed Deltas
+Remembers which pin IDs each widget was last given per feed, so a refresh
+can be described as added / removed / unchanged pins and the widget can
+patch its model instead of rebuilding it
+"""
+
+import json
+import os
+import sys
+import time
+
+from pinterest_cache import CACHE_ROOT, cache_key, write_json_atomic
+
+SNAPSHOT_DIR = os.path.join(CACHE_ROOT, "snapshots")
+
+# One snapshot per (client, feed); the least recently written are dropped beyond this
+MAX_SNAPSHOTS = 64
+
+class SnapshotStore:
+    def __init__(self, directory=SNAPSHOT_DIR, max_entries=MAX_SNAPSHOTS):
+        """
+        Initialize the snapshot store
+
+        Args:
+            directory (str): Where snapshots are stored, one JSON file per client and feed
+            max_entries (int): Snapshot count bound enforced after every write
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+
+    def _path(self, client, command):
+        return os.path.join(self.directory, cache_key(f"{client}\n{command}") + ".json")
+
+    def get(self, client, command):
+        """Return the pin IDs last sent to client for command, or None"""
+        try:
+            with open(self._path(client, command), "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(snapshot, dict):
+            return None
+        if snapshot.get("client") != client or snapshot.get("command") != command:
+            return None
+        ids = snapshot.get("ids")
+        return ids if isinstance(ids, list) else None
+
+    def put(self, client, command, ids):
+        """Record the pin IDs just sent to client for command"""
+        snapshot = {
+            "client": client,
+            "command": command,
+            "updated_at": time.time(),
+            "ids": list(ids),
+        }
+
+        try:
+            write_json_atomic(self._path(client, command), snapshot)
+            self.evict()
+        except OSError as e:
+            print(f"Snapshot write error: {e}", file=sys.stderr)
+
+    def evict(self):
+        """Drop the least recently written snapshots beyond max_entries"""
+        try:
+            files = []
+            for name in os.listdir(self.directory):
+                if name.endswith(".json"):
+                    path = os.path.join(self.directory, name)
+                    files.append((os.stat(path).st_mtime, path))
+        except OSError:
+            return
+
+        files.sort()
+        for _, path in files[:max(0, len(files) - self.max_entries)]:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+def compute_delta(previous_ids, pins):
+    """Describe how pins differs from the previously sent ID list.
+
+    Positions refer to the previous list ("from") and to pins ("index" /
+    "to"). Applying the removals, then placing every pin at its new index,
+    turns the old list into the new one.
+    """
+    old_positions = {}
+    for position, pin_id in enumerate(previous_ids):
+        old_positions.setdefault(pin_id, position)
+
+    new_ids = [str(pin.get("id", "")) for pin in pins]
+
+    added = []
+    unchanged = []
+    for index, pin_id in enumerate(new_ids):
+        if pin_id in old_positions:
+            unchanged.append({"id": pin_id, "from": old_positions.pop(pin_id), "to": index})
+        else:
+            added.append({"id": pin_id, "index": index})
+
+    kept = {entry["from"] for entry in unchanged}
+    removed = [{"id": pin_id, "from": position} for position, pin_id in enumerate(previous_ids)
+               if position not in kept]
+
+    return {
+        "previous": len(previous_ids),
+        "added": added,
+        "removed": removed,
+        "unchanged": unchanged,
+    }
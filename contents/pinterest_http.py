@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Pinterest Widget HTTP Session
+Pooled keep-alive sessions shared by every fetcher and the pin saver, one
+per retry/pool setting, with per-host connection limits, retry/backoff for
+transient failures and the per-host rate limit shared across processes
+(pinterest_lease)
+"""
+
+import threading
+
+from pinterest_lease import acquire_token
+
+DEFAULT_TIMEOUT_SECONDS = 10
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF_SECONDS = 0.5
+# Connections kept (and allowed at once) per host; extra requests wait for a free one
+PER_HOST_CONNECTIONS = 4
+# Number of distinct hosts whose pools are kept alive
+POOLED_HOSTS = 8
+# Longest a Retry-After header may make a retry wait; a longer one is cut short
+MAX_RETRY_AFTER_SECONDS = 5
+
+# Throttling and server errors worth another attempt
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# (retries, backoff, per_host) -> session. Sessions are never closed while
+# the process runs, so a request can't lose its pool to another caller's
+# settings; the command line only ever asks for a handful of combinations.
+_sessions = {}
+_config = {
+    "retries": DEFAULT_RETRIES,
+    "backoff": DEFAULT_BACKOFF_SECONDS,
+    "per_host": PER_HOST_CONNECTIONS,
+}
+_lock = threading.Lock()
+
+def configure(retries=None, backoff=None, per_host=None):
+    """Change the default retry/pool settings used when a caller passes none"""
+    with _lock:
+        changes = {"retries": retries, "backoff": backoff, "per_host": per_host}
+        _config.update({key: value for key, value in changes.items() if value is not None})
+
+def _build_session(retries, backoff, per_host):
+    # Imported here: requests dominates start-up time, and commands answered
+    # from test data or the cache never build a session
+    from http.cookiejar import DefaultCookiePolicy
+
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    class CappedRetry(Retry):
+        """Retry that honours Retry-After only up to MAX_RETRY_AFTER_SECONDS"""
+
+        def get_retry_after(self, response):
+            seconds = super().get_retry_after(response)
+            return None if seconds is None else min(seconds, MAX_RETRY_AFTER_SECONDS)
+
+    retry = CappedRetry(
+        total=retries,
+        connect=retries,
+        # A read timeout already cost a full TIMEOUT; don't multiply it
+        read=0,
+        status=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        # Saving a pin is not idempotent, so POSTs are never retried
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=POOLED_HOSTS,
+        pool_maxsize=per_host,
+        pool_block=True,
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    # Never keep cookies from responses: callers pass their own per request
+    # (public profile/board fetches deliberately send none)
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return session
+
+def get_session(retries=None, backoff=None, per_host=None):
+    """Return the shared session for these settings (configure()'s defaults
+    for any left out), building it on first use"""
+    with _lock:
+        key = (_config["retries"] if retries is None else retries,
+               _config["backoff"] if backoff is None else backoff,
+               _config["per_host"] if per_host is None else per_host)
+        session = _sessions.get(key)
+        if session is None:
+            session = _sessions[key] = _build_session(*key)
+        return session
+
+def request(method, url, retries=None, backoff=None, **kwargs):
+    """Send a request through the shared session for retries/backoff
+    (default timeout applied).
+
+    Waits for the host's rate limit first; retries urllib3 makes for the
+    same request do not take further tokens.
+    """
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT_SECONDS)
+    acquire_token(url)
+    return get_session(retries, backoff).request(method, url, **kwargs)
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+def head(url, **kwargs):
+    return request("HEAD", url, **kwargs)
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
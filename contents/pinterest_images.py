@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Pinterest Widget Image Cache
+Downloads pin images into a local on-disk cache so the widget can load
+them from file:// instead of re-downloading on every refresh
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+import time
+from urllib.parse import urlparse
+
+import pinterest_http
+from pinterest_cache import CACHE_ROOT
+
+IMAGE_CACHE_DIR = os.path.join(CACHE_ROOT, "images")
+
+# Total size bound; least recently used images are evicted first
+MAX_IMAGE_CACHE_BYTES = 64 * 1024 * 1024
+# Refuse single downloads larger than this
+MAX_IMAGE_BYTES = 5 * 1024 * 1024
+PREFETCH_WORKERS = 4
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+class ImageCache:
+    def __init__(self, directory=IMAGE_CACHE_DIR, max_bytes=MAX_IMAGE_CACHE_BYTES):
+        """
+        Initialize the image cache
+
+        Files are named after a hash of their URL. pinimg.com URLs already
+        end in the MD5 of the image, so a URL names exactly one content.
+
+        Args:
+            directory (str): Where image files are stored
+            max_bytes (int): Total size bound enforced after downloads
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def path_for(self, url):
+        ext = os.path.splitext(urlparse(url).path)[1].lower()
+        if ext not in IMAGE_EXTENSIONS:
+            ext = ".img"
+        return os.path.join(self.directory, hashlib.sha256(url.encode("utf-8")).hexdigest() + ext)
+
+    def get(self, url):
+        """Return the cached file path for url (refreshing its LRU age), or None"""
+        path = self.path_for(url)
+        try:
+            os.utime(path)
+            return path
+        except OSError:
+            return None
+
+    def fetch(self, url, timeout=pinterest_http.DEFAULT_TIMEOUT_SECONDS):
+        """Return a local path for url, downloading it on a cache miss"""
+        path = self.get(url)
+        if path:
+            return path
+
+        path = self.path_for(url)
+        response = pinterest_http.get(url, timeout=timeout, stream=True)
+        with response:
+            if response.status_code != 200:
+                raise ValueError(f"status {response.status_code}")
+            if not response.headers.get("Content-Type", "image/").startswith("image/"):
+                raise ValueError(f"not an image ({response.headers.get('Content-Type')})")
+
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".part")
+            try:
+                size = 0
+                with os.fdopen(fd, "wb") as f:
+                    for chunk in response.iter_content(65536):
+                        size += len(chunk)
+                        if size > MAX_IMAGE_BYTES:
+                            raise ValueError("image too large")
+                        f.write(chunk)
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+
+        return path
+
+    async def prefetch_async(self, session, urls, workers=PREFETCH_WORKERS,
+                             timeout=pinterest_http.DEFAULT_TIMEOUT_SECONDS):
+        """Download urls on a pinterest_async.AsyncSession, sharing its event
+        loop, request limit and deadline; returns {url: path} for those ready
+        within timeout. Downloads unfinished at timeout are abandoned."""
+        paths = {}
+        pending = []
+
+        for url in dict.fromkeys(urls):
+            path = self.get(url)
+            if path:
+                paths[url] = path
+            else:
+                pending.append(url)
+
+        if pending:
+            import asyncio
+
+            limit = asyncio.Semaphore(workers)
+
+            async def download(url):
+                async with limit:
+                    async with session.semaphore:
+                        return await session.run_blocking(self.fetch, url, timeout)
+
+            tasks = {asyncio.ensure_future(download(url)): url for url in pending}
+            done, not_done = await asyncio.wait(tasks, timeout=session.remaining(timeout))
+            for task in not_done:
+                task.cancel()
+
+            for task in done:
+                url = tasks[task]
+                try:
+                    paths[url] = task.result()
+                except Exception as e:
+                    print(f"Image prefetch failed for {url}: {e}", file=sys.stderr)
+
+            self.evict()
+
+        return paths
+
+    def evict(self):
+        """Drop least recently used images until the cache fits max_bytes"""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+
+        files = []
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+                # Leftover partial downloads older than a minute are garbage
+                if name.endswith(".part"):
+                    if time.time() - stat.st_mtime > 60:
+                        os.unlink(path)
+                    continue
+            except OSError:
+                continue  # renamed or removed by another process meanwhile
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        files.sort()
+        total = sum(size for _, size, _ in files)
+
+        while files and total > self.max_bytes:
+            _, size, path = files.pop(0)
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            total -= size
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Pinterest Widget Leases
+Cross-process coordination through lock files: a lease per feed, so one
+process fetches it while the others wait and read its result from the
+cache, and a token bucket per Pinterest host shared by every widget of the
+user, so refreshes firing together stay under Pinterest's throttling
+"""
+
+import fcntl
+import os
+import stat
+import struct
+import sys
+import time
+from urllib.parse import urlsplit
+
+# Requests per second and burst size per host; other hosts are not limited.
+# PINTEREST_WIDGET_RATE_LIMITS overrides them ("host=rate/burst,...", or "off").
+DEFAULT_RATE_LIMITS = {
+    "www.pinterest.com": (2.0, 10),
+    "i.pinimg.com": (20.0, 40),
+}
+# Longest a request waits for a token before it goes ahead anyway
+MAX_RATE_WAIT_SECONDS = 10
+# Bucket file contents: tokens left, time of the last update
+BUCKET_FORMAT = "<dd"
+# How often a waiting process retries a feed lease
+LEASE_POLL_SECONDS = 0.05
+
+def parse_rate_limits(spec):
+    """{host: (rate, burst)} from "host=rate/burst,..." ("off" or "" means no limits)"""
+    limits = {}
+    if not spec or spec.strip().lower() == "off":
+        return limits
+    for item in spec.split(","):
+        try:
+            host, value = item.strip().split("=", 1)
+            rate, burst = value.split("/", 1)
+            rate = float(rate)
+            # A zero, negative or NaN rate would never refill the bucket
+            if not rate > 0:
+                raise ValueError("rate must be positive")
+            limits[host.strip().lower()] = (rate, max(1, int(burst)))
+        except ValueError:
+            print(f"Ignoring malformed rate limit {item!r}", file=sys.stderr)
+    return limits
+
+_rate_limits = None
+
+def rate_limits():
+    global _rate_limits
+    if _rate_limits is None:
+        spec = os.environ.get("PINTEREST_WIDGET_RATE_LIMITS")
+        _rate_limits = dict(DEFAULT_RATE_LIMITS) if spec is None else parse_rate_limits(spec)
+    return _rate_limits
+
+def rate_dir():
+    """Where the bucket files live: PINTEREST_WIDGET_RATE_DIR, or a directory in
+    the user's private runtime directory (so other users cannot touch them)"""
+    override = os.environ.get("PINTEREST_WIDGET_RATE_DIR")
+    if override:
+        return override
+
+    from pinterest_client import private_runtime_dir
+    return os.path.join(private_runtime_dir(), "pinterest_widget-rate")
+
+def _open_bucket(path):
+    """Open (creating) a bucket file; never follows symlinks.
+
+    Raises PermissionError unless its directory is a real directory that
+    only this user (or root) can write to.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, 0o700, exist_ok=True)
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid not in (os.getuid(), 0) or info.st_mode & 0o022:
+        raise PermissionError(f"{directory} is writable by other users")
+    return os.open(path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+
+def _take_token(path, rate, burst):
+    """Take a token from the bucket file; returns seconds until one is available (0 if taken)"""
+    fd = _open_bucket(path)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        now = time.time()
+        raw = os.pread(fd, struct.calcsize(BUCKET_FORMAT), 0)
+        if len(raw) == struct.calcsize(BUCKET_FORMAT):
+            tokens, updated = struct.unpack(BUCKET_FORMAT, raw)
+            tokens = min(burst, tokens + max(0.0, now - updated) * rate)
+        else:
+            tokens = float(burst)
+
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        os.pwrite(fd, struct.pack(BUCKET_FORMAT, tokens, now), 0)
+        return wait
+    finally:
+        os.close(fd)  # also drops the lock
+
+def acquire_token(url, max_wait=MAX_RATE_WAIT_SECONDS):
+    """Block until url's host allows another request; returns the seconds waited.
+
+    Hosts without a limit return at once. If the bucket file cannot be
+    used the request is not held back.
+    """
+    host = (urlsplit(url).hostname or "").lower()
+    limit = rate_limits().get(host)
+    if not limit:
+        return 0.0
+
+    rate, burst = limit
+    start = time.monotonic()
+    while True:
+        try:
+            path = os.path.join(rate_dir(), host + ".bucket")
+            wait = _take_token(path, rate, burst)
+        except OSError as e:
+            print(f"Rate limit file for {host} unusable: {e}", file=sys.stderr)
+            return 0.0
+        waited = time.monotonic() - start
+        if not wait:
+            return waited
+        if waited + wait > max_wait:
+            print(f"Rate limit wait for {host} exceeded {max_wait}s, sending anyway", file=sys.stderr)
+            return waited
+        time.sleep(wait)
+
+class FeedLease:
+    def __init__(self, path):
+        """
+        Initialize a lease on fetching one feed
+
+        The lease is an flock on path, so it is released when the holder
+        exits, however it exits. Waiting is left to the caller (poll
+        try_acquire), so it works from an event loop.
+
+        Args:
+            path (str): Lease file, created on first use
+        """
+        self.path = path
+        self._fd = None
+
+    @property
+    def held(self):
+        return self._fd is not None
+
+    def try_acquire(self):
+        """Take the lease if nobody else holds it; False means another process does"""
+        if self._fd is not None:
+            return True
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        except OSError as e:
+            # Without a lease file everyone fetches, as before
+            print(f"Lease file {self.path} unusable: {e}", file=sys.stderr)
+            return True
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
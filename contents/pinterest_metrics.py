@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Pinterest Widget Metrics
+Per-command stage timings and counters (auth load, time to first byte,
+download, extraction, serialisation, bytes, cache hits), reported in the
+JSON result, appended to a JSON-lines log or written as a Prometheus
+textfile for node_exporter's textfile collector
+"""
+
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+METRIC_PREFIX = "pinterest_widget"
+LABEL_ESCAPE_RE = re.compile(r'(["\\])')
+
+class Metrics:
+    def __init__(self):
+        """
+        Initialize an empty metrics record for one command
+
+        Stage times add up across calls (a multi-source command fetches
+        several pages), and each stage also counts how often it ran.
+        Extraction runs on worker threads, so updates take a lock.
+        """
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def add_time(self, stage, seconds):
+        with self._lock:
+            total, calls = self.stages.get(stage, (0.0, 0))
+            self.stages[stage] = (total + seconds, calls + 1)
+
+    @contextmanager
+    def timer(self, stage):
+        """Time the with-block as one call of stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - start)
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def to_dict(self):
+        """Plain-JSON form: {"total_ms", "stages": {stage: {"ms", "calls"}}, "counters"}"""
+        with self._lock:
+            return {
+                "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+                "stages": {stage: {"ms": round(total * 1000, 2), "calls": calls}
+                           for stage, (total, calls) in sorted(self.stages.items())},
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+def _label(value):
+    return LABEL_ESCAPE_RE.sub(r"\\\1", str(value)).replace("\n", "\\n")
+
+def prometheus_lines(record, labels):
+    """Prometheus exposition lines for a to_dict() record"""
+    base = ",".join(f'{key}="{_label(value)}"' for key, value in labels.items())
+    lines = [f"{METRIC_PREFIX}_duration_seconds{{{base}}} {record['total_ms'] / 1000:.6f}"]
+    for stage, values in record["stages"].items():
+        lines.append(f'{METRIC_PREFIX}_stage_seconds{{{base},stage="{_label(stage)}"}} {values["ms"] / 1000:.6f}')
+        lines.append(f'{METRIC_PREFIX}_stage_calls{{{base},stage="{_label(stage)}"}} {values["calls"]}')
+    for name, value in record["counters"].items():
+        lines.append(f'{METRIC_PREFIX}_count{{{base},name="{_label(name)}"}} {value}')
+    lines.append(f"{METRIC_PREFIX}_last_run_timestamp_seconds{{{base}}} {int(time.time())}")
+    return lines
+
+PROMETHEUS_HEADER = [
+    f"# HELP {METRIC_PREFIX}_duration_seconds Wall time of the last fetch command",
+    f"# TYPE {METRIC_PREFIX}_duration_seconds gauge",
+    f"# HELP {METRIC_PREFIX}_stage_seconds Time spent per stage in the last fetch command",
+    f"# TYPE {METRIC_PREFIX}_stage_seconds gauge",
+    f"# HELP {METRIC_PREFIX}_stage_calls Times each stage ran in the last fetch command",
+    f"# TYPE {METRIC_PREFIX}_stage_calls gauge",
+    f"# HELP {METRIC_PREFIX}_count Counters (bytes, pins, cache hits) of the last fetch command",
+    f"# TYPE {METRIC_PREFIX}_count gauge",
+    f"# HELP {METRIC_PREFIX}_last_run_timestamp_seconds When the last fetch command finished",
+    f"# TYPE {METRIC_PREFIX}_last_run_timestamp_seconds gauge",
+]
+
+def append_jsonl(path, record, labels):
+    """Append one {"time", labels..., metrics} line to a JSON-lines log"""
+    line = json.dumps(dict(labels, time=int(time.time()), **record), ensure_ascii=False) + "\n"
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # One write() of an O_APPEND file keeps concurrent lines whole
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+    except OSError as e:
+        print(f"Metrics log write error: {e}", file=sys.stderr)
+
+def write_textfile(path, record, labels):
+    """Replace this command's series in a Prometheus textfile, keeping the others.
+
+    Several widgets can share one file: series are keyed by their labels
+    (client and command), and the file is swapped in atomically.
+    """
+    base = ",".join(f'{key}="{_label(value)}"' for key, value in labels.items())
+    kept = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if line and not line.startswith("#") and f"{{{base}" not in line:
+                    kept.append(line)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Metrics textfile read error: {e}", file=sys.stderr)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write("\n".join(PROMETHEUS_HEADER + kept + prometheus_lines(record, labels)) + "\n")
+            # node_exporter ignores files it cannot read as its own user
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        print(f"Metrics textfile write error: {e}", file=sys.stderr)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Pinterest Widget Feed Pages
+Maps feed commands to Pinterest's JSON resource endpoints and follows
+their bookmarks, so feeds can be read past the first page. Page tokens
+handed to the caller are opaque and carry everything needed to resume.
+"""
+
+import base64
+import json
+from collections import deque
+from urllib.parse import quote_plus
+
+# Pins requested per resource page (Pinterest's own grids ask for 25)
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 50
+# Bookmark Pinterest returns on the last page
+END_BOOKMARK = "-end-"
+# Pin IDs remembered for de-duplication across pages; older ones are forgotten
+SEEN_ID_LIMIT = 4096
+
+def resource_for_command(command):
+    """Return the resource request for a feed command, or None if it has none.
+
+    The result is {"resource", "source_url", "options", "data_type",
+    "auth"}; auth means the endpoint needs the logged-in session.
+    """
+    if command == "home_feed":
+        return {"resource": "UserHomefeedResource", "source_url": "/",
+                "options": {"field_set_key": "hybrid"}, "data_type": "home_feed", "auth": True}
+
+    if command.startswith("search:"):
+        query = command[7:]
+        if not query:
+            return None
+        return {"resource": "BaseSearchResource", "source_url": f"/search/pins/?q={quote_plus(query)}",
+                "options": {"query": query, "scope": "pins"}, "data_type": "search", "auth": True}
+
+    if command.startswith("board:"):
+        parts = command[6:].split(":", 1)
+        if len(parts) != 2:
+            return None
+        username, board_name = parts
+        slug = board_name.replace(" ", "-").lower()
+        # board_id is filled in from BoardResource before the first page
+        return {"resource": "BoardFeedResource", "source_url": f"/{username}/{slug}/",
+                "options": {"board_url": f"/{username}/{slug}/", "username": username, "slug": slug},
+                "data_type": "board", "auth": False}
+
+    if command and command != "test" and not command.startswith("multi:"):
+        return {"resource": "UserPinsResource", "source_url": f"/{command}/pins/",
+                "options": {"username": command}, "data_type": "user_pins", "auth": False}
+
+    return None
+
+def page_options(request, bookmark, page_size):
+    """The "options" object for one page of a resource request"""
+    options = dict(request["options"], page_size=page_size)
+    if bookmark:
+        options["bookmarks"] = [bookmark]
+    return options
+
+def next_bookmark(payload):
+    """Bookmark for the page after this resource response, or None at the end"""
+    resource_response = payload.get("resource_response") or {}
+    bookmark = resource_response.get("bookmark")
+    if not bookmark:
+        bookmarks = ((payload.get("resource") or {}).get("options") or {}).get("bookmarks") or [None]
+        bookmark = bookmarks[0]
+    return None if not bookmark or bookmark == END_BOOKMARK else bookmark
+
+def page_items(payload):
+    """The result list of a resource response (search nests it under "results")"""
+    data = (payload.get("resource_response") or {}).get("data")
+    if isinstance(data, dict):
+        data = data.get("results")
+    return data if isinstance(data, list) else []
+
+def encode_page_token(command, request, bookmark, page_size):
+    """Opaque, URL-safe token that resumes command at bookmark"""
+    state = {"command": command, "request": request, "bookmark": bookmark, "page_size": page_size}
+    raw = json.dumps(state, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_page_token(token):
+    """Inverse of encode_page_token; raises ValueError for malformed tokens"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        state = json.loads(raw.decode("utf-8"))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"invalid page token: {e}") from None
+
+    if not isinstance(state, dict) or not isinstance(state.get("request"), dict) or not state.get("bookmark"):
+        raise ValueError("invalid page token")
+    return state
+
+class BoundedSeenSet:
+    """Set of recently seen IDs holding at most limit entries (oldest dropped first)"""
+
+    def __init__(self, limit=SEEN_ID_LIMIT):
+        self.limit = limit
+        self._ids = set()
+        self._order = deque()
+
+    def __contains__(self, item):
+        return item in self._ids
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, item):
+        """Remember item; returns False if it was already known"""
+        if item in self._ids:
+            return False
+        self._ids.add(item)
+        self._order.append(item)
+        if len(self._order) > self.limit:
+            self._ids.discard(self._order.popleft())
+        return True
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Pinterest Widget Pin Records
+A compact in-memory pin (PinRecord) and a packed, columnar binary table of
+pins with one interned string table, so feed caches holding thousands of
+pins store each board name, description and URL prefix once. Both convert
+losslessly to and from the JSON pin dicts the widget reads.
+"""
+
+import itertools
+import json
+import struct
+
+# Packed table layout (little-endian):
+#   header        magic, version, index type code, pin count, string count
+#   string table  one u32 byte length per string, then the UTF-8 bytes
+#   columns       one index per pin for each of COLUMNS, in COLUMNS order
+# Indices are u16 while there are fewer than 0xFFFF strings, else u32; the
+# index one past the last string means "absent".
+MAGIC = b"PINR"
+FORMAT_VERSION = 1
+HEADER_FORMAT = "<4sBcII"
+
+# Column order in the table; URLs are split into an interned prefix and the rest
+COLUMNS = ("id", "title", "description", "image_prefix", "image_rest",
+           "image_extras", "board_name", "link_prefix", "link_rest", "extras")
+# A URL's prefix ends after this many slashes ("https://i.pinimg.com/564x/")
+URL_PREFIX_SLASHES = 4
+
+def split_url(url):
+    """Split url into (prefix, rest) at the URL_PREFIX_SLASHES-th slash"""
+    end = -1
+    for _ in range(URL_PREFIX_SLASHES):
+        end = url.find("/", end + 1)
+        if end < 0:
+            return "", url
+    return url[:end + 1], url[end + 1:]
+
+class PinRecord:
+    """One pin in fixed slots instead of nested dicts.
+
+    Fields the extractors always produce are kept as plain strings; any key
+    or shape they don't produce (saved, size, local_url, a second image
+    variant, a non-string id) is kept as-is in extras or image_extras, so
+    to_dict() returns a dict equal to the one from_dict() was given.
+    """
+
+    __slots__ = ("id", "title", "description", "image_url", "image_extras",
+                 "board_name", "link", "extras")
+
+    def __init__(self, id=None, title=None, description=None, image_url=None,
+                 image_extras=None, board_name=None, link=None, extras=None):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.image_url = image_url
+        # Keys of images.orig besides url (width, size, local_url)
+        self.image_extras = image_extras
+        self.board_name = board_name
+        self.link = link
+        # Top-level keys stored verbatim, including images/board of unusual shape
+        self.extras = extras
+
+    @classmethod
+    def from_dict(cls, pin):
+        record = cls()
+        extras = {}
+        for key, value in pin.items():
+            if key in ("id", "title", "description", "link") and isinstance(value, str):
+                setattr(record, key, value)
+            elif key == "images" and _plain_images(value):
+                orig = value["orig"]
+                record.image_url = orig["url"]
+                record.image_extras = {k: v for k, v in orig.items() if k != "url"} or None
+            elif key == "board" and isinstance(value, dict) and list(value) == ["name"] \
+                    and isinstance(value["name"], str):
+                record.board_name = value["name"]
+            else:
+                extras[key] = value
+        record.extras = extras or None
+        return record
+
+    def to_dict(self):
+        pin = {}
+        if self.id is not None:
+            pin["id"] = self.id
+        if self.title is not None:
+            pin["title"] = self.title
+        if self.description is not None:
+            pin["description"] = self.description
+        if self.image_url is not None:
+            pin["images"] = {"orig": dict({"url": self.image_url}, **(self.image_extras or {}))}
+        if self.board_name is not None:
+            pin["board"] = {"name": self.board_name}
+        if self.link is not None:
+            pin["link"] = self.link
+        if self.extras:
+            pin.update(self.extras)
+        return pin
+
+    def __eq__(self, other):
+        if not isinstance(other, PinRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"PinRecord(id={self.id!r}, title={self.title!r})"
+
+def _plain_images(images):
+    """True for {"orig": {"url": <str>, ...}}, the only images shape kept in slots"""
+    return (isinstance(images, dict) and list(images) == ["orig"]
+            and isinstance(images["orig"], dict) and isinstance(images["orig"].get("url"), str))
+
+def as_record(pin):
+    return pin if isinstance(pin, PinRecord) else PinRecord.from_dict(pin)
+
+def _json_text(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")) if value else None
+
+def pack_pins(pins):
+    """Pack pin dicts or PinRecords into a table (bytes)"""
+    strings = []
+    index = {}
+
+    def intern(value):
+        if value is None:
+            return None
+        position = index.get(value)
+        if position is None:
+            position = index[value] = len(strings)
+            strings.append(value)
+        return position
+
+    columns = {name: [] for name in COLUMNS}
+    for pin in pins:
+        record = as_record(pin)
+        image_prefix, image_rest = split_url(record.image_url) if record.image_url is not None else (None, None)
+        link_prefix, link_rest = split_url(record.link) if record.link is not None else (None, None)
+        values = (record.id, record.title, record.description, image_prefix, image_rest,
+                  _json_text(record.image_extras), record.board_name, link_prefix, link_rest,
+                  _json_text(record.extras))
+        for name, value in zip(COLUMNS, values):
+            columns[name].append(intern(value))
+
+    code = "H" if len(strings) < 0xFFFF else "I"
+    absent = len(strings)
+    encoded = [value.encode("utf-8") for value in strings]
+    count = len(columns["id"])
+
+    parts = [
+        struct.pack(HEADER_FORMAT, MAGIC, FORMAT_VERSION, code.encode(), count, len(strings)),
+        struct.pack(f"<{len(encoded)}I", *map(len, encoded)),
+    ]
+    parts.extend(encoded)
+    for name in COLUMNS:
+        parts.append(struct.pack(f"<{count}{code}", *(absent if value is None else value
+                                                       for value in columns[name])))
+    return b"".join(parts)
+
+def unpack_pins(data):
+    """PinRecords from a pack_pins() table; raises ValueError if it is damaged"""
+    try:
+        magic, version, code, count, string_count = struct.unpack_from(HEADER_FORMAT, data, 0)
+        if magic != MAGIC or version != FORMAT_VERSION or code not in (b"H", b"I"):
+            raise ValueError("not a pin table")
+        code = code.decode()
+        offset = struct.calcsize(HEADER_FORMAT)
+
+        lengths = struct.unpack_from(f"<{string_count}I", data, offset)
+        offset += 4 * string_count
+        ends = list(itertools.accumulate(lengths, initial=offset))
+        blob = bytes(data[:ends[-1]])
+        # The trailing None is what the "absent" index looks up
+        strings = [blob[start:end].decode("utf-8") for start, end in zip(ends, ends[1:])] + [None]
+        offset = ends[-1]
+
+        size = struct.calcsize(f"<{count}{code}")
+        if offset + size * len(COLUMNS) != len(data):
+            raise ValueError("pin table size does not match its header")
+        columns = []
+        for _ in COLUMNS:
+            columns.append(map(strings.__getitem__, struct.unpack_from(f"<{count}{code}", data, offset)))
+            offset += size
+
+        records = []
+        for (pin_id, title, description, image_prefix, image_rest, image_extras,
+             board_name, link_prefix, link_rest, extras) in zip(*columns):
+            records.append(PinRecord(
+                pin_id, title, description,
+                None if image_rest is None else image_prefix + image_rest,
+                json.loads(image_extras) if image_extras else None,
+                board_name,
+                None if link_rest is None else link_prefix + link_rest,
+                json.loads(extras) if extras else None,
+            ))
+        return records
+    except (struct.error, IndexError, UnicodeDecodeError, TypeError) as e:
+        raise ValueError(f"damaged pin table: {e}") from e
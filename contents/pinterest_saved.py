@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Pinterest Widget Saved Pins Index
+Remembers which pins were saved (with board and time) in a small
+append-only log, so repeated clicks and restarts do not repin, and fetched
+feeds can mark pins that are already saved
+"""
+
+import fcntl
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+SAVED_PINS_PATH = os.path.join(
+    os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share"),
+    "pinterest_widget",
+    "saved_pins.jsonl"
+)
+
+# Rewrite the log once it holds this many more lines than live entries
+COMPACT_SLACK = 256
+
+class SavedPinsIndex:
+    def __init__(self, path=SAVED_PINS_PATH):
+        """
+        Initialize the saved pins index
+
+        The log holds one JSON object per line ({"pin_id", "board",
+        "board_ids", "saved_pin_id", "saved_at"}); a later line for the
+        same pin wins, and carries over the boards of the earlier ones.
+        Appends and compaction take an flock on the log, so the saver, the
+        fetcher and the daemon can all use it at once.
+
+        Args:
+            path (str): Location of the append-only log
+        """
+        self.path = path
+        self._entries = {}
+        self._lines = 0
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """(Re)read the log if it changed since the last read"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._entries, self._lines, self._stamp = {}, 0, None
+            return
+        stamp = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if stamp == self._stamp:
+            return
+
+        entries = {}
+        lines = 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn or foreign line
+                    if isinstance(entry, dict) and entry.get("pin_id"):
+                        entries[str(entry["pin_id"])] = entry
+        except OSError as e:
+            print(f"Saved pins index read error: {e}", file=sys.stderr)
+            return
+
+        self._entries, self._lines, self._stamp = entries, lines, stamp
+
+    def _open_locked(self):
+        """Open the log for appending with an exclusive lock.
+
+        A compaction elsewhere may replace the file while we wait for the
+        lock, so retry until the locked file is the one at self.path.
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        while True:
+            f = open(self.path, "a", encoding="utf-8")
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                if os.fstat(f.fileno()).st_ino == os.stat(self.path).st_ino:
+                    return f
+            except FileNotFoundError:
+                pass
+            f.close()
+
+    def get(self, pin_id):
+        """Return the saved entry for pin_id, or None"""
+        with self._lock:
+            self._load()
+            return self._entries.get(str(pin_id))
+
+    def get_for_board(self, pin_id, board_id=None):
+        """Return the saved entry for pin_id if it covers board_id, or None.
+
+        Without a board_id any save counts; with one, only a save recorded
+        to that board does (entries from before boards were recorded never
+        match).
+        """
+        entry = self.get(pin_id)
+        if entry and board_id and str(board_id) not in (entry.get("board_ids") or ()):
+            return None
+        return entry
+
+    def saved_ids(self):
+        """Return the set of all saved pin IDs"""
+        with self._lock:
+            self._load()
+            return set(self._entries)
+
+    def add(self, pin_id, board=None, saved_pin_id=None, board_id=None):
+        """Record a successful save (to board_id, if known)"""
+        with self._lock:
+            self._load()
+            previous = self._entries.get(str(pin_id)) or {}
+            board_ids = list(previous.get("board_ids") or [])
+            if board_id and str(board_id) not in board_ids:
+                board_ids.append(str(board_id))
+            entry = {
+                "pin_id": str(pin_id),
+                "board": board,
+                "board_ids": board_ids,
+                "saved_pin_id": saved_pin_id,
+                "saved_at": int(time.time()),
+            }
+            line = json.dumps(entry, ensure_ascii=False) + "\n"
+
+            try:
+                with self._open_locked() as f:
+                    f.write(line)
+            except OSError as e:
+                print(f"Saved pins index write error: {e}", file=sys.stderr)
+                return entry
+
+            self._load()
+            if self._lines - len(self._entries) > COMPACT_SLACK:
+                self._compact()
+
+        return entry
+
+    def _compact(self):
+        """Rewrite the log with one line per pin"""
+        directory = os.path.dirname(self.path)
+        try:
+            with self._open_locked():
+                self._stamp = None
+                self._load()
+
+                fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "w", encoding="utf-8") as f:
+                        for entry in self._entries.values():
+                            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                    os.replace(tmp_path, self.path)
+                except Exception:
+                    if os.path.exists(tmp_path):
+                        os.unlink(tmp_path)
+                    raise
+        except OSError as e:
+            print(f"Saved pins index compaction error: {e}", file=sys.stderr)
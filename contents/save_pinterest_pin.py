@@ -8,9 +8,21 @@ import requests
 import json
 import sys
 import argparse
+import contextvars
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import quote
 
+import pinterest_http
+from pinterest_saved import SavedPinsIndex
+from pinterest_boards import BoardDirectory
+
+# Concurrent saves in batch mode; matches the per-host connection pool
+SAVE_WORKERS = pinterest_http.PER_HOST_CONNECTIONS
+# Boards requested per BoardsResource page
+BOARD_PAGE_SIZE = 50
+
 def load_pinterest_session():
     """Load Pinterest session data from file (same as fetchpinterest.py)"""
     config_file = os.path.expanduser("~/.config/pinterest_widget_auth.json")
@@ -47,24 +59,26 @@ def load_pinterest_session():
         return None, None
 
 class PinterestPinSaver:
-    def __init__(self, cookies=None, headers=None):
+    def __init__(self, cookies=None, headers=None, saved_index=None):
         """
         Initialize Pinterest Pin Saver
         
+        Requests go through the shared pooled session in pinterest_http;
+        the auth cookies and headers are sent per request so the session
+        can be shared with the feed fetchers.
+        
         Args:
             cookies (dict): Pinterest session cookies
             headers (dict): Request headers with authentication
+            saved_index (SavedPinsIndex, optional): Local record of saved pins,
+                consulted before and updated after each save
         """
-        self.session = requests.Session()
         self.base_url = "https://www.pinterest.com"
-        
-        if headers:
-            self.session.headers.update(headers)
-        
-        if cookies:
-            self.session.cookies.update(cookies)
+        self.headers = dict(headers or {})
+        self.cookies = dict(cookies or {})
+        self.saved_index = saved_index
     
-    def save_pin(self, pin_id, board_id=None, description="", client_tracking_params=""):
+    def save_pin(self, pin_id, board_id=None, description="", client_tracking_params="", force=False):
         """
         Save a pin to your Pinterest profile
         
@@ -73,11 +87,26 @@ class PinterestPinSaver:
             board_id (str, optional): Board ID to save to (if None, saves to default)
             description (str): Description for the saved pin
             client_tracking_params (str): Client tracking parameters
+            force (bool): Save even if the saved pins index already has the pin
+                (on board_id, when one is given)
             
         Returns:
-            dict: Response from Pinterest API
+            dict: Response from Pinterest API ("already_saved" is set, with the
+            index entry under "saved", when no request was made)
         """
         
+        if self.saved_index is not None and not force:
+            entry = self.saved_index.get_for_board(pin_id, board_id)
+            if entry:
+                return {
+                    "success": True,
+                    "already_saved": True,
+                    "status_code": None,
+                    "response": {},
+                    "saved": entry,
+                    "pin_id": pin_id
+                }
+        
         # Construct the data payload
         data_payload = {
             "options": {
@@ -108,7 +137,8 @@ class PinterestPinSaver:
         url = f"{self.base_url}/resource/RepinResource/create/"
         
         try:
-            response = self.session.post(url, data=request_data, timeout=10)
+            response = pinterest_http.post(url, data=request_data, headers=self.headers,
+                                           cookies=self.cookies, timeout=10)
             
             response.raise_for_status()
             
@@ -123,6 +153,14 @@ class PinterestPinSaver:
                     "pin_id": pin_id
                 }
             
+            if self.saved_index is not None:
+                data = {}
+                if isinstance(json_response, dict):
+                    data = (json_response.get("resource_response") or {}).get("data") or {}
+                board = data.get("board") or {}
+                self.saved_index.add(pin_id, board=board.get("name"), saved_pin_id=data.get("id"),
+                                     board_id=board_id or board.get("id"))
+            
             return {
                 "success": True,
                 "status_code": response.status_code,
@@ -142,17 +180,31 @@ class PinterestPinSaver:
                 "pin_id": pin_id
             }
     
-    def get_boards(self):
+    def get_boards(self, bookmark=None, page_size=BOARD_PAGE_SIZE):
         """
-        Get user's boards (requires authentication)
+        Get one page of the user's boards (requires authentication)
         
+        Args:
+            bookmark (str, optional): Bookmark from the previous page
+            page_size (int): Boards per page
+            
         Returns:
-            dict: List of user's boards
+            dict: BoardsResource response (boards under resource_response.data,
+            next page under resource_response.bookmark)
         """
         url = f"{self.base_url}/resource/BoardsResource/get/"
         
+        options = {"page_size": page_size, "privacy_filter": "all", "sort": "last_pinned_to"}
+        if bookmark:
+            options["bookmarks"] = [bookmark]
+        params = {
+            "source_url": "/",
+            "data": json.dumps({"options": options, "context": {}})
+        }
+        
         try:
-            response = self.session.get(url)
+            response = pinterest_http.get(url, params=params, headers=self.headers,
+                                          cookies=self.cookies, timeout=10)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -179,7 +231,8 @@ class PinterestPinSaver:
         }
         
         try:
-            response = self.session.get(url, params=request_data, timeout=10)
+            response = pinterest_http.get(url, params=request_data, headers=self.headers,
+                                          cookies=self.cookies, timeout=10)
             
             if response.status_code == 200:
                 return {
@@ -201,36 +254,217 @@ class PinterestPinSaver:
                 "error": str(e)
             }
 
-def main():
+def save_and_verify(saver, pin_id, board_id=None, description="", verify=True, force=False):
+    """
+    Save one pin and (optionally) verify it; returns a flat batch result record
+    
+    Args:
+        saver (PinterestPinSaver): Saver sharing the pooled session
+        pin_id (str): The ID of the pin to save
+        board_id (str, optional): Board ID to save to
+        description (str): Description for the saved pin
+        verify (bool): Follow a successful save with a verification GET
+        force (bool): Save even if the saved pins index already has the pin
+        
+    Returns:
+        dict: pin_id, success, already_saved, saved_pin_id, board, verified,
+        status_code, error
+    """
+    record = {"pin_id": pin_id, "success": False, "already_saved": False, "saved_pin_id": None,
+              "board": None, "verified": None, "status_code": None, "error": None}
+
+    if not pin_id.isdigit():
+        record["error"] = "Invalid pin ID"
+        return record
+
+    result = saver.save_pin(pin_id=pin_id, board_id=board_id, description=description, force=force)
+    record["status_code"] = result.get("status_code")
+
+    if not result["success"]:
+        record["error"] = result.get("error")
+        return record
+
+    record["success"] = True
+    if result.get("already_saved"):
+        record["already_saved"] = True
+        record["saved_pin_id"] = result["saved"].get("saved_pin_id")
+        record["board"] = result["saved"].get("board")
+        return record
+
+    response = result.get("response") or {}
+    data = (response.get("resource_response") or {}).get("data") or {}
+    record["saved_pin_id"] = data.get("id")
+    record["board"] = (data.get("board") or {}).get("name")
+
+    if verify and record["saved_pin_id"]:
+        verification = saver.verify_pin_saved(record["saved_pin_id"])
+        record["verified"] = bool(verification.get("exists"))
+
+    return record
+
+def read_spool(path):
+    """Claim a spool file of pin IDs (one or more per line) and return its IDs.
+
+    The file is renamed before reading, so IDs appended while a batch runs
+    land in a fresh spool file for the next run.
+    """
+    claimed = f"{path}.{os.getpid()}"
+    try:
+        os.replace(path, claimed)
+    except FileNotFoundError:
+        return []
+
+    try:
+        with open(claimed, "r", encoding="utf-8") as f:
+            return f.read().split()
+    finally:
+        os.unlink(claimed)
+
+def save_batch(pin_ids, board_id=None, description="", verify=True, workers=SAVE_WORKERS, out=None,
+               force=False):
+    """Save pin_ids concurrently, writing one JSON line per pin as each finishes.
+
+    Returns the process exit code: 0 if every pin was saved, 1 without
+    auth, 2 if any save failed.
+    """
+    out = out or sys.stdout
+    cookies, headers = load_pinterest_session()
+
+    if not cookies or not headers:
+        for pin_id in pin_ids:
+            print(json.dumps({"pin_id": pin_id, "success": False,
+                              "error": "Pinterest authentication not found"}), file=out)
+        return 1
+
+    saver = PinterestPinSaver(cookies=cookies, headers=headers, saved_index=SavedPinsIndex())
+    out_lock = threading.Lock()
+    failed = 0
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(pin_ids)))) as pool:
+        # Each save runs in a copy of this context, so a daemon request's
+        # stderr (fetchpinterest.RequestStderr) follows it onto the worker
+        futures = {pool.submit(contextvars.copy_context().run, save_and_verify,
+                               saver, pin_id, board_id, description, verify, force): pin_id
+                   for pin_id in pin_ids}
+        for future in as_completed(futures):
+            try:
+                record = future.result()
+            except Exception as e:
+                record = {"pin_id": futures[future], "success": False, "error": str(e)}
+
+            failed += not record["success"]
+            with out_lock:
+                print(json.dumps(record, ensure_ascii=False), file=out, flush=True)
+
+    return 2 if failed else 0
+
+def main(argv=None, out=None):
+    """Run the save command line; returns the process exit code"""
+    out = out or sys.stdout
+
     parser = argparse.ArgumentParser(description='Save Pinterest pins to your profile')
-    parser.add_argument('pin_id', help='Pinterest pin ID to save')
+    parser.add_argument('pin_ids', nargs='*', metavar='pin_id', help='Pinterest pin ID(s) to save')
     parser.add_argument('--board-id', help='Board ID to save pin to (optional)')
     parser.add_argument('--description', default='', help='Description for the saved pin')
+    parser.add_argument('--stdin', action='store_true', help='Also read pin IDs from stdin')
+    parser.add_argument('--spool', metavar='FILE', help='Also take the pin IDs queued in FILE (the file is consumed)')
+    parser.add_argument('--json', action='store_true',
+                        help='Batch mode: one JSON result line per pin (implied by several IDs, --stdin or --spool)')
+    parser.add_argument('--workers', type=int, default=SAVE_WORKERS, help='Concurrent saves in batch mode')
+    parser.add_argument('--no-verify', action='store_true', help='Skip the verification GET after each save')
+    parser.add_argument('--force', action='store_true', help='Save even pins the local saved-pins index already has')
+    parser.add_argument('--board-name', help='Board name to save pin to, resolved through the cached board list')
+    parser.add_argument('--resolve-board', metavar='NAME', help='Print the ID of the board NAME and exit')
+    parser.add_argument('--list-boards', action='store_true', help='Print the cached board list as JSON and exit')
+    parser.add_argument('--offline', action='store_true',
+                        help='Only use the cached board list (no board requests)')
+    # Used by the background board list refresh
+    parser.add_argument('--refresh-boards', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--boards-marker', help=argparse.SUPPRESS)
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+
+    if args.refresh_boards or args.resolve_board or args.list_boards or args.board_name:
+        cookies, headers = load_pinterest_session()
+        saver = None
+        if cookies and headers and not args.offline:
+            saver = PinterestPinSaver(cookies=cookies, headers=headers)
+        directory = BoardDirectory(saver)
+
+        if args.refresh_boards:
+            try:
+                if saver:
+                    directory.refresh()
+            except RuntimeError as e:
+                print(f"Board refresh failed: {e}", file=sys.stderr)
+            finally:
+                if args.boards_marker and os.path.exists(args.boards_marker):
+                    os.unlink(args.boards_marker)
+            return 0
+
+        if args.list_boards:
+            try:
+                boards = directory.boards(offline=args.offline)
+            except RuntimeError as e:
+                print(f"Board list fetch failed: {e}", file=sys.stderr)
+                return 1
+            print(json.dumps(boards, ensure_ascii=False, indent=2), file=out)
+            return 0
+
+        if args.resolve_board:
+            board_id = directory.resolve(args.resolve_board, offline=args.offline)
+            if not board_id:
+                print(f"Board not found: {args.resolve_board}", file=sys.stderr)
+                return 1
+            print(board_id, file=out)
+            return 0
+
+        args.board_id = directory.resolve(args.board_name, offline=args.offline)
+        if not args.board_id:
+            print(f"Error: board not found: {args.board_name}", file=out)
+            return 1
+
+    pin_ids = list(args.pin_ids)
+    if args.stdin:
+        pin_ids.extend(sys.stdin.read().split())
+    if args.spool:
+        pin_ids.extend(read_spool(args.spool))
+    # Rapid repeated clicks queue the same pin more than once
+    pin_ids = list(dict.fromkeys(pin_id.strip() for pin_id in pin_ids if pin_id.strip()))
+
+    if args.json or args.stdin or args.spool or len(pin_ids) > 1:
+        return save_batch(pin_ids, args.board_id, args.description,
+                          verify=not args.no_verify, workers=args.workers, out=out, force=args.force)
+
+    if not pin_ids:
+        parser.error("no pin ID given")
+    args.pin_id = pin_ids[0]
     
     # Load Pinterest session using the same method as fetchpinterest.py
     cookies, headers = load_pinterest_session()
     
     if not cookies or not headers:
-        print("Error: Pinterest authentication not found")
-        print("Please ensure you have ~/.config/pinterest_widget_auth.json configured")
-        print("This should contain your Pinterest session cookies and authentication data")
-        sys.exit(1)
+        print("Error: Pinterest authentication not found", file=out)
+        print("Please ensure you have ~/.config/pinterest_widget_auth.json configured", file=out)
+        print("This should contain your Pinterest session cookies and authentication data", file=out)
+        return 1
     
     # Initialize Pinterest saver
-    pinterest = PinterestPinSaver(cookies=cookies, headers=headers)
+    pinterest = PinterestPinSaver(cookies=cookies, headers=headers, saved_index=SavedPinsIndex())
     
     # Save the pin
-    print(f"Saving pin {args.pin_id}...")
+    print(f"Saving pin {args.pin_id}...", file=out)
     result = pinterest.save_pin(
         pin_id=args.pin_id,
         board_id=args.board_id,
-        description=args.description
+        description=args.description,
+        force=args.force
     )
     
-    if result["success"]:
-        print(f"✅ API reported success for pin {args.pin_id}")
+    if result.get("already_saved"):
+        print(f"✅ Pin {args.pin_id} is already saved (board: {result['saved'].get('board') or 'Unknown'})", file=out)
+    elif result["success"]:
+        print(f"✅ API reported success for pin {args.pin_id}", file=out)
         
         # Extract the saved pin ID from response
         saved_pin_id = None
@@ -239,27 +473,29 @@ def main():
             saved_pin_id = data.get("id")
             board_name = data.get("board", {}).get("name", "Unknown")
             
-            print(f"📌 Saved as pin ID: {saved_pin_id}")
-            print(f"📋 Saved to board: {board_name}")
+            print(f"📌 Saved as pin ID: {saved_pin_id}", file=out)
+            print(f"📋 Saved to board: {board_name}", file=out)
             
             # Verify the pin was actually saved
-            if saved_pin_id:
-                print(f"🔍 Verifying pin {saved_pin_id} exists...")
+            if saved_pin_id and not args.no_verify:
+                print(f"🔍 Verifying pin {saved_pin_id} exists...", file=out)
                 verification = pinterest.verify_pin_saved(saved_pin_id)
                 
                 if verification.get("exists"):
-                    print(f"✅ Verification successful - pin {saved_pin_id} exists!")
+                    print(f"✅ Verification successful - pin {saved_pin_id} exists!", file=out)
                 else:
-                    print(f"❌ Verification failed - pin {saved_pin_id} may not exist")
-                    print(f"Verification error: {verification.get('error', 'Unknown error')}")
+                    print(f"❌ Verification failed - pin {saved_pin_id} may not exist", file=out)
+                    print(f"Verification error: {verification.get('error', 'Unknown error')}", file=out)
         
         if result["response"]:
-            print(f"\nFull Response: {json.dumps(result['response'], indent=2)}")
+            print(f"\nFull Response: {json.dumps(result['response'], indent=2)}", file=out)
     else:
-        print(f"❌ Failed to save pin {args.pin_id}")
-        print(f"Error: {result['error']}")
+        print(f"❌ Failed to save pin {args.pin_id}", file=out)
+        print(f"Error: {result['error']}", file=out)
         if result.get("status_code"):
-            print(f"Status code: {result['status_code']}")
+            print(f"Status code: {result['status_code']}", file=out)
+
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -52,8 +52,9 @@ PlasmoidItem {
         return Qt.rgba(color.r, color.g, color.b, 1.0)
     }
 
-    property string scriptPath: getScriptPath("fetchpinterest.py")
-    property string saveScriptPath: getScriptPath("save_pinterest_pin.py")
+    // The client forwards fetches and saves to a resident daemon and takes
+    // the same arguments as fetchpinterest.py (saves: --save <pin_id>)
+    property string scriptPath: getScriptPath("pinterest_client.py")
     property string feedType: "search" // Default to search so it works immediately without auth
     property string searchQuery: "nature" // Default query
     property int maxPins: 18
@@ -102,32 +103,76 @@ PlasmoidItem {
 
         onNewData: function(sourceName, data) {
             console.log("Save operation completed for:", sourceName)
+            // Let an identical command (e.g. a retry of the same pins) run again
+            disconnectSource(sourceName)
 
-            // Extract pin ID from the command
-            var pinId = extractPinIdFromCommand(sourceName)
+            var pinIds = extractPinIdsFromCommand(sourceName)
+            if (pinIds.length === 0) {
+                return // not a save command (e.g. the auth setup launcher)
+            }
 
-            if (data['exit code'] === 0) {
-                console.log("Pin saved successfully:", pinId)
-                // Mark as saved instead of removing from saving state
-                if (pinId) {
-                    root.savedPins[pinId] = true
-                    root.savedPinsChanged() // Trigger property binding updates
+            // One JSON result line per pin from the batch saver
+            var results = {}
+            var lines = (data.stdout || "").split("\n")
+            for (var i = 0; i < lines.length; i++) {
+                try {
+                    var result = JSON.parse(lines[i])
+                    results[result.pin_id] = result.success === true
+                } catch (e) {
+                    // not a result line
                 }
-            } else {
-                console.log("Error saving pin:", pinId, data.stderr)
-                // Remove from saved state on error
-                if (pinId && root.savedPins[pinId]) {
+            }
+
+            var changed = false
+            for (var j = 0; j < pinIds.length; j++) {
+                var pinId = pinIds[j]
+                if (results[pinId]) {
+                    console.log("Pin saved successfully:", pinId)
+                    root.savedPins[pinId] = true
+                } else if (root.savedPins[pinId]) {
+                    // Remove from saved state on error (or a missing result)
+                    console.log("Error saving pin:", pinId, data.stderr)
                     delete root.savedPins[pinId]
-                    root.savedPinsChanged()
                 }
+                changed = true
+            }
+            if (changed) {
+                root.savedPinsChanged() // Trigger property binding updates
             }
         }
     }
 
-    // Helper function to extract pin ID from command
-    function extractPinIdFromCommand(command) {
-        var parts = command.split(' ')
-        return parts[parts.length - 1] // Last part should be the pin ID
+    // Pin IDs of a batch save command (the quoted arguments after --json)
+    function extractPinIdsFromCommand(command) {
+        var marker = command.indexOf(" --json ")
+        if (marker === -1) {
+            return []
+        }
+        return command.slice(marker + 8).split(" ").map(function(part) {
+            return part.replace(/'/g, "")
+        }).filter(function(part) {
+            return part !== ""
+        })
+    }
+
+    // Heart clicks are queued for a moment and saved together in one batch
+    property var pendingSaves: []
+
+    Timer {
+        id: saveBatchTimer
+        interval: 400
+        repeat: false
+        onTriggered: {
+            var pinIds = root.pendingSaves
+            root.pendingSaves = []
+            if (pinIds.length === 0) {
+                return
+            }
+
+            var command = "python3 '" + root.scriptPath + "' --save --json '" + pinIds.join("' '") + "'"
+            console.log("Executing save command:", command)
+            saveDataSource.connectSource(command)
+        }
     }
 
     // Function to save a pin
@@ -137,14 +182,13 @@ PlasmoidItem {
             return
         }
 
-        console.log("Saving pin to profile:", pinId)
+        console.log("Queueing pin save:", pinId)
         // Immediately mark as saved for instant UI feedback
         root.savedPins[pinId] = true
         root.savedPinsChanged() // Trigger property binding updates
 
-        var command = "python3 '" + root.saveScriptPath + "' '" + pinId + "'"
-        console.log("Executing save command:", command)
-        saveDataSource.connectSource(command)
+        root.pendingSaves.push(pinId)
+        saveBatchTimer.restart()
     }
 
     // Configuration Popup
@@ -401,7 +445,6 @@ PlasmoidItem {
                             root.showRefreshButton = showRefreshCheck.checked
                             root.customBackgroundColor = bgColorField.text.trim()
                             root.scriptPath = scriptPathField.text
-                            root.saveScriptPath = saveScriptPathField.text
                             refreshTimer.interval = root.refreshInterval
                             configPopup.close()
 
@@ -422,11 +465,6 @@ PlasmoidItem {
         visible: false
         text: root.scriptPath
     }
-    TextField {
-        id: saveScriptPathField
-        visible: false
-        text: root.saveScriptPath
-    }
 
 
 
@@ -555,6 +593,13 @@ PlasmoidItem {
                 var response = JSON.parse(data.stdout)
                 console.log("Parsed response - found", response.data ? response.data.length : 0, "pins")
 
+                // Mostly unchanged feeds are patched in place so loaded images stay
+                if (applyPinDelta(response)) {
+                    console.log("Applied feed delta:", response.delta.added.length, "added,", response.delta.removed.length, "removed")
+                    markSavedPins(response.data)
+                    return
+                }
+
                 // CRASH PREVENTION: Clear everything first
                 clearAllData()
 
@@ -562,24 +607,13 @@ PlasmoidItem {
                     // STRICT LIMITS: Only process up to maxPins
                     var validPins = 0
                     for (var i = 0; i < response.data.length && validPins < root.maxPins; i++) {
-                        var pin = response.data[i]
-                        var imageUrl = pin.images?.orig?.url || pin.images?.['564x']?.url || ""
-
-                        // STRICT validation: Only Pinterest URLs
-                        if (imageUrl && imageUrl.includes("pinimg.com") && imageUrl.startsWith("https://")) {
-                            pinterestModel.append({
-                                id: pin.id || `pin_${i}`,
-                                title: pin.title || "Pinterest Pin",
-                                description: pin.description || "",
-                                imageUrl: imageUrl,
-                                link: pin.link || "",
-                                boardName: pin.board?.name || "",
-                                pinUrl: pin.link || `https://pinterest.com/pin/${pin.id || ""}`,
-                                loadIndex: validPins // For sequential loading
-                            })
+                        var row = pinToRow(response.data[i], i, validPins)
+                        if (row) {
+                            pinterestModel.append(row)
                             validPins++
                         }
                     }
+                    markSavedPins(response.data)
                 } else {
                     console.log("No pins found")
                 }
@@ -595,6 +629,113 @@ PlasmoidItem {
         id: pinterestModel
     }
 
+    // Pins the script reports as already saved (local saved-pins index) get a filled heart
+    function markSavedPins(pins) {
+        var changed = false
+        for (var i = 0; i < pins.length; i++) {
+            if (pins[i].saved === true && pins[i].id && !root.savedPins[pins[i].id]) {
+                root.savedPins[pins[i].id] = true
+                changed = true
+            }
+        }
+        if (changed) {
+            root.savedPinsChanged()
+        }
+    }
+
+    // Model row for a pin from the script's JSON, or null if its image URL is not acceptable
+    function pinToRow(pin, i, loadIndex) {
+        var imageUrl = pin.images?.orig?.url || pin.images?.['564x']?.url || ""
+
+        // STRICT validation: Only Pinterest URLs
+        if (!imageUrl || !imageUrl.includes("pinimg.com") || !imageUrl.startsWith("https://")) {
+            return null
+        }
+
+        return {
+            id: pin.id || `pin_${i}`,
+            title: pin.title || "Pinterest Pin",
+            description: pin.description || "",
+            imageUrl: imageUrl,
+            // file:// copy from the script's image cache, if prefetched
+            localImageUrl: (pin.images?.orig?.local_url || "").startsWith("file://") ? pin.images.orig.local_url : "",
+            link: pin.link || "",
+            boardName: pin.board?.name || "",
+            pinUrl: pin.link || `https://pinterest.com/pin/${pin.id || ""}`,
+            loadIndex: loadIndex // For sequential loading
+        }
+    }
+
+    // Patch pinterestModel with the script's --delta instead of rebuilding it.
+    // Returns false (nothing changed) whenever the model does not match the
+    // delta's previous snapshot, e.g. after a restart; the caller then rebuilds.
+    function applyPinDelta(response) {
+        var delta = response ? response.delta : null
+        if (!delta || !response.data || pinterestModel.count !== delta.previous) {
+            return false
+        }
+
+        var rows = []
+        for (var i = 0; i < response.data.length && i < root.maxPins; i++) {
+            var row = pinToRow(response.data[i], i, i)
+            if (!row) {
+                return false // positions in the delta would no longer line up
+            }
+            rows.push(row)
+        }
+        if (rows.length !== response.data.length) {
+            return false
+        }
+
+        var k
+        for (k = 0; k < delta.removed.length; k++) {
+            if (pinterestModel.get(delta.removed[k].from).id !== delta.removed[k].id) {
+                return false
+            }
+        }
+        for (k = 0; k < delta.unchanged.length; k++) {
+            if (pinterestModel.get(delta.unchanged[k].from).id !== delta.unchanged[k].id) {
+                return false
+            }
+        }
+
+        // Remove from the end so earlier positions stay valid
+        var removed = delta.removed.map(function(entry) { return entry.from }).sort(function(a, b) { return b - a })
+        for (k = 0; k < removed.length; k++) {
+            pinterestModel.remove(removed[k])
+        }
+
+        // Kept rows are moved into place, new ones inserted; image fields of
+        // kept rows are left alone so their delegates do not reload
+        for (i = 0; i < rows.length; i++) {
+            var found = -1
+            for (var j = i; j < pinterestModel.count; j++) {
+                if (pinterestModel.get(j).id === rows[i].id) {
+                    found = j
+                    break
+                }
+            }
+
+            if (found === -1) {
+                pinterestModel.insert(i, rows[i])
+                continue
+            }
+            if (found !== i) {
+                pinterestModel.move(found, i, 1)
+            }
+            pinterestModel.setProperty(i, "title", rows[i].title)
+            pinterestModel.setProperty(i, "description", rows[i].description)
+            pinterestModel.setProperty(i, "boardName", rows[i].boardName)
+            pinterestModel.setProperty(i, "loadIndex", i)
+        }
+
+        while (pinterestModel.count > rows.length) {
+            pinterestModel.remove(pinterestModel.count - 1)
+        }
+
+        return true
+    }
+
     // Slower refresh timer to prevent overload
     Timer {
         id: refreshTimer
@@ -611,7 +752,8 @@ PlasmoidItem {
         }
     }
 
-    function fetchPinterestData() {
+    // forceRefresh skips the script's feed cache TTL (manual refresh button)
+    function fetchPinterestData(forceRefresh) {
         // CRASH PREVENTION: Don't fetch if already loading
         if (currentlyLoading > 0) {
             console.log("Already loading images, skipping fetch")
@@ -629,23 +771,27 @@ PlasmoidItem {
         Qt.callLater(function() {
             var command;
             var timestamp = Date.now(); // Add timestamp for uniqueness
+            // Ask for the smallest image variant covering one grid cell in device pixels
+            var cellPixels = root.width / Math.max(1, Math.floor(root.width / 200)) * Screen.devicePixelRatio
+            var cacheArgs = (forceRefresh ? " --cache-ttl=0 --max-stale=0" : "") + " --width=" + Math.round(cellPixels) + " --prefetch=" + root.maxPins
+                + " --delta --client=" + Plasmoid.id
 
             if (feedType === "personal") {
-                command = "python3 '" + scriptPath + "' home_feed " + root.maxPins + " --refresh=" + timestamp
+                command = "python3 '" + scriptPath + "' home_feed " + root.maxPins + " --refresh=" + timestamp + cacheArgs
             } else if (feedType === "search") {
                 // Validate search query
                 if (!searchQuery || searchQuery.trim() === "") {
                     console.log("No search query provided, skipping fetch")
                     return
                 }
-                command = "python3 '" + scriptPath + "' 'search:" + searchQuery.trim() + "' " + root.maxPins + " --refresh=" + timestamp
+                command = "python3 '" + scriptPath + "' 'search:" + searchQuery.trim() + "' " + root.maxPins + " --refresh=" + timestamp + cacheArgs
             } else {
                 // Default to user feed
                 if (!pinterestUsername || pinterestUsername.trim() === "") {
                     console.log("No username provided, skipping fetch")
                     return
                 }
-                command = "python3 '" + scriptPath + "' '" + pinterestUsername.trim() + "' " + root.maxPins + " --refresh=" + timestamp
+                command = "python3 '" + scriptPath + "' '" + pinterestUsername.trim() + "' " + root.maxPins + " --refresh=" + timestamp + cacheArgs
             }
 
             console.log("Executing fresh command:", command)
@@ -720,7 +866,7 @@ PlasmoidItem {
                     onClicked: {
                         console.log("Manual refresh triggered")
                         clearAllData()
-                        fetchPinterestData()
+                        fetchPinterestData(true)
                         refreshAnimation.start()
                     }
 
@@ -804,8 +950,8 @@ PlasmoidItem {
                                 console.log(`Pin Link: ${model.link}`)
                                 console.log(`=====================`)
 
-                                // Set source with error handling
-                                pinImage.source = model.imageUrl
+                                // Set source with error handling (cached local copy first)
+                                pinImage.source = model.localImageUrl || model.imageUrl
                             }
 
                             // Add to loading queue when delegate is created
@@ -1155,7 +1301,6 @@ PlasmoidItem {
         console.log("Pinterest widget initialized in SAFE MODE")
         console.log("Widget location:", Qt.resolvedUrl("."))
         console.log("Script path:", scriptPath)
-        console.log("Save script path:", saveScriptPath)
         console.log("Max pins:", root.maxPins, "Max concurrent images:", maxConcurrentImages)
 
         // Delayed initial fetch to prevent startup crashes
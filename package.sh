@@ -11,7 +11,7 @@ fi
 
 # Create the package
 # We exclude the .git directory, the packaging script itself, and any temporary files
-zip -r "$OUTPUT_FILE" . -x "*.git*" -x "package.sh" -x "*.DS_Store*" -x "*~" -x "*__pycache__*" -x "*.backup"
+zip -r "$OUTPUT_FILE" . -x "*.git*" -x "package.sh" -x "*.DS_Store*" -x "*~" -x "*__pycache__*" -x "*.backup" -x "benchmarks/*"
 
 echo "Package created: $OUTPUT_FILE"
 echo "You can install it using: kpackagetool6 -i $OUTPUT_FILE"